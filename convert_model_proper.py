@@ -1,6 +1,10 @@
 import tensorflow as tf
 import numpy as np
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+from convert_to_tflite import keras_to_tflite_converter, apply_quantization, representative_dataset
 
 def create_sample_model_for_testing():
     """
@@ -26,13 +30,16 @@ def create_sample_model_for_testing():
     
     return model
 
-def convert_keras_model_to_tflite(input_model_path, output_model_path):
+def convert_keras_model_to_tflite(input_model_path, output_model_path, quantization='dynamic',
+                                  representative_sequences=None):
     """
     Convert a Keras model to TensorFlow Lite format optimized for mobile.
     
     Args:
         input_model_path: Path to the Keras model (.keras or .h5)
         output_model_path: Output path for the TFLite model
+        quantization: 'float32', 'dynamic' or 'int8' ('float16' does not convert for the LSTM model)
+        representative_sequences: (N, 30, 171) windows used to calibrate int8
     
     Returns:
         bool: Success status
@@ -61,15 +68,14 @@ def convert_keras_model_to_tflite(input_model_path, output_model_path):
     
     # Convert to TensorFlow Lite
     print("🔄 Converting to TensorFlow Lite...")
-    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter = keras_to_tflite_converter(model)
     
     # Optimization settings for mobile deployment
-    converter.optimizations = [tf.lite.Optimize.DEFAULT]
-    converter.target_spec.supported_types = [tf.float32]
-    
-    # Optional: Add quantization for smaller model size (uncomment if needed)
-    # converter.optimizations = [tf.lite.Optimize.DEFAULT]
-    # converter.target_spec.supported_types = [tf.float16]
+    calibration = None
+    if representative_sequences is not None:
+        calibration = representative_dataset(representative_sequences)
+    apply_quantization(converter, quantization, calibration)
+    print(f"📊 Quantization: {quantization}")
     
     try:
         tflite_model = converter.convert()
@@ -122,6 +128,13 @@ def test_tflite_model(tflite_model_path):
         input_shape = input_details[0]['shape']  # Should be [1, 30, 171]
         sample_input = np.random.random_sample(input_shape).astype(np.float32)
         
+        # Full-integer (int8) models expect quantized input
+        input_dtype = input_details[0]['dtype']
+        if np.issubdtype(input_dtype, np.integer):
+            scale, zero_point = input_details[0]['quantization']
+            info = np.iinfo(input_dtype)
+            sample_input = np.clip(np.round(sample_input / scale + zero_point), info.min, info.max).astype(input_dtype)
+        
         # Set input tensor
         interpreter.set_tensor(input_details[0]['index'], sample_input)
         
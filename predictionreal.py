@@ -1,138 +1,398 @@
+import time
+STARTED = time.perf_counter()  # cold-start origin, taken before any heavy import
+
 import cv2
 import numpy as np
-from collections import deque
-import tensorflow as tf
-import mediapipe as mp
 import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+# None of these import TensorFlow or MediaPipe; both are imported on first use
+from landmark_features import (LandmarkExtractor, ParallelLandmarkExtractor, GatedLandmarkExtractor,
+                               draw_results, has_enough_landmarks)
+from pipeline import SignPipeline, print_stats
+from sequence_buffer import SequenceRingBuffer
+from profiling import StageProfiler, StartupTimeline, print_profile
+from inference_scheduler import InferenceScheduler
+from sign_events import SMOOTHING_METHODS, SignDecisionEngine
 
 # --- Configuration ---
 MODEL_PATH = r"E:\cursor_sign\model\best_model2.keras"
 LABEL_MAP_PATH = r"E:\cursor_sign\model\label_mapping2.txt"
+TFLITE_MODEL_PATH = r"E:\cursor_sign\model\sign_language_model.tflite"
 SEQUENCE_LENGTH = 30
-CONFIDENCE_THRESHOLD = 0.82
+CONFIDENCE_THRESHOLD = 0.82  # smoothed score at which a sign starts
+RELEASE_THRESHOLD = 0.6  # smoothed score below which it ends (hysteresis)
+SMOOTHING = 'ema'  # 'ema' or 'vote' over recent predictions
+SMOOTHING_ALPHA = 0.3  # EMA weight of the newest prediction
+SMOOTHING_WINDOW = 10  # predictions kept for majority voting
+MIN_SIGN_FRAMES = 3  # shorter signs are not reported
 INPUT_DIM = 171
+USE_STREAMING = False  # O(1)-per-frame stateful LSTM instead of re-running the full window
+PARALLEL_LANDMARKS = True  # run Hands, Pose and FaceMesh concurrently
+HAND_GATING = False  # skip Pose/FaceMesh while no hand is in view
+HAND_DETECT_SCALE = 0.5  # scale of the idle hand-presence check when gating (features stay full resolution)
+HAND_LINGER_FRAMES = 15  # keep running Pose/FaceMesh this many frames after the hands leave
+HAND_IDLE_STRIDE = 2  # while idle, look for hands only every Nth frame
+# 'keras', 'tflite', or 'auto' (TFLite whenever the .tflite model exists). CONFIDENCE_THRESHOLD
+# was tuned on the Keras model, so the quantized TFLite model is opt-in
+INFERENCE_BACKEND = 'keras'
+TFLITE_NUM_THREADS = 2
+INFERENCE_STRIDE = 1  # run the model at least every Nth frame (1 = every frame)
+MOTION_THRESHOLD = 0.05  # hand-feature L2 motion that forces an early inference (None to disable)
+PROFILE = False  # time every stage of the loop (also enabled by the profiling flags below)
+PROFILE_HUD = False  # draw per-stage p50/p95 on the frame
+PROFILE_LOG_INTERVAL = 0.0  # seconds between profile log lines, 0 to disable
+METRICS_PORT = None  # serve Prometheus metrics on this port
+METRICS_HOST = '127.0.0.1'  # '0.0.0.0' exposes the metrics endpoint on every interface
+TRACE_PATH = None  # write a Chrome trace JSON here on exit
+EXIT_AFTER_FIRST_PREDICTION = False  # stop once the cold-start timeline is complete
 
-# --- Load Model and Labels ---
-model = tf.keras.models.load_model(MODEL_PATH)
-label_map = {}
-with open(LABEL_MAP_PATH, "r") as f:
-    for line in f:
-        label, idx = line.strip().split(',')
-        label_map[int(idx)] = label
+# --- Lazily Initialized Model, Labels and MediaPipe Graphs ---
+# Loading them takes seconds, so importing this module does not: the model
+# is loaded on a background thread (start_warmup) and the graphs on first use
+model = None
+label_map = None
+backend = None
+streamer = None
+extractor = None
+decisions = None
+warmup = None
 
-# --- MediaPipe Initialization ---
-mp_hands = mp.solutions.hands
-mp_pose = mp.solutions.pose
-mp_face = mp.solutions.face_mesh
-mp_drawing = mp.solutions.drawing_utils
+scheduler = InferenceScheduler(INFERENCE_STRIDE, MOTION_THRESHOLD)
+startup = StartupTimeline(STARTED)
 
-hands = mp_hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5)
-pose = mp_pose.Pose(static_image_mode=False, min_detection_confidence=0.5)
-face = mp_face.FaceMesh(static_image_mode=False, max_num_faces=1, min_detection_confidence=0.5)
+# --- Profiling ---
+# A disabled profiler hands out no-op timers, so the hooks below stay in place
+profiler = StageProfiler(enabled=PROFILE, trace=TRACE_PATH is not None)
 
-# --- Landmark Indices ---
-face_indices = [1, 4, 33, 61, 199, 263, 291, 362, 454]
-pose_indices = [11, 12, 13, 14, 15, 16]
+def resolve_backend(kind):
+    """Resolve 'auto' to the lighter TFLite runtime when a converted model is available"""
+    if kind != 'auto':
+        return kind
+    # The streaming cell is built from the Keras weights
+    return 'tflite' if os.path.exists(TFLITE_MODEL_PATH) and not USE_STREAMING else 'keras'
 
-def live_predict():
-    cap = cv2.VideoCapture(1)
-    buffer = deque(maxlen=SEQUENCE_LENGTH)
+def load_inference():
+    """Load the labels, model and backend, then run one dummy window through them"""
+    global model, label_map, backend, streamer
+    from inference_backends import create_backend, load_label_map
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    kind = resolve_backend(INFERENCE_BACKEND)
+    source = TFLITE_MODEL_PATH if kind == 'tflite' else MODEL_PATH
+    print(f"Inference backend: {kind} ({source})")
+    # The Keras model is only needed by the Keras backend and the streaming cell
+    keras_model = None
+    if kind == 'keras' or USE_STREAMING:
+        import tensorflow as tf
+        keras_model = tf.keras.models.load_model(MODEL_PATH)
+    labels = load_label_map(LABEL_MAP_PATH)
+    inference_backend = create_backend(kind, keras_model, TFLITE_MODEL_PATH, TFLITE_NUM_THREADS)
+    # The first call traces the graph or allocates the interpreter's buffers
+    inference_backend.predict(np.zeros((1, SEQUENCE_LENGTH, INPUT_DIM), dtype=np.float32))
 
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_rgb.flags.writeable = False
-
-        results_hand = hands.process(frame_rgb)
-        results_pose = pose.process(frame_rgb)
-        results_face = face.process(frame_rgb)
-
-        frame_output = frame.copy()
-        frame_rgb.flags.writeable = True
-
-        face_landmarks = np.zeros((len(face_indices), 3))
-        pose_landmarks = np.zeros((len(pose_indices), 3))
-        left_hand = np.zeros((21, 3))
-        right_hand = np.zeros((21, 3))
-
-        if results_face.multi_face_landmarks:
-            all_face = np.array([[lm.x, lm.y, lm.z] for lm in results_face.multi_face_landmarks[0].landmark])
-            face_landmarks = all_face[face_indices]
-            mp_drawing.draw_landmarks(frame_output, results_face.multi_face_landmarks[0], mp_face.FACEMESH_TESSELATION)
-
-        if results_pose.pose_landmarks:
-            all_pose = np.array([[lm.x, lm.y, lm.z] for lm in results_pose.pose_landmarks.landmark])
-            pose_landmarks = all_pose[pose_indices]
-            mp_drawing.draw_landmarks(frame_output, results_pose.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-
-        if results_hand.multi_hand_landmarks and results_hand.multi_handedness:
-            for idx, handedness in enumerate(results_hand.multi_handedness):
-                label = handedness.classification[0].label
-                landmarks = np.array([[lm.x, lm.y, lm.z] for lm in results_hand.multi_hand_landmarks[idx].landmark])
-                mp_drawing.draw_landmarks(frame_output, results_hand.multi_hand_landmarks[idx], mp_hands.HAND_CONNECTIONS)
-
-                if label == 'Left':
-                    left_hand = landmarks - landmarks[0]
-                else:
-                    right_hand = landmarks - landmarks[0]
-
-        combined = np.concatenate([
-            face_landmarks.flatten(),
-            pose_landmarks.flatten(),
-            left_hand.flatten(),
-            right_hand.flatten()
-        ])
-
-        # --- Determine Status Text ---
-        display_text = "Gathering..."
-        if np.count_nonzero(combined) < 30:
-            display_text = "Low landmark data"
-            low_data_flag = True
-        else:
-            low_data_flag = False
-            buffer.append(combined)
-
-        # --- Predict ---
-        if not low_data_flag and len(buffer) == SEQUENCE_LENGTH:
-            input_seq = np.expand_dims(np.array(buffer), axis=0)
-
-            if input_seq.shape == (1, SEQUENCE_LENGTH, INPUT_DIM):
-                prediction = model.predict(input_seq, verbose=0)[0]
-                predicted_idx = np.argmax(prediction)
-                confidence = prediction[predicted_idx]
-
-                if confidence > CONFIDENCE_THRESHOLD:
-                    predicted_label = label_map.get(predicted_idx, "Unknown")
-                    display_text = f"{predicted_label} ({confidence:.2f})"
-                else:
-                    display_text = "Uncertain..."
+    stream_predictor = None
+    if USE_STREAMING:
+        from streaming_inference import StreamingSignPredictor
+        stream_predictor = StreamingSignPredictor(keras_model, SEQUENCE_LENGTH)
+
+    # Published last, so a loaded backend is always a warmed-up one
+    model, label_map, streamer, backend = keras_model, labels, stream_predictor, inference_backend
+    startup.mark(f'model_ready ({kind})')
+
+def start_warmup():
+    """Start loading the model on a background thread, e.g. while the camera opens"""
+    global warmup
+    if warmup is None and backend is None:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='warmup')
+        warmup = executor.submit(load_inference)
+        executor.shutdown(wait=False)
+
+def wait_for_inference():
+    """Block until the model is ready, loading it here if no warmup was started"""
+    if backend is not None:
+        return
+    if warmup is None:
+        load_inference()
+    else:
+        warmup.result()  # re-raises a failed load
+
+def make_extractor(gated):
+    if gated:
+        return GatedLandmarkExtractor(min_detection_confidence=0.5, profiler=profiler,
+                                      hand_scale=HAND_DETECT_SCALE, linger_frames=HAND_LINGER_FRAMES,
+                                      parallel=PARALLEL_LANDMARKS, idle_hand_stride=HAND_IDLE_STRIDE)
+    extractor_cls = ParallelLandmarkExtractor if PARALLEL_LANDMARKS else LandmarkExtractor
+    return extractor_cls(min_detection_confidence=0.5, profiler=profiler)
+
+def get_extractor():
+    """The landmark extractor, building the MediaPipe graphs on first use"""
+    global extractor
+    if extractor is None:
+        extractor = make_extractor(HAND_GATING)
+        startup.mark('landmarks_ready')
+    return extractor
+
+def close_extractor():
+    global extractor
+    if extractor is not None:
+        extractor.close()
+        extractor = None
+
+WINDOW_NAME = "Real-Time Sign Prediction"
+
+def get_decisions(num_classes):
+    """The smoothing/event engine, created once the number of classes is known"""
+    global decisions
+    if decisions is None:
+        decisions = SignDecisionEngine(num_classes, label_map, method=SMOOTHING, alpha=SMOOTHING_ALPHA,
+                                       window=SMOOTHING_WINDOW, on_threshold=CONFIDENCE_THRESHOLD,
+                                       off_threshold=RELEASE_THRESHOLD, min_frames=MIN_SIGN_FRAMES)
+    return decisions
+
+def run_inference(input_seq):
+    wait_for_inference()
+    with profiler.stage('inference'):
+        return backend.predict(input_seq)
+
+def update_prediction(buffer, combined):
+    """Buffer one frame of features and return (display_text, low_data_flag)"""
+    # --- Determine Status Text ---
+    display_text = "Gathering..."
+    if not has_enough_landmarks(combined):
+        display_text = "Low landmark data"
+        low_data_flag = True
+    else:
+        low_data_flag = False
+        buffer.append(combined)
+        if USE_STREAMING:
+            wait_for_inference()
+            with profiler.stage('inference'):
+                stream_prediction = streamer.update(combined)
+
+    # --- Predict ---
+    if not low_data_flag and len(buffer) == SEQUENCE_LENGTH:
+        input_seq = buffer.batch()
+
+        if input_seq.shape == (1, SEQUENCE_LENGTH, INPUT_DIM):
+            if USE_STREAMING:
+                prediction = stream_prediction
             else:
-                display_text = "Shape Mismatch"
-                buffer.clear()
-        elif not low_data_flag:
-            display_text = f"Gathering... ({len(buffer)}/{SEQUENCE_LENGTH})"
+                # Between scheduled inferences the last prediction is reused
+                prediction, _ = scheduler.step(combined, lambda: run_inference(input_seq))
+            engine = get_decisions(len(prediction))
+            event = engine.update(prediction, time.perf_counter() - STARTED)
+            if event is not None:
+                print(f"[sign] {event.label} {event.start:.2f}-{event.end:.2f}s "
+                      f"({event.frames} frames, peak {event.confidence:.2f})")
+            if 'first_prediction' not in startup:
+                startup.mark('first_prediction')
+                print("Cold start (seconds since launch):")
+                print(startup.format_report())
 
-        # --- Display Status ---
+            if engine.current is not None:
+                display_text = f"{engine.current} ({engine.current_score:.2f})"
+            else:
+                display_text = "Uncertain..."
+        else:
+            display_text = "Shape Mismatch"
+            buffer.clear()
+            scheduler.reset()
+            if streamer is not None:
+                streamer.reset()
+            if decisions is not None:
+                decisions.reset()
+    elif not low_data_flag:
+        display_text = f"Gathering... ({len(buffer)}/{SEQUENCE_LENGTH})"
+
+    return display_text, low_data_flag
+
+def show_frame(frame_output, display_text, low_data_flag):
+    """Overlay the status text and show the frame; return False when 'q' is pressed"""
+    with profiler.stage('overlay'):
         text_color = (0, 0, 255) if low_data_flag else (0, 0, 0)
         cv2.putText(frame_output, display_text, (20, 50),
                     cv2.FONT_HERSHEY_SIMPLEX, 1.2, text_color, 3, cv2.LINE_AA)
-        cv2.namedWindow("Real-Time Sign Prediction", cv2.WND_PROP_FULLSCREEN)
-        cv2.setWindowProperty("Real-Time Sign Prediction", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        if PROFILE_HUD:
+            profiler.draw_hud(frame_output)
+
+    with profiler.stage('display'):
+        cv2.namedWindow(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN)
+        cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
 
-        cv2.imshow("Real-Time Sign Prediction", frame_output)
+        cv2.imshow(WINDOW_NAME, frame_output)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        return not (cv2.waitKey(1) & 0xFF == ord('q'))
+
+def finish_profiling():
+    """Print the stage summary and write the trace, if profiling was on"""
+    if decisions is not None:
+        decisions.flush()
+        print(f"Signs recognized: {len(decisions.events)}")
+    if not USE_STREAMING and scheduler.frames:
+        stats = scheduler.stats()
+        print(f"Inference ran on {stats['inferences']}/{stats['frames']} full-window frames "
+              f"({100 * stats['compute_saved']:.1f}% compute saved)")
+    if not profiler.enabled:
+        return
+    print("Stage latency (last frames):")
+    print_profile(profiler)
+    if TRACE_PATH:
+        profiler.dump_trace(TRACE_PATH)
+        print(f"Chrome trace written to {TRACE_PATH}")
+
+def live_predict(source=1):
+    # The model loads while the camera opens and the MediaPipe graphs are built
+    start_warmup()
+    cap = cv2.VideoCapture(source)
+    startup.mark('camera_open')
+    landmarks = get_extractor()
+    buffer = SequenceRingBuffer(SEQUENCE_LENGTH, INPUT_DIM)
+    scheduler.reset()
+    if streamer is not None:
+        streamer.reset()
+
+    # Reused every frame; the ring buffer copies it in place
+    combined = np.empty(INPUT_DIM, dtype=np.float32)
+
+    while True:
+        with profiler.stage('frame'):
+            with profiler.stage('capture'):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            startup.mark('first_frame')
+
+            _, results = landmarks.extract(frame, out=combined)
+            with profiler.stage('draw'):
+                frame_output = frame.copy()
+                draw_results(frame_output, *results)
+
+            display_text, low_data_flag = update_prediction(buffer, combined)
+
+            # --- Display Status ---
+            keep_running = show_frame(frame_output, display_text, low_data_flag)
+        profiler.maybe_log(PROFILE_LOG_INTERVAL)
+        if not keep_running or (EXIT_AFTER_FIRST_PREDICTION and 'first_prediction' in startup):
             break
 
     # --- Cleanup ---
     cap.release()
     cv2.destroyAllWindows()
-    hands.close()
-    pose.close()
-    face.close()
+    close_extractor()
+    finish_profiling()
+
+def pipelined_predict(source=1, headless=False, queue_size=2, drop_oldest=True):
+    """Run capture, landmarks, inference and rendering as separate threaded stages.
+
+    With ``headless=True`` nothing is drawn, which together with a video file
+    as ``source`` and ``drop_oldest=False`` gives a repeatable benchmark.
+    """
+    start_warmup()
+    buffer = SequenceRingBuffer(SEQUENCE_LENGTH, INPUT_DIM)
+    scheduler.reset()
+    if streamer is not None:
+        streamer.reset()
+
+    def extract(packet):
+        startup.mark('first_frame')
+        packet.features, packet.results = get_extractor().extract(packet.frame)
+
+    def infer(packet):
+        packet.prediction = update_prediction(buffer, packet.features)
+        if EXIT_AFTER_FIRST_PREDICTION and 'first_prediction' in startup:
+            pipeline.stop()
+
+    def render(packet):
+        with profiler.stage('draw'):
+            draw_results(packet.frame, *packet.results)
+        keep_running = show_frame(packet.frame, *packet.prediction)
+        profiler.maybe_log(PROFILE_LOG_INTERVAL)
+        return keep_running
+
+    pipeline = SignPipeline(source, extract, infer, None if headless else render,
+                            queue_size=queue_size, drop_oldest=drop_oldest)
+    try:
+        pipeline.run()
+    finally:
+        if not headless:
+            cv2.destroyAllWindows()
+        close_extractor()
+
+    print("Pipeline stage statistics:")
+    print_stats(pipeline.stats())
+    finish_profiling()
+    return pipeline.stats()
+
+def main():
+    global MODEL_PATH, LABEL_MAP_PATH, TFLITE_MODEL_PATH, INFERENCE_BACKEND, HAND_GATING, HAND_DETECT_SCALE
+    global HAND_IDLE_STRIDE, PROFILE_HUD, PROFILE_LOG_INTERVAL, TRACE_PATH, EXIT_AFTER_FIRST_PREDICTION
+    global SMOOTHING, SMOOTHING_ALPHA
+
+    parser = argparse.ArgumentParser(description="Real-time sign prediction")
+    parser.add_argument('--pipeline', action='store_true', help="run the multi-threaded pipeline")
+    parser.add_argument('--source', default='1', help="camera index or video file")
+    parser.add_argument('--model', default=MODEL_PATH, help="Keras model")
+    parser.add_argument('--labels', default=LABEL_MAP_PATH, help="label mapping file")
+    parser.add_argument('--tflite-model', default=TFLITE_MODEL_PATH, help="TFLite model")
+    parser.add_argument('--backend', choices=('auto', 'keras', 'tflite'), default=INFERENCE_BACKEND,
+                        help="inference backend ('auto' prefers TFLite when the model exists)")
+    parser.add_argument('--cold-start', action='store_true',
+                        help="exit after the first prediction, once the cold-start timeline is printed")
+    parser.add_argument('--headless', action='store_true', help="do not render frames (pipeline mode)")
+    parser.add_argument('--no-drop', action='store_true', help="process every frame instead of dropping stale ones")
+    parser.add_argument('--profile', action='store_true', help="time each stage and print a summary on exit")
+    parser.add_argument('--hud', action='store_true', help="draw per-stage latency on the frame")
+    parser.add_argument('--log-interval', type=float, default=PROFILE_LOG_INTERVAL,
+                        help="seconds between profile log lines (0 disables)")
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT, help="serve Prometheus /metrics")
+    parser.add_argument('--metrics-host', default=METRICS_HOST,
+                        help="interface for /metrics ('0.0.0.0' to expose it)")
+    parser.add_argument('--trace', default=TRACE_PATH, help="write a Chrome trace JSON to this path")
+    parser.add_argument('--stride', type=int, default=INFERENCE_STRIDE,
+                        help="run the model at least every Nth frame")
+    parser.add_argument('--motion-threshold', type=float, default=MOTION_THRESHOLD,
+                        help="hand motion (L2) that triggers inference before the stride (negative disables)")
+    parser.add_argument('--smoothing', choices=SMOOTHING_METHODS, default=SMOOTHING,
+                        help="temporal smoothing of predictions before signs are reported")
+    parser.add_argument('--alpha', type=float, default=SMOOTHING_ALPHA, help="EMA weight of the newest prediction")
+    parser.add_argument('--gate-hands', action='store_true',
+                        help="skip Pose/FaceMesh while no hand is in view")
+    parser.add_argument('--hand-scale', type=float, default=HAND_DETECT_SCALE,
+                        help="hand detector input scale when gating")
+    parser.add_argument('--idle-stride', type=int, default=HAND_IDLE_STRIDE,
+                        help="while idle, look for hands only every Nth frame (gating)")
+    args = parser.parse_args()
+
+    MODEL_PATH, LABEL_MAP_PATH, TFLITE_MODEL_PATH = args.model, args.labels, args.tflite_model
+    INFERENCE_BACKEND = args.backend
+    EXIT_AFTER_FIRST_PREDICTION = args.cold_start
+    SMOOTHING, SMOOTHING_ALPHA = args.smoothing, args.alpha
+    HAND_GATING = HAND_GATING or args.gate_hands
+    HAND_DETECT_SCALE = args.hand_scale
+    HAND_IDLE_STRIDE = args.idle_stride
+
+    scheduler.stride = args.stride
+    motion_threshold = args.motion_threshold
+    scheduler.motion_threshold = motion_threshold if motion_threshold is not None and motion_threshold >= 0 else None
+
+    PROFILE_HUD = PROFILE_HUD or args.hud
+    PROFILE_LOG_INTERVAL = args.log_interval
+    TRACE_PATH = args.trace
+    profiler.enabled = (PROFILE or args.profile or args.hud or bool(args.log_interval)
+                        or args.metrics_port is not None or bool(args.trace))
+    profiler.trace = bool(args.trace)
+    if args.metrics_port is not None:
+        profiler.serve_prometheus(args.metrics_port, args.metrics_host)
+        print(f"Serving metrics on http://{args.metrics_host}:{args.metrics_port}/metrics")
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    if args.pipeline:
+        pipelined_predict(source, headless=args.headless, drop_oldest=not args.no_drop)
+    else:
+        live_predict(source)
 
 if __name__ == "__main__":
-    live_predict()
+    main()
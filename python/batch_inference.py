@@ -0,0 +1,254 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+EVENT_COLUMNS = ['video', 'class_index', 'label', 'start_frame', 'end_frame', 'frames', 'confidence']
+
+# One extractor (and optional feature cache) per worker process, created by _init_worker
+_worker_extractor = None
+_worker_cache = None
+
+
+def _init_worker(min_detection_confidence: float, cache_dir: Optional[str], cache_max_bytes: int):
+    global _worker_extractor, _worker_cache
+    from landmark_features import LandmarkExtractor
+    _worker_extractor = LandmarkExtractor(min_detection_confidence)
+    if cache_dir:
+        from feature_cache import FeatureCache, extractor_config
+        _worker_cache = FeatureCache(cache_dir, cache_max_bytes, extractor_config(min_detection_confidence))
+
+
+def _extract_worker(video_path: str) -> Tuple[str, np.ndarray, float]:
+    from landmark_features import extract_video_features
+    start = time.perf_counter()
+    if _worker_cache is not None:
+        features = np.asarray(_worker_cache.get_or_extract(video_path, extractor=_worker_extractor))
+    else:
+        features = extract_video_features(video_path, extractor=_worker_extractor)
+    return video_path, features, time.perf_counter() - start
+
+
+def find_videos(directory: str) -> List[str]:
+    """All video files below ``directory``, sorted for reproducible output"""
+    videos = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.join(root, name))
+    return sorted(videos)
+
+
+def sliding_windows(features: np.ndarray, sequence_length: int = 30,
+                    stride: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Windows over the frames with enough landmark data, like the live predictor buffers them.
+
+    Returns (windows, start_frames, end_frames). ``windows`` is a strided
+    view, so no per-window copies are made until a batch is fed to the model.
+    """
+    from landmark_features import MIN_NONZERO_FEATURES
+
+    frame_ids = np.flatnonzero(np.count_nonzero(features, axis=1) >= MIN_NONZERO_FEATURES)
+    if len(frame_ids) < sequence_length:
+        empty = np.empty(0, dtype=np.int64)
+        return np.empty((0, sequence_length, features.shape[1]), dtype=np.float32), empty, empty
+
+    valid = features[frame_ids]
+    windows = np.lib.stride_tricks.sliding_window_view(valid, sequence_length, axis=0)
+    windows = windows.transpose(0, 2, 1)[::stride]
+    starts = frame_ids[:len(frame_ids) - sequence_length + 1][::stride]
+    ends = frame_ids[sequence_length - 1:][::stride]
+    return windows, starts, ends
+
+
+class BatchInferenceEngine:
+    """Headless landmark extraction and windowed inference over many videos.
+
+    Videos are decoded and run through MediaPipe in a process pool, going
+    through the on-disk FeatureCache when ``cache_dir`` is set. As each
+    video's features arrive, all of its sliding windows are scored in large
+    batches on the main process, overlapping inference with extraction.
+    The window predictions are then smoothed into sign events by the same
+    SignDecisionEngine the live predictor uses, configured by ``smoothing``
+    (its keyword arguments), or, with ``decoder='beam'``, segmented into a
+    sign sequence by StreamingSignDecoder (configured by ``decoding``).
+    """
+
+    def __init__(self, model, label_map: Optional[Dict[int, str]] = None,
+                 sequence_length: int = 30, stride: int = 1, batch_size: int = 256,
+                 workers: Optional[int] = None, min_detection_confidence: float = 0.5,
+                 cache_dir: Optional[str] = None, cache_max_bytes: int = 2 << 30,
+                 smoothing: Optional[Dict] = None, decoder: str = 'events',
+                 decoding: Optional[Dict] = None):
+        import tensorflow as tf
+        self.model = tf.keras.models.load_model(model) if isinstance(model, str) else model
+        self.label_map = label_map or {}
+        self.sequence_length = sequence_length
+        self.stride = stride
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.min_detection_confidence = min_detection_confidence
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.smoothing = smoothing or {}
+        self.decoder = decoder
+        self.decoding = decoding or {}
+        self.events = pd.DataFrame(columns=EVENT_COLUMNS)
+        self.stats = {}
+
+    def predict_windows(self, windows: np.ndarray) -> np.ndarray:
+        """Class probabilities for (N, frames, features) windows, batched"""
+        outputs = []
+        for start in range(0, len(windows), self.batch_size):
+            batch = np.ascontiguousarray(windows[start:start + self.batch_size], dtype=np.float32)
+            outputs.append(self.model.predict_on_batch(batch))
+        return np.concatenate(outputs) if outputs else np.empty((0, self.model.output_shape[-1]))
+
+    def _video_events(self, video_path: str, probabilities: np.ndarray, ends: np.ndarray) -> pd.DataFrame:
+        """Sign events of one video, timestamped by the windows' last frames"""
+        if self.decoder == 'beam':
+            from sequence_decoder import StreamingSignDecoder
+            events = StreamingSignDecoder(probabilities.shape[1], self.label_map,
+                                          **self.decoding).decode(probabilities, ends)
+        else:
+            from sign_events import SignDecisionEngine
+            engine = SignDecisionEngine(probabilities.shape[1], self.label_map, **self.smoothing)
+            events = engine.run(probabilities, ends)
+        return pd.DataFrame([{
+            'video': video_path,
+            'class_index': event.class_index,
+            'label': event.label,
+            'start_frame': int(event.start),
+            'end_frame': int(event.end),
+            'frames': event.frames,
+            'confidence': event.confidence,
+        } for event in events], columns=EVENT_COLUMNS)
+
+    def _score_video(self, video_path: str, features: np.ndarray) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        windows, starts, ends = sliding_windows(features, self.sequence_length, self.stride)
+        probabilities = self.predict_windows(windows)
+        class_ids = probabilities.argmax(axis=1) if len(probabilities) else np.empty(0, dtype=np.int64)
+        events = self._video_events(video_path, probabilities, ends)
+        return pd.DataFrame({
+            'video': video_path,
+            'start_frame': starts,
+            'end_frame': ends,
+            'class_index': class_ids,
+            'label': [self.label_map.get(int(i), "Unknown") for i in class_ids],
+            'confidence': probabilities[np.arange(len(class_ids)), class_ids] if len(class_ids) else [],
+        }), events
+
+    def run(self, videos: List[str]) -> pd.DataFrame:
+        """Extract, score and collect per-window predictions for every video"""
+        frames = 0
+        extraction_time = 0.0
+        inference_time = 0.0
+        tables = []
+        event_tables = []
+        start = time.perf_counter()
+
+        # spawn keeps MediaPipe/TensorFlow state from leaking into the workers
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(self.min_detection_confidence, self.cache_dir,
+                                           self.cache_max_bytes)) as pool:
+            futures = [pool.submit(_extract_worker, path) for path in videos]
+            for future in as_completed(futures):
+                video_path, features, elapsed = future.result()
+                frames += len(features)
+                extraction_time += elapsed
+
+                infer_start = time.perf_counter()
+                predictions, events = self._score_video(video_path, features)
+                tables.append(predictions)
+                event_tables.append(events)
+                inference_time += time.perf_counter() - infer_start
+                print(f"  {os.path.basename(video_path)}: {len(features)} frames, "
+                      f"{len(predictions)} windows, {len(events)} signs")
+
+        wall = time.perf_counter() - start
+        windows = sum(len(table) for table in tables)
+        self.stats = {
+            'videos': len(videos),
+            'frames': frames,
+            'windows': windows,
+            'signs': sum(len(table) for table in event_tables),
+            'wall_seconds': wall,
+            'workers': self.workers,
+            'fps': frames / wall if wall > 0 else 0.0,
+            'fps_per_core': frames / wall / self.workers if wall > 0 else 0.0,
+            'extraction_fps_per_core': frames / extraction_time if extraction_time > 0 else 0.0,
+            'inference_windows_per_second': windows / inference_time if inference_time > 0 else 0.0,
+        }
+
+        if event_tables:
+            self.events = pd.concat(event_tables, ignore_index=True).sort_values(['video', 'start_frame'],
+                                                                                 ignore_index=True)
+        if not tables:
+            return pd.DataFrame(columns=['video', 'start_frame', 'end_frame', 'class_index', 'label', 'confidence'])
+        return pd.concat(tables, ignore_index=True).sort_values(['video', 'start_frame'], ignore_index=True)
+
+
+def write_predictions(predictions: pd.DataFrame, output_path: str):
+    """Write predictions as Parquet (default) or CSV, chosen by file extension"""
+    if output_path.endswith('.csv'):
+        predictions.to_csv(output_path, index=False)
+    else:
+        predictions.to_parquet(output_path, index=False)
+
+
+def main():
+    """Batch inference over a directory of videos"""
+    from inference_backends import load_label_map
+    from sign_events import SMOOTHING_METHODS
+
+    parser = argparse.ArgumentParser(description="Offline batch sign inference over video files")
+    parser.add_argument('video_dir')
+    parser.add_argument('--model', default='best_model2.keras')
+    parser.add_argument('--labels', default='label_mapping2.txt')
+    parser.add_argument('--output', default='predictions.parquet')
+    parser.add_argument('--stride', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-dir', default='feature_cache', help="landmark feature cache ('' to disable)")
+    parser.add_argument('--events', default='sign_events.csv', help="where to write the smoothed sign events")
+    parser.add_argument('--smoothing', choices=SMOOTHING_METHODS, default='ema')
+    parser.add_argument('--decoder', choices=('events', 'beam'), default='events',
+                        help="smoothed event detection or beam-search sequence decoding")
+    parser.add_argument('--prior', help="text file of sign sentences (one per line) for a bigram prior")
+    args = parser.parse_args()
+
+    print("Batch Sign Inference")
+    print("=" * 40)
+
+    videos = find_videos(args.video_dir)
+    print(f"Found {len(videos)} videos in {args.video_dir}")
+
+    label_map = load_label_map(args.labels) if os.path.exists(args.labels) else {}
+    decoding = {}
+    if args.prior:
+        from sequence_decoder import NGramPrior
+        decoding['prior'] = NGramPrior.from_text(args.prior, label_map)
+    engine = BatchInferenceEngine(args.model, label_map, stride=args.stride,
+                                  batch_size=args.batch_size, workers=args.workers,
+                                  cache_dir=args.cache_dir or None, smoothing={'method': args.smoothing},
+                                  decoder=args.decoder, decoding=decoding)
+    predictions = engine.run(videos)
+    write_predictions(predictions, args.output)
+    write_predictions(engine.events, args.events)
+
+    print(f"\nWrote {len(predictions)} window predictions to {args.output}")
+    print(f"Wrote {len(engine.events)} sign events to {args.events}")
+    for key, value in engine.stats.items():
+        print(f"  {key}: {value:.2f}" if isinstance(value, float) else f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from landmark_features import FEATURE_DIM
+from timing import time_calls
+
+SEQUENCE_LENGTH = 30
+BASELINE_PATH = 'benchmark_baseline.json'
+# Latency statistics checked against the baseline
+COMPARED_STATS = ('p50_ms', 'p95_ms')
+
+
+def load_frames(video_path: Optional[str], max_frames: int = 120,
+                shape=(480, 640, 3), seed: int = 0) -> List[np.ndarray]:
+    """Frames from a recorded clip, or random frames of the camera's size without one"""
+    if video_path:
+        import cv2
+        cap = cv2.VideoCapture(video_path)
+        frames = []
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if not frames:
+            raise ValueError(f"No frames could be read from {video_path}")
+        return frames
+
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(min(max_frames, 30))]
+
+
+def bench_feature_conversion(iterations: int = 2000) -> Dict[str, float]:
+    """MediaPipe results -> 171-dim feature vector"""
+    from landmark_features import _synthetic_results, build_feature_vector
+
+    results = _synthetic_results(np.random.default_rng(0))
+    out = np.empty(FEATURE_DIM, dtype=np.float32)
+    return time_calls(lambda i: build_feature_vector(*results, out=out), iterations, warmup=50)
+
+
+def bench_extraction(frames: List[np.ndarray], parallel: bool = False) -> Dict[str, float]:
+    """Full per-frame MediaPipe extraction (Hands + Pose + FaceMesh)"""
+    from landmark_features import LandmarkExtractor, ParallelLandmarkExtractor
+
+    extractor = ParallelLandmarkExtractor() if parallel else LandmarkExtractor()
+    try:
+        return time_calls(lambda i: extractor.extract(frames[i % len(frames)]), len(frames), warmup=3)
+    finally:
+        extractor.close()
+
+
+def bench_sequence_buffer(iterations: int = 20000) -> Dict[str, float]:
+    """Append one frame and read the contiguous window, as the live loop does"""
+    from sequence_buffer import SequenceRingBuffer
+
+    buffer = SequenceRingBuffer(SEQUENCE_LENGTH, FEATURE_DIM)
+    frames = np.random.default_rng(0).random((64, FEATURE_DIM), dtype=np.float32)
+
+    def step(i):
+        buffer.append(frames[i % len(frames)])
+        return buffer.batch()
+
+    return time_calls(step, iterations, warmup=SEQUENCE_LENGTH)
+
+
+def bench_backend(backend, iterations: int = 200) -> Dict[str, float]:
+    """Single-window inference through an inference backend"""
+    windows = np.random.default_rng(0).random((8, 1, SEQUENCE_LENGTH, FEATURE_DIM), dtype=np.float32)
+    return time_calls(lambda i: backend.predict(windows[i % len(windows)]), iterations, warmup=10)
+
+
+def bench_tflite_load(tflite_path: str, iterations: int = 20) -> Dict[str, float]:
+    """Interpreter construction, allocation and first invoke (the test_tflite_model path)"""
+    import tensorflow as tf
+
+    window = np.random.default_rng(0).random((1, SEQUENCE_LENGTH, FEATURE_DIM), dtype=np.float32)
+    input_details = tf.lite.Interpreter(model_path=tflite_path).get_input_details()[0]
+    if np.issubdtype(input_details['dtype'], np.integer):
+        # Full-integer (int8) models expect quantized input
+        scale, zero_point = input_details['quantization']
+        info = np.iinfo(input_details['dtype'])
+        window = np.clip(np.round(window / scale + zero_point), info.min, info.max).astype(input_details['dtype'])
+
+    def load_and_invoke(i):
+        interpreter = tf.lite.Interpreter(model_path=tflite_path)
+        interpreter.allocate_tensors()
+        input_details = interpreter.get_input_details()[0]
+        interpreter.set_tensor(input_details['index'], window)
+        interpreter.invoke()
+        return interpreter.get_tensor(interpreter.get_output_details()[0]['index'])
+
+    return time_calls(load_and_invoke, iterations, warmup=1)
+
+
+def bench_streaming(model, iterations: int = 500) -> Dict[str, float]:
+    """One StreamingSignPredictor.update per frame"""
+    from streaming_inference import StreamingSignPredictor
+
+    streamer = StreamingSignPredictor(model, SEQUENCE_LENGTH)
+    frames = np.cumsum(np.random.default_rng(0).normal(0.0, 0.02, (iterations + SEQUENCE_LENGTH, FEATURE_DIM)),
+                       axis=0).astype(np.float32)
+    return time_calls(lambda i: streamer.update(frames[i]), iterations, warmup=SEQUENCE_LENGTH)
+
+
+def bench_end_to_end(frames: List[np.ndarray], backend) -> Dict[str, float]:
+    """Per-frame extraction, buffering and inference, predicting on every frame once the window is full"""
+    from landmark_features import LandmarkExtractor
+    from sequence_buffer import SequenceRingBuffer
+
+    extractor = LandmarkExtractor()
+    buffer = SequenceRingBuffer(SEQUENCE_LENGTH, FEATURE_DIM)
+    # Pre-fill so every timed frame pays for inference, the worst case of the live loop
+    for _ in range(SEQUENCE_LENGTH):
+        buffer.append(np.zeros(FEATURE_DIM, dtype=np.float32))
+
+    def step(i):
+        features, _ = extractor.extract(frames[i % len(frames)])
+        buffer.append(features)
+        return backend.predict(buffer.batch())
+
+    try:
+        return time_calls(step, len(frames), warmup=3)
+    finally:
+        extractor.close()
+
+
+def _load_or_build_model(model_path: Optional[str]):
+    import tensorflow as tf
+    if model_path and os.path.exists(model_path):
+        return tf.keras.models.load_model(model_path)
+    print("No trained model found, benchmarking an untrained model with the same shape")
+    from train_model import SignLanguageModelTrainer
+    return SignLanguageModelTrainer().create_model(num_classes=8, input_dim=FEATURE_DIM)
+
+
+def _convert_for_benchmark(model, output_dir: str) -> str:
+    from convert_to_tflite import apply_quantization, keras_to_tflite_converter
+    converter = keras_to_tflite_converter(model)
+    apply_quantization(converter, 'dynamic')
+    path = os.path.join(output_dir, 'benchmark.tflite')
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    return path
+
+
+def run_benchmarks(model_path: Optional[str] = 'best_model2.keras', tflite_path: Optional[str] = None,
+                   video_path: Optional[str] = None, max_frames: int = 120,
+                   num_threads: Optional[int] = None,
+                   only: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """Run every benchmark (or the ``only`` subset) and return stats keyed by benchmark name"""
+    from inference_backends import KerasBackend, TFLiteBackend
+
+    model = _load_or_build_model(model_path)
+    frames = load_frames(video_path, max_frames)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not (tflite_path and os.path.exists(tflite_path)):
+            tflite_path = _convert_for_benchmark(model, tmp_dir)
+        keras_backend = KerasBackend(model)
+        tflite_backend = TFLiteBackend(tflite_path, num_threads=num_threads)
+
+        benchmarks = {
+            'feature_conversion': lambda: bench_feature_conversion(),
+            'extraction_serial': lambda: bench_extraction(frames),
+            'extraction_parallel': lambda: bench_extraction(frames, parallel=True),
+            'sequence_buffer': lambda: bench_sequence_buffer(),
+            'keras_predict': lambda: bench_backend(keras_backend, iterations=50),
+            'tflite_predict': lambda: bench_backend(tflite_backend),
+            'tflite_load': lambda: bench_tflite_load(tflite_path),
+            'streaming_update': lambda: bench_streaming(model),
+            'end_to_end_tflite': lambda: bench_end_to_end(frames, tflite_backend),
+        }
+        for name, bench in benchmarks.items():
+            if only and name not in only:
+                continue
+            print(f"  running {name}...")
+            results[name] = bench()
+
+    return results
+
+
+def benchmark_report(results: Dict[str, Dict[str, float]], video_path: Optional[str]) -> Dict:
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'frames': video_path or 'synthetic',
+        },
+        'results': results,
+    }
+
+
+def compare_to_baseline(results: Dict[str, Dict[str, float]], baseline: Dict,
+                        tolerance: float = 0.2) -> List[Dict]:
+    """Benchmarks whose p50/p95 grew more than ``tolerance`` (relative) over the baseline"""
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            continue
+        for key in COMPARED_STATS:
+            if reference.get(key, 0) <= 0:
+                continue
+            change = stats[key] / reference[key] - 1.0
+            if change > tolerance:
+                regressions.append({'benchmark': name, 'stat': key, 'baseline': reference[key],
+                                    'current': stats[key], 'change': change})
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Optional[Dict] = None):
+    print(f"{'benchmark':<22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'fps':>10} {'vs base p50':>12}")
+    for name, stats in results.items():
+        reference = (baseline or {}).get('results', {}).get(name)
+        delta = f"{100 * (stats['p50_ms'] / reference['p50_ms'] - 1):+.1f}%" if reference else ''
+        print(f"{name:<22} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f} "
+              f"{stats['fps']:>10.1f} {delta:>12}")
+
+
+def main():
+    """Run the suite, write JSON, and fail on regressions against the stored baseline"""
+    import sys
+
+    parser = argparse.ArgumentParser(description="Latency/throughput benchmarks for the sign recognition path")
+    parser.add_argument('--model', default='best_model2.keras')
+    parser.add_argument('--tflite', default='model.tflite')
+    parser.add_argument('--video', default=None, help="recorded clip for the extraction benchmarks")
+    parser.add_argument('--max-frames', type=int, default=120)
+    parser.add_argument('--threads', type=int, default=None, help="TFLite interpreter threads")
+    parser.add_argument('--only', nargs='+', default=None, help="benchmark names to run")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative p50/p95 increase")
+    args = parser.parse_args()
+
+    print("Sign Recognition Benchmark Suite")
+    print("=" * 40)
+
+    results = run_benchmarks(args.model, args.tflite, args.video, args.max_frames, args.threads, args.only)
+    report = benchmark_report(results, args.video)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    print()
+    print_results(results, baseline)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {100 * args.tolerance:.0f}%:")
+        for r in regressions:
+            print(f"  {r['benchmark']} {r['stat']}: {r['baseline']:.3f} -> {r['current']:.3f} ms "
+                  f"({100 * r['change']:+.1f}%)")
+        sys.exit(1)
+    print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,109 @@
-import tensorflow as tf
 import numpy as np
 import json
-from typing import Tuple, Dict, Any
+import os
+import time
+from typing import Tuple, Dict, Any, Optional, Callable, List
+
+QUANTIZATION_MODES = ('float32', 'float16', 'dynamic', 'int8')
+# float16 conversion of the LSTM model does not finish in the MLIR converter,
+# so it is left out of the defaults and only runs when asked for explicitly
+DEFAULT_QUANTIZATION = 'dynamic'
+REPORT_MODES = ('float32', 'dynamic', 'int8')
+
+# TensorFlow is imported inside the functions that convert, so that loading
+# and running a .tflite model does not pay for the full TensorFlow import
+
+
+def keras_to_tflite_converter(model: 'tf.keras.Model') -> 'tf.lite.TFLiteConverter':
+    """Build a TFLite converter for a sequence model with a fixed batch size of 1.
+
+    Converting straight from the Keras model keeps a dynamic batch dimension,
+    which the LSTM lowering cannot handle. Tracing a batch-1 concrete
+    function yields the fused builtin LSTM op instead.
+    """
+    import tensorflow as tf
+
+    input_shape = [1] + list(model.input_shape[1:])
+    run_model = tf.function(lambda x: model(x, training=False))
+    concrete_func = run_model.get_concrete_function(
+        tf.TensorSpec(input_shape, model.inputs[0].dtype)
+    )
+    return tf.lite.TFLiteConverter.from_concrete_functions([concrete_func], model)
+
+
+def representative_dataset(sequences: np.ndarray, num_samples: int = 200,
+                           seed: int = 0) -> Callable:
+    """Build a representative_dataset generator from (N, frames, features) windows.
+
+    ``sequences`` may be a memory-mapped array; only the sampled windows are
+    read, one at a time.
+    """
+    def generator():
+        rng = np.random.default_rng(seed)
+        count = min(num_samples, len(sequences))
+        for i in rng.choice(len(sequences), size=count, replace=False):
+            yield [np.asarray(sequences[i:i + 1], dtype=np.float32)]
+    
+    return generator
+
+
+def apply_quantization(converter: 'tf.lite.TFLiteConverter', mode: str,
+                       representative_data: Optional[Callable] = None):
+    """Configure a converter for one of QUANTIZATION_MODES"""
+    import tensorflow as tf
+
+    if mode == 'float32':
+        return
+    if mode == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == 'dynamic':
+        # Int8 weights, float activations; no calibration data needed
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif mode == 'int8':
+        if representative_data is None:
+            raise ValueError("int8 quantization needs a representative dataset")
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_data
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    else:
+        raise ValueError(f"Unknown quantization mode '{mode}', expected one of {QUANTIZATION_MODES}")
+
+
+def load_interpreter(model_path: str, num_threads: Optional[int] = None):
+    """A TFLite interpreter from the lightest runtime that is installed.
+
+    The standalone LiteRT (``ai_edge_litert``) and ``tflite_runtime`` wheels
+    import in a fraction of the time full TensorFlow takes and expose the
+    same Interpreter API; ``tf.lite`` is the fallback.
+    """
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
 
 class TensorFlowLiteConverter:
     def __init__(self):
         self.interpreter = None
         self.input_details = None
         self.output_details = None
+        self._input_tensor = None
+        self._output_tensor = None
         
-    def convert_model_to_tflite(self, model_path: str, output_path: str = 'model.tflite') -> bool:
+    def convert_model_to_tflite(self, model_path: str, output_path: str = 'model.tflite',
+                                quantization: str = DEFAULT_QUANTIZATION,
+                                representative_data: Optional[Callable] = None) -> bool:
         """Convert Keras model to TensorFlow Lite"""
+        import tensorflow as tf
+
         try:
             # Load the Keras model
             print(f"Loading model from {model_path}...")
@@ -18,11 +111,10 @@ class TensorFlowLiteConverter:
             
             # Convert to TFLite
             print("Converting to TensorFlow Lite...")
-            converter = tf.lite.TFLiteConverter.from_keras_model(model)
+            converter = keras_to_tflite_converter(model)
             
             # Optimize for mobile devices
-            converter.optimizations = [tf.lite.Optimize.DEFAULT]
-            converter.target_spec.supported_types = [tf.float16]
+            apply_quantization(converter, quantization, representative_data)
             
             # Convert
             tflite_model = converter.convert()
@@ -38,15 +130,20 @@ class TensorFlowLiteConverter:
             print(f"Error converting model: {e}")
             return False
     
-    def load_tflite_model(self, model_path: str) -> bool:
+    def load_tflite_model(self, model_path: str, num_threads: Optional[int] = None) -> bool:
         """Load TensorFlow Lite model"""
         try:
-            self.interpreter = tf.lite.Interpreter(model_path=model_path)
+            self.interpreter = load_interpreter(model_path, num_threads=num_threads)
             self.interpreter.allocate_tensors()
             
             self.input_details = self.interpreter.get_input_details()
             self.output_details = self.interpreter.get_output_details()
             
+            # Accessors for the interpreter-owned buffers, so inputs can be
+            # written in place instead of going through set_tensor copies
+            self._input_tensor = self.interpreter.tensor(self.input_details[0]['index'])
+            self._output_tensor = self.interpreter.tensor(self.output_details[0]['index'])
+            
             print(f"TFLite model loaded from {model_path}")
             print(f"Input shape: {self.input_details[0]['shape']}")
             print(f"Output shape: {self.output_details[0]['shape']}")
@@ -67,14 +164,7 @@ class TensorFlowLiteConverter:
             print(f"Reshaping input from {input_data.shape} to {expected_shape}")
             input_data = input_data.reshape(expected_shape)
         
-        # Set input tensor
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_data.astype(np.float32))
-        
-        # Run inference
-        self.interpreter.invoke()
-        
-        # Get output
-        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
+        output_data = self.predict_probabilities(input_data)[np.newaxis]
         
         # Get prediction and confidence
         predicted_class = np.argmax(output_data[0])
@@ -82,6 +172,39 @@ class TensorFlowLiteConverter:
         
         return output_data, confidence
     
+    def predict_probabilities(self, input_data: np.ndarray) -> np.ndarray:
+        """Run one window through the interpreter and return the first output row.
+
+        The window is written directly into the interpreter's input buffer
+        (casting if needed), so no intermediate arrays are allocated.
+        """
+        if self.interpreter is None:
+            raise ValueError("No TFLite model loaded")
+        
+        input_detail = self.input_details[0]
+        output_detail = self.output_details[0]
+        input_data = input_data.reshape(input_detail['shape'])
+        
+        # Full-integer models take and return quantized tensors
+        if np.issubdtype(input_detail['dtype'], np.integer):
+            scale, zero_point = input_detail['quantization']
+            info = np.iinfo(input_detail['dtype'])
+            input_data = np.clip(np.round(input_data / scale + zero_point), info.min, info.max)
+        
+        # The fused LSTM keeps its state in variable tensors that survive
+        # invoke(); every window must start from zero state
+        self.interpreter.reset_all_variables()
+        
+        # The views must not outlive invoke(), so they are re-fetched per call
+        self._input_tensor()[...] = input_data
+        self.interpreter.invoke()
+        output_data = self._output_tensor()[0]
+        
+        if np.issubdtype(output_detail['dtype'], np.integer):
+            scale, zero_point = output_detail['quantization']
+            return (output_data.astype(np.float32) - zero_point) * scale
+        return output_data.copy()
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the loaded model"""
         if self.interpreter is None:
@@ -96,19 +219,135 @@ class TensorFlowLiteConverter:
             "num_outputs": len(self.output_details)
         }
 
+def compare_quantization_modes(model_path: str, sequences: np.ndarray,
+                               labels: Optional[np.ndarray] = None,
+                               output_dir: str = 'quantized',
+                               modes: Tuple[str, ...] = REPORT_MODES,
+                               num_eval: int = 500, num_threads: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Convert every quantization mode and report size, latency and accuracy.
+
+    Accuracy is measured against ``labels`` when given (class indices) and
+    always as top-1 agreement with the original Keras model.
+    """
+    import tensorflow as tf
+
+    os.makedirs(output_dir, exist_ok=True)
+    model = tf.keras.models.load_model(model_path)
+    
+    eval_x = np.asarray(sequences[:num_eval], dtype=np.float32)
+    reference = model.predict(eval_x, verbose=0)
+    reference_top1 = reference.argmax(axis=1)
+    reference_accuracy = float(np.mean(reference_top1 == labels[:num_eval])) if labels is not None else None
+    calibration = representative_dataset(sequences)
+    
+    report = {}
+    for mode in modes:
+        output_path = os.path.join(output_dir, f"model_{mode}.tflite")
+        converter = keras_to_tflite_converter(model)
+        try:
+            apply_quantization(converter, mode, calibration)
+            with open(output_path, 'wb') as f:
+                f.write(converter.convert())
+        except Exception as e:
+            report[mode] = {"error": str(e)}
+            continue
+        
+        runner = TensorFlowLiteConverter()
+        runner.load_tflite_model(output_path, num_threads=num_threads)
+        
+        outputs = np.empty_like(reference)
+        start = time.perf_counter()
+        for i in range(len(eval_x)):
+            outputs[i] = runner.predict_probabilities(eval_x[i])
+        latency_ms = 1000 * (time.perf_counter() - start) / len(eval_x)
+        
+        top1 = outputs.argmax(axis=1)
+        entry = {
+            "size_kb": os.path.getsize(output_path) / 1024,
+            "latency_ms": latency_ms,
+            "agreement": float(np.mean(top1 == reference_top1)),
+            "max_prob_delta": float(np.abs(outputs - reference).max()),
+        }
+        if labels is not None:
+            entry["accuracy"] = float(np.mean(top1 == labels[:num_eval]))
+            entry["accuracy_delta"] = entry["accuracy"] - reference_accuracy
+        report[mode] = entry
+    
+    with open(os.path.join(output_dir, 'quantization_report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    return report
+
+
+def print_quantization_report(report: Dict[str, Dict[str, Any]]):
+    """Print the output of compare_quantization_modes as a table"""
+    print(f"{'mode':<9} {'size KB':>9} {'ms/window':>10} {'agree':>7} {'acc':>7} {'acc delta':>10}")
+    for mode, entry in report.items():
+        if "error" in entry:
+            print(f"{mode:<9} failed: {entry['error'].splitlines()[0]}")
+            continue
+        accuracy = f"{entry['accuracy']:.4f}" if "accuracy" in entry else "-"
+        delta = f"{entry['accuracy_delta']:+.4f}" if "accuracy_delta" in entry else "-"
+        print(f"{mode:<9} {entry['size_kb']:>9.1f} {entry['latency_ms']:>10.3f} "
+              f"{entry['agreement']:>7.4f} {accuracy:>7} {delta:>10}")
+
+
+def load_calibration_data(sequences_path: Optional[str], feature_dim: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Recorded (N, frames, features) windows from a .npy file, or synthetic ones.
+
+    A ``<name>_labels.npy`` file next to the sequences is picked up as labels.
+    Synthetic data only exists for the 63-feature hand model.
+    """
+    if sequences_path:
+        sequences = np.load(sequences_path, mmap_mode='r')
+        labels_path = sequences_path.replace('.npy', '_labels.npy')
+        labels = np.load(labels_path) if os.path.exists(labels_path) else None
+        return sequences, labels
+    
+    from train_model import SignLanguageModelTrainer
+    trainer = SignLanguageModelTrainer()
+    if feature_dim != trainer.num_landmarks * trainer.num_features:
+        raise ValueError(f"No synthetic data for {feature_dim} features, pass recorded sequences")
+    return trainer.generate_synthetic_data(num_samples=1000, seed=0)
+
+
 def main():
     """Main conversion function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="TensorFlow Lite model converter")
+    parser.add_argument('--model', default='best_model2.keras')
+    parser.add_argument('--output', default='model.tflite')
+    parser.add_argument('--quantization', choices=QUANTIZATION_MODES, default=DEFAULT_QUANTIZATION,
+                        help="float16 is not supported for the LSTM model (conversion does not finish)")
+    parser.add_argument('--sequences', help="(N, frames, features) .npy file used for calibration and evaluation")
+    parser.add_argument('--report', action='store_true', help="compare all quantization modes")
+    args = parser.parse_args()
+    
+    if args.report or args.quantization == 'int8':
+        import tensorflow as tf
+        feature_dim = tf.keras.models.load_model(args.model).input_shape[-1]
+        sequences, labels = load_calibration_data(args.sequences, feature_dim)
+    
+    if args.report:
+        print("Quantization Report")
+        print("=" * 40)
+        report = compare_quantization_modes(args.model, sequences, labels)
+        print_quantization_report(report)
+        return
+    
     print("TensorFlow Lite Model Converter")
     print("=" * 40)
     
     converter = TensorFlowLiteConverter()
     
     # Convert model
-    success = converter.convert_model_to_tflite('best_model2.keras', 'model.tflite')
+    calibration = representative_dataset(sequences) if args.quantization == 'int8' else None
+    success = converter.convert_model_to_tflite(args.model, args.output, args.quantization, calibration)
     
     if success:
         # Test loading
-        if converter.load_tflite_model('model.tflite'):
+        if converter.load_tflite_model(args.output):
             # Get model info
             info = converter.get_model_info()
             print(f"\nModel Information:")
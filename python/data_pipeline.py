@@ -0,0 +1,150 @@
+import glob
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+from sequence_dataset import INDEX_FILE, SEQUENCES_SUFFIX, ShardedDataset, ShardedDatasetWriter, shard_label_path
+
+
+def list_shards(shard_dir: str) -> List[str]:
+    """Shards listed in the dataset index, or every ``*.x.npy`` file without one"""
+    if os.path.exists(os.path.join(shard_dir, INDEX_FILE)):
+        return ShardedDataset(shard_dir).shard_paths()
+    return sorted(glob.glob(os.path.join(shard_dir, '*' + SEQUENCES_SUFFIX)))
+
+
+def split_shards(shards: Sequence[str], validation_fraction: float = 0.2,
+                 seed: int = 42) -> Tuple[List[str], List[str]]:
+    """Train/validation split by whole shards, so no sequence is read by both"""
+    order = np.random.default_rng(seed).permutation(len(shards))
+    num_val = int(round(validation_fraction * len(shards)))
+    if validation_fraction > 0 and len(shards) > 1:
+        num_val = min(max(num_val, 1), len(shards) - 1)
+    val = [shards[i] for i in sorted(order[:num_val])]
+    train = [shards[i] for i in sorted(order[num_val:])]
+    return train, val
+
+
+def make_dataset(shards: Sequence[str], encode_labels: Callable[[np.ndarray], np.ndarray],
+                 num_classes: int, sequence_length: int = 30, batch_size: int = 32,
+                 training: bool = True, shuffle_buffer: int = 2048, cache: bool = False,
+                 cycle_length: int = 4, seed: int = 42) -> tf.data.Dataset:
+    """Stream (sequence, one-hot label) batches from sequence shards.
+
+    Shards are memory-mapped and read ``cycle_length`` at a time with
+    parallel interleave. Sequences get the same float32 (frames, features)
+    layout ``SignLanguageModelTrainer.preprocess_data`` produces, and labels
+    are encoded with ``encode_labels`` (e.g. a fitted LabelEncoder).
+    ``cache=True`` keeps decoded examples in memory after the first epoch.
+    """
+    sample = np.load(shards[0], mmap_mode='r')
+    feature_dim = int(np.prod(sample.shape[2:]))
+
+    def load_shard(path):
+        path = path.decode() if isinstance(path, bytes) else path
+        sequences = np.load(path, mmap_mode='r')
+        X = np.asarray(sequences, dtype=np.float32).reshape(len(sequences), sequence_length, feature_dim)
+        y = np.asarray(encode_labels(np.load(shard_label_path(path))), dtype=np.int32)
+        return X, y
+
+    def shard_examples(path):
+        X, y = tf.numpy_function(load_shard, [path], (tf.float32, tf.int32))
+        X.set_shape([None, sequence_length, feature_dim])
+        y.set_shape([None])
+        return tf.data.Dataset.from_tensor_slices((X, y))
+
+    dataset = tf.data.Dataset.from_tensor_slices(list(shards))
+    if training:
+        dataset = dataset.shuffle(len(shards), seed=seed, reshuffle_each_iteration=True)
+
+    dataset = dataset.interleave(
+        shard_examples,
+        cycle_length=min(cycle_length, len(shards)),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not training,
+    )
+    dataset = dataset.map(lambda x, y: (x, tf.one_hot(y, num_classes)),
+                          num_parallel_calls=tf.data.AUTOTUNE)
+
+    if cache:
+        dataset = dataset.cache()
+    if training:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+class _StepTimer(tf.keras.callbacks.Callback):
+    """Measures steps per second over all training batches after the first"""
+
+    def __init__(self):
+        super().__init__()
+        self.steps = 0
+        self.start = None
+        self.elapsed = 0.0
+
+    def on_train_batch_begin(self, batch, logs=None):
+        if self.start is None:
+            self.start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        if self.steps:
+            self.elapsed = time.perf_counter() - self.start
+        else:
+            # The first step includes tracing; start timing after it
+            self.start = time.perf_counter()
+        self.steps += 1
+
+    @property
+    def steps_per_second(self) -> float:
+        return (self.steps - 1) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def benchmark_input_pipelines(num_samples: int = 4000, shard_size: int = 500, batch_size: int = 32,
+                              epochs: int = 2, shard_dir: str = 'benchmark_shards') -> Dict[str, float]:
+    """Training steps per second: in-memory NumPy arrays vs streamed shards"""
+    import shutil
+    from train_model import SignLanguageModelTrainer
+
+    trainer = SignLanguageModelTrainer()
+    X, y = trainer.generate_synthetic_data(num_samples, seed=0)
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    with ShardedDatasetWriter(shard_dir, trainer.sequence_length, X.shape[-1], shard_size,
+                              dtype='float32') as writer:
+        writer.append(X, y)
+    num_classes = len(np.unique(y))
+
+    # Current path: whole array in RAM fed to model.fit
+    timer = _StepTimer()
+    model = trainer.create_model(num_classes, X.shape[-1])
+    model.fit(trainer.preprocess_data(X), tf.keras.utils.to_categorical(y, num_classes),
+              epochs=epochs, batch_size=batch_size, verbose=0, callbacks=[timer])
+    in_memory = timer.steps_per_second
+
+    # Streaming path over the same data
+    timer = _StepTimer()
+    dataset = make_dataset(list_shards(shard_dir), lambda labels: labels, num_classes,
+                           trainer.sequence_length, batch_size)
+    model = trainer.create_model(num_classes, X.shape[-1])
+    model.fit(dataset, epochs=epochs, verbose=0, callbacks=[timer])
+    streamed = timer.steps_per_second
+
+    return {
+        'in_memory_steps_per_second': in_memory,
+        'tf_data_steps_per_second': streamed,
+        'ratio': streamed / in_memory if in_memory else 0.0,
+    }
+
+
+def main():
+    print("Training Input Pipeline Benchmark")
+    print("=" * 40)
+    for key, value in benchmark_input_pipelines().items():
+        print(f"  {key}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
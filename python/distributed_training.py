@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+import tensorflow as tf
+
+from data_pipeline import list_shards, make_dataset, shard_label_path, split_shards
+from train_model import PRECISIONS, SignLanguageModelTrainer
+
+
+def make_tf_config(workers: List[str], task_index: int) -> Dict:
+    """TF_CONFIG for one task of a worker-only cluster"""
+    return {'cluster': {'worker': list(workers)}, 'task': {'type': 'worker', 'index': task_index}}
+
+
+def _task_info(strategy: tf.distribute.Strategy):
+    resolver = strategy.cluster_resolver
+    if resolver is None or not resolver.cluster_spec().as_dict():
+        return 'worker', 0
+    return resolver.task_type, resolver.task_id
+
+
+def is_chief(strategy: tf.distribute.Strategy) -> bool:
+    """Worker 0 is the chief: it writes the model everyone agrees on"""
+    task_type, task_id = _task_info(strategy)
+    return task_type == 'chief' or (task_type == 'worker' and task_id == 0)
+
+
+def _write_dir(path: str, strategy: tf.distribute.Strategy) -> str:
+    # Every worker has to take part in saving, but only the chief's copy is kept
+    if is_chief(strategy):
+        return path
+    task_type, task_id = _task_info(strategy)
+    worker_dir = os.path.join(tempfile.mkdtemp(), f'{task_type}_{task_id}')
+    os.makedirs(worker_dir, exist_ok=True)
+    return os.path.join(worker_dir, os.path.basename(path))
+
+
+def _num_sequences(shards: List[str]) -> int:
+    return sum(len(np.load(shard_label_path(path), mmap_mode='r')) for path in shards)
+
+
+def distributed_dataset(strategy: tf.distribute.Strategy, shards: List[str], encode_labels,
+                        num_classes: int, sequence_length: int, global_batch_size: int,
+                        training: bool = True) -> tf.distribute.DistributedDataset:
+    """Each input pipeline reads its own subset of whole shards, repeated forever.
+
+    Sharding by file keeps workers from decoding sequences they then drop,
+    and the repeat lets every worker run the same number of steps even when
+    shard sizes differ (collectives would otherwise hang on the last batch).
+    """
+    def dataset_fn(input_context: tf.distribute.InputContext) -> tf.data.Dataset:
+        local = shards[input_context.input_pipeline_id::input_context.num_input_pipelines] or shards
+        batch_size = input_context.get_per_replica_batch_size(global_batch_size)
+        return make_dataset(local, encode_labels, num_classes, sequence_length, batch_size,
+                            training=training, seed=42 + input_context.input_pipeline_id).repeat()
+
+    return strategy.distribute_datasets_from_function(dataset_fn)
+
+
+def train_distributed(shard_dir: str, model_path: str = 'best_model2.keras', epochs: int = 30,
+                      batch_size: int = 32, validation_fraction: float = 0.2,
+                      backup_dir: str = 'training_backup', precision: str = 'float32'):
+    """Data-parallel training across the workers described by TF_CONFIG.
+
+    ``batch_size`` is per worker; gradients are all-reduced so every worker
+    holds identical weights. BackupAndRestore checkpoints each epoch so a
+    restarted cluster resumes where it stopped, and only the chief writes
+    the final model and label encoder. Without TF_CONFIG this runs as a
+    single local worker.
+    """
+    strategy = tf.distribute.MultiWorkerMirroredStrategy(
+        communication_options=tf.distribute.experimental.CommunicationOptions(
+            implementation=tf.distribute.experimental.CommunicationImplementation.RING))
+    num_workers = strategy.num_replicas_in_sync
+    global_batch_size = batch_size * num_workers
+
+    trainer = SignLanguageModelTrainer(precision=precision)
+    shards = list_shards(shard_dir)
+    if not shards:
+        raise ValueError(f"No sequence shards found in {shard_dir}")
+
+    # Every worker derives the same classes and split from the same files
+    encode_labels = trainer.fit_dataset_labels(shard_dir, shards)
+    num_classes = len(trainer.label_encoder.classes_)
+
+    train_shards, val_shards = split_shards(shards, validation_fraction)
+    train_data = distributed_dataset(strategy, train_shards, encode_labels, num_classes,
+                                     trainer.sequence_length, global_batch_size)
+    steps_per_epoch = max(_num_sequences(train_shards) // global_batch_size, 1)
+
+    fit_kwargs = {}
+    if val_shards:
+        fit_kwargs['validation_data'] = distributed_dataset(
+            strategy, val_shards, encode_labels, num_classes, trainer.sequence_length,
+            global_batch_size, training=False)
+        fit_kwargs['validation_steps'] = max(_num_sequences(val_shards) // global_batch_size, 1)
+
+    feature_dim = int(np.prod(np.load(shards[0], mmap_mode='r').shape[2:]))
+    with strategy.scope():
+        trainer.model = trainer.create_model(num_classes, feature_dim)
+
+    if is_chief(strategy):
+        print(f"Training on {num_workers} workers, {len(train_shards)} shards "
+              f"({len(val_shards)} for validation), global batch {global_batch_size}")
+    history = trainer.model.fit(
+        train_data, epochs=epochs, steps_per_epoch=steps_per_epoch,
+        callbacks=[tf.keras.callbacks.BackupAndRestore(backup_dir)],
+        verbose=1 if is_chief(strategy) else 0, **fit_kwargs)
+
+    write_path = _write_dir(model_path, strategy)
+    if is_chief(strategy):
+        trainer.save_model(write_path)
+    else:
+        trainer.model.save(write_path)
+        shutil.rmtree(os.path.dirname(os.path.dirname(write_path)), ignore_errors=True)
+
+    return history
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+
+def launch_local_workers(num_workers: int, worker_args: List[str],
+                         python: Optional[str] = None) -> int:
+    """Start ``num_workers`` training processes on localhost and wait for them.
+
+    Returns the first non-zero exit code, or 0 when every worker succeeds.
+    """
+    workers = [f'localhost:{_free_port()}' for _ in range(num_workers)]
+    processes = []
+    for index in range(num_workers):
+        env = dict(os.environ, TF_CONFIG=json.dumps(make_tf_config(workers, index)))
+        command = [python or sys.executable, os.path.abspath(__file__), 'worker'] + worker_args
+        processes.append(subprocess.Popen(command, env=env))
+
+    exit_code = 0
+    for process in processes:
+        code = process.wait()
+        exit_code = exit_code or code
+    return exit_code
+
+
+def main():
+    """Run one distributed worker, or launch a local multi-worker cluster"""
+    parser = argparse.ArgumentParser(description="Multi-worker CPU training of the sign language LSTM")
+    parser.add_argument('mode', choices=('worker', 'launch'),
+                        help="'worker' reads TF_CONFIG; 'launch' starts --workers local processes")
+    parser.add_argument('--shard-dir', default='synthetic_dataset')
+    parser.add_argument('--model', default='best_model2.keras')
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--batch-size', type=int, default=32, help="per-worker batch size")
+    parser.add_argument('--backup-dir', default='training_backup')
+    parser.add_argument('--precision', choices=PRECISIONS, default='float32')
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    if args.mode == 'launch':
+        if not os.path.exists(args.shard_dir):
+            from sequence_dataset import build_synthetic_dataset
+            print("Generating synthetic training data...")
+            build_synthetic_dataset(args.shard_dir, num_samples=2000, shard_size=250)
+        worker_args = ['--shard-dir', args.shard_dir, '--model', args.model, '--epochs', str(args.epochs),
+                       '--batch-size', str(args.batch_size), '--backup-dir', args.backup_dir,
+                       '--precision', args.precision]
+        sys.exit(launch_local_workers(args.workers, worker_args))
+
+    train_distributed(args.shard_dir, args.model, args.epochs, args.batch_size,
+                      backup_dir=args.backup_dir, precision=args.precision)
+
+
+if __name__ == "__main__":
+    main()
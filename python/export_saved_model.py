@@ -0,0 +1,127 @@
+import argparse
+import os
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+from timing import time_calls
+
+SEQUENCE_LENGTH = 30
+FEATURE_DIM = 171
+SIGNATURE_KEY = 'serving_default'
+
+
+def export_saved_model(model: 'tf.keras.Model', export_dir: str, sequence_length: int = SEQUENCE_LENGTH,
+                       feature_dim: int = FEATURE_DIM, jit_compile: bool = False):
+    """Write a SavedModel whose serving function has one fixed (None, frames, features) signature.
+
+    The graph is traced once here, at export time, so loading it needs no
+    Keras objects and calling it never retraces, whatever the batch size.
+    With ``jit_compile=True`` the function is marked for XLA and compiled
+    once per batch size on first use. Returns the exported concrete function.
+    """
+    spec = tf.TensorSpec((None, sequence_length, feature_dim), tf.float32, name='window')
+
+    @tf.function(input_signature=[spec], jit_compile=jit_compile)
+    def serve(window):
+        return {'probabilities': model(window, training=False)}
+
+    module = tf.Module()
+    module.model = model
+    module.serve = serve
+    concrete = serve.get_concrete_function()
+    tf.saved_model.save(module, export_dir, signatures={SIGNATURE_KEY: concrete})
+    return concrete
+
+
+class SavedModelPredictor:
+    """Minimal loader for export_saved_model output.
+
+    Calls the exported concrete function directly, skipping the Keras
+    model.predict machinery (data adapters, callbacks, per-call setup).
+    """
+
+    def __init__(self, export_dir: str):
+        self.module = tf.saved_model.load(export_dir)
+        self.serve = self.module.signatures[SIGNATURE_KEY]
+        self.input_shape = tuple(self.serve.structured_input_signature[1]['window'].shape)
+
+    def predict(self, windows: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (batch, frames, features) array"""
+        window = tf.convert_to_tensor(windows, dtype=tf.float32)
+        return self.serve(window=window)['probabilities'].numpy()
+
+
+def compare_latency(model: 'tf.keras.Model', predictors: Dict[str, SavedModelPredictor],
+                    batch_sizes: Tuple[int, ...] = (1, 2, 4, 8, 16, 32, 64), iterations: int = 50,
+                    seed: int = 0) -> Tuple[Dict[int, Dict[str, Dict[str, float]]], float]:
+    """p50/p95 latency of model.predict and each predictor per batch size, plus the largest output difference"""
+    rng = np.random.default_rng(seed)
+    report = {}
+    max_diff = 0.0
+    for batch_size in batch_sizes:
+        windows = rng.random((batch_size, SEQUENCE_LENGTH, FEATURE_DIM), dtype=np.float32)
+        reference = model.predict(windows, verbose=0)
+        row = {'model.predict': time_calls(lambda _: model.predict(windows, verbose=0), iterations)}
+        for name, predictor in predictors.items():
+            max_diff = max(max_diff, float(np.abs(predictor.predict(windows) - reference).max()))
+            row[name] = time_calls(lambda _: predictor.predict(windows), iterations)
+        report[batch_size] = row
+    return report, max_diff
+
+
+def print_latency_report(report: Dict[int, Dict[str, Dict[str, float]]]):
+    """Print the output of compare_latency as a table"""
+    names = list(next(iter(report.values())))
+    print(f"{'batch':>5} " + " ".join(f"{name + ' p50/p95 ms':>28}" for name in names) + f" {'speedup':>8}")
+    for batch_size, row in report.items():
+        cells = " ".join(f"{row[name]['p50_ms']:>13.2f} / {row[name]['p95_ms']:<12.2f}" for name in names)
+        speedup = row['model.predict']['p50_ms'] / row[names[1]]['p50_ms'] if len(names) > 1 else 1.0
+        print(f"{batch_size:>5} {cells} {speedup:>7.1f}x")
+
+
+def main():
+    """Export a Keras model as a fixed-signature SavedModel and compare its latency with model.predict"""
+    parser = argparse.ArgumentParser(description="Export a fixed-signature SavedModel for serving")
+    parser.add_argument('--model', default='best_model2.keras')
+    parser.add_argument('--output', default='sign_language_savedmodel')
+    parser.add_argument('--xla', action='store_true', help="also export and time an XLA-compiled variant")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    print("SavedModel Export")
+    print("=" * 60)
+
+    if os.path.exists(args.model):
+        start = time.perf_counter()
+        model = tf.keras.models.load_model(args.model)
+        print(f"Loaded {args.model} in {time.perf_counter() - start:.2f} s")
+    else:
+        from train_model import SignLanguageModelTrainer
+        print(f"{args.model} not found, exporting an untrained model")
+        model = SignLanguageModelTrainer().create_model(num_classes=8, input_dim=FEATURE_DIM)
+
+    export_saved_model(model, args.output)
+    print(f"Exported {args.output}")
+    start = time.perf_counter()
+    predictors = {'SavedModel': SavedModelPredictor(args.output)}
+    print(f"Loaded SavedModel in {time.perf_counter() - start:.2f} s, "
+          f"signature {predictors['SavedModel'].input_shape}")
+
+    if args.xla:
+        xla_dir = args.output + '_xla'
+        export_saved_model(model, xla_dir, jit_compile=True)
+        predictors['SavedModel+XLA'] = SavedModelPredictor(xla_dir)
+        print(f"Exported {xla_dir}")
+
+    report, max_diff = compare_latency(model, predictors, args.batch_sizes, args.iterations)
+    print()
+    print_latency_report(report)
+    print(f"Max output difference vs model.predict: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
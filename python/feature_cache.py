@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from landmark_features import FACE_INDICES, POSE_INDICES, FEATURE_DIM
+
+# Bump when build_feature_vector changes its output for the same landmarks
+EXTRACTOR_VERSION = 1
+
+# In-flight writes carry this suffix until they are renamed into place, so
+# eviction never counts or deletes another process's partial entry
+TEMP_SUFFIX = '.tmp'
+
+
+def extractor_config(min_detection_confidence: float = 0.5) -> Dict[str, Any]:
+    """Everything that changes the extracted features of a video"""
+    return {
+        'version': EXTRACTOR_VERSION,
+        'face_indices': list(FACE_INDICES),
+        'pose_indices': list(POSE_INDICES),
+        'feature_dim': FEATURE_DIM,
+        'min_detection_confidence': min_detection_confidence,
+    }
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """On-disk cache of per-frame (frames, 171) features for source videos.
+
+    Entries are ``.npy`` files named after the video's content hash and
+    stored under a directory named after the extractor config hash, so a
+    config change simply misses and the old entries age out. Reads are
+    memory-mapped. The total size is capped with least-recently-used
+    eviction (access time is tracked through the file mtime).
+
+    Content hashes are memoized keyed by path, size and mtime so unchanged
+    videos are not re-read on every lookup. Each path gets its own small
+    JSON file under ``hashes/``, written atomically, so worker processes
+    sharing the cache never overwrite each other's entries. Memos count
+    towards ``max_bytes`` and age out with the same LRU eviction.
+    """
+
+    def __init__(self, cache_dir: str = 'feature_cache', max_bytes: int = 2 << 30,
+                 config: Optional[Dict[str, Any]] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.config = config or extractor_config()
+        config_blob = json.dumps(self.config, sort_keys=True).encode()
+        self.config_hash = hashlib.sha256(config_blob).hexdigest()[:16]
+        self.entry_dir = os.path.join(cache_dir, self.config_hash)
+        os.makedirs(self.entry_dir, exist_ok=True)
+
+        self.hash_dir = os.path.join(cache_dir, 'hashes')
+        os.makedirs(self.hash_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _hash_entry_path(self, path: str) -> str:
+        key = hashlib.sha256(path.encode()).hexdigest()[:32]
+        return os.path.join(self.hash_dir, key + '.json')
+
+    def video_hash(self, video_path: str) -> str:
+        """Content hash of a video, memoized on (size, mtime)"""
+        path = os.path.abspath(video_path)
+        stat = os.stat(path)
+        entry_path = self._hash_entry_path(path)
+        try:
+            with open(entry_path, 'r') as f:
+                entry = json.load(f)
+            if entry['path'] == path and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+                os.utime(entry_path)  # mark as recently used
+                return entry['hash']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        digest = file_hash(path)
+        entry = {'path': path, 'size': stat.st_size, 'mtime': stat.st_mtime, 'hash': digest}
+        fd, tmp_path = tempfile.mkstemp(dir=self.hash_dir, suffix=TEMP_SUFFIX)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, entry_path)
+        return digest
+
+    def entry_path(self, video_path: str) -> str:
+        return os.path.join(self.entry_dir, self.video_hash(video_path) + '.npy')
+
+    def get(self, video_path: str) -> Optional[np.ndarray]:
+        """Memory-mapped cached features, or None on a miss"""
+        path = self.entry_path(video_path)
+        try:
+            features = np.load(path, mmap_mode='r')
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return features
+
+    def put(self, video_path: str, features: np.ndarray) -> str:
+        """Store features atomically and evict old entries over the size cap"""
+        path = self.entry_path(video_path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.entry_dir, suffix=TEMP_SUFFIX)
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.asarray(features, dtype=np.float32))
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def get_or_extract(self, video_path: str, extractor=None,
+                       make_extractor: Optional[Callable[[], Any]] = None) -> np.ndarray:
+        """Cached features for a video, extracting and caching them on a miss.
+
+        ``make_extractor`` builds the extractor only when a miss needs one,
+        so a fully cached run never starts MediaPipe.
+        """
+        features = self.get(video_path)
+        if features is not None:
+            return features
+
+        if extractor is None and make_extractor is not None:
+            extractor = make_extractor()
+        from landmark_features import extract_video_features
+        features = extract_video_features(video_path, extractor=extractor)
+        self.put(video_path, features)
+        return features
+
+    def size_bytes(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(('.npy', '.json')):
+                    continue  # in-flight TEMP_SUFFIX writes
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # removed by another process
+                entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries and hash memos (any config) until under max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
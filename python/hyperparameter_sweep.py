@@ -0,0 +1,280 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from convert_to_tflite import REPORT_MODES
+
+# float16 conversion of the LSTM does not finish, see convert_to_tflite
+SWEEP_QUANTIZATION_MODES = REPORT_MODES
+
+SWEEP_REPORT = 'sweep_report.json'
+
+
+@dataclass
+class TrialConfig:
+    """One point of the search space: everything create_model and fit depend on"""
+    lstm_units: Tuple[int, ...] = (64, 128, 64)
+    dense_units: int = 64
+    dropout: float = 0.3
+    learning_rate: float = 0.001
+    batch_size: int = 32
+
+    @property
+    def name(self) -> str:
+        units = '-'.join(str(u) for u in self.lstm_units)
+        return f"lstm{units}_dense{self.dense_units}_drop{self.dropout:g}_lr{self.learning_rate:g}_bs{self.batch_size}"
+
+
+@dataclass
+class TrialResult:
+    config: TrialConfig
+    epochs: int = 0
+    val_accuracy: float = 0.0
+    val_loss: float = float('inf')
+    stopped_early: bool = False
+    rung: int = 0
+    params: int = 0
+    tflite_bytes: int = 0
+    latency_p50_ms: float = 0.0
+    latency_p95_ms: float = 0.0
+    history: List[float] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result['name'] = self.config.name
+        result['config']['lstm_units'] = list(self.config.lstm_units)
+        return result
+
+
+def default_search_space() -> List[TrialConfig]:
+    """Widths around the trainer (64/128/64) and converter (128/64/32) models, plus smaller ones"""
+    architectures = [(64, 128, 64), (128, 64, 32), (64, 64), (64, 32), (32, 32), (32,)]
+    return [
+        TrialConfig(lstm_units=units, dense_units=dense, dropout=dropout)
+        for units, dense, dropout in itertools.product(architectures, (32, 64), (0.2, 0.3))
+    ]
+
+
+def _init_worker(threads_per_trial: int):
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads_per_trial)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _trial_dir(output_dir: str, config: TrialConfig) -> str:
+    return os.path.join(output_dir, config.name)
+
+
+def _train_trial(config: TrialConfig, dataset_dir: str, output_dir: str, initial_epoch: int,
+                 epochs: int, patience: int, validation_fraction: float) -> TrialResult:
+    """Train one trial up to ``epochs`` total, resuming from its previous rung"""
+    import numpy as np
+    import tensorflow as tf
+    from data_pipeline import list_shards, make_dataset, split_shards
+    from train_model import SignLanguageModelTrainer
+
+    trainer = SignLanguageModelTrainer(lstm_units=config.lstm_units, dense_units=config.dense_units,
+                                       dropout=config.dropout, learning_rate=config.learning_rate)
+    shards = list_shards(dataset_dir)
+    classes = trainer.dataset_classes(dataset_dir)
+    if classes is None:
+        raise ValueError(f"{dataset_dir} has no class list; write it with ShardedDatasetWriter(classes=...)")
+    num_classes = len(classes)
+
+    train_shards, val_shards = split_shards(shards, validation_fraction)
+    if not train_shards or not val_shards:
+        raise ValueError(f"{dataset_dir} has {len(shards)} shard(s); a sweep needs at least one training "
+                         f"and one validation shard (validation_fraction={validation_fraction})")
+    train_data = make_dataset(train_shards, lambda labels: labels, num_classes, trainer.sequence_length,
+                              config.batch_size, training=True, cache=True)
+    val_data = make_dataset(val_shards, lambda labels: labels, num_classes, trainer.sequence_length,
+                            config.batch_size, training=False, cache=True)
+
+    trial_dir = _trial_dir(output_dir, config)
+    model_path = os.path.join(trial_dir, 'model.keras')
+    os.makedirs(trial_dir, exist_ok=True)
+    if initial_epoch and os.path.exists(model_path):
+        model = tf.keras.models.load_model(model_path)
+    else:
+        feature_dim = int(np.prod(np.load(shards[0], mmap_mode='r').shape[2:]))
+        model = trainer.create_model(num_classes, feature_dim)
+
+    early_stopping = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=patience,
+                                                      restore_best_weights=True)
+    history = model.fit(train_data, validation_data=val_data, initial_epoch=initial_epoch, epochs=epochs,
+                        callbacks=[early_stopping], verbose=0)
+    model.save(model_path)
+
+    val_loss, val_accuracy = model.evaluate(val_data, verbose=0)
+    trained = initial_epoch + len(history.history.get('val_loss', []))
+    return TrialResult(config=config, epochs=trained, val_accuracy=float(val_accuracy),
+                       val_loss=float(val_loss), stopped_early=trained < epochs,
+                       params=int(model.count_params()),
+                       history=[float(a) for a in history.history.get('val_accuracy', [])])
+
+
+def _calibration_windows(dataset_dir: str, validation_fraction: float, num_samples: int = 200):
+    """Training windows for int8 calibration, read from as few train shards as needed"""
+    import numpy as np
+    from data_pipeline import list_shards, split_shards
+
+    train_shards, _ = split_shards(list_shards(dataset_dir), validation_fraction)
+    windows, count = [], 0
+    for path in train_shards:
+        windows.append(np.load(path, mmap_mode='r')[:num_samples - count])
+        count += len(windows[-1])
+        if count >= num_samples:
+            break
+    return np.concatenate(windows)
+
+
+def _measure_trial(result: TrialResult, output_dir: str, quantization: str, iterations: int,
+                   dataset_dir: str, validation_fraction: float) -> TrialResult:
+    """Convert a trained trial to TFLite and time single-window inference"""
+    import tensorflow as tf
+    from convert_to_tflite import apply_quantization, keras_to_tflite_converter, representative_dataset
+    from inference_backends import TFLiteBackend, benchmark_backend
+
+    trial_dir = _trial_dir(output_dir, result.config)
+    model = tf.keras.models.load_model(os.path.join(trial_dir, 'model.keras'))
+    converter = keras_to_tflite_converter(model)
+    calibration = None
+    if quantization == 'int8':
+        calibration = representative_dataset(_calibration_windows(dataset_dir, validation_fraction))
+    apply_quantization(converter, quantization, calibration)
+    tflite_path = os.path.join(trial_dir, 'model.tflite')
+    with open(tflite_path, 'wb') as f:
+        f.write(converter.convert())
+
+    backend = TFLiteBackend(tflite_path, num_threads=1)
+    stats = benchmark_backend(backend, (1,) + tuple(model.input_shape[1:]), iterations)
+    result.tflite_bytes = os.path.getsize(tflite_path)
+    result.latency_p50_ms = stats['p50_ms']
+    result.latency_p95_ms = stats['p95_ms']
+    return result
+
+
+def successive_halving(configs: Sequence[TrialConfig], dataset_dir: str, output_dir: str = 'sweep',
+                       min_epochs: int = 3, max_epochs: int = 27, eta: int = 3, patience: int = 3,
+                       validation_fraction: float = 0.2, workers: Optional[int] = None,
+                       threads_per_trial: int = 1, quantization: str = 'dynamic',
+                       latency_iterations: int = 100) -> List[TrialResult]:
+    """Train every config for ``min_epochs``, keep the best 1/eta, multiply the budget by eta, repeat.
+
+    Trials in a rung run in parallel in a process pool and resume from the
+    model saved at the end of the previous rung. Within a rung, early
+    stopping on validation loss ends a trial that has stopped improving.
+    Trials are ranked on validation accuracy, the same metric select_trial
+    uses. Every trial, eliminated or not, is then converted to TFLite and
+    timed; ``quantization`` is checked up front so a bad mode fails before
+    any training.
+    """
+    if quantization not in SWEEP_QUANTIZATION_MODES:
+        raise ValueError(f"Unsupported quantization '{quantization}' for the sweep, "
+                         f"expected one of {SWEEP_QUANTIZATION_MODES}")
+    workers = workers or max((os.cpu_count() or 1) // threads_per_trial, 1)
+    os.makedirs(output_dir, exist_ok=True)
+
+    results: Dict[str, TrialResult] = {}
+    survivors = list(configs)
+    budget, done, rung = min_epochs, 0, 0
+
+    # spawn keeps TensorFlow state from leaking into the workers
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(threads_per_trial,)) as pool:
+        while survivors:
+            print(f"Rung {rung}: {len(survivors)} trials, {budget} epochs")
+            futures = [pool.submit(_train_trial, config, dataset_dir, output_dir, done, budget,
+                                   patience, validation_fraction) for config in survivors]
+            for future in futures:
+                result = future.result()
+                result.rung = rung
+                if result.config.name in results:
+                    result.history = results[result.config.name].history + result.history
+                results[result.config.name] = result
+                print(f"  {result.config.name}: val_accuracy={result.val_accuracy:.4f} after {result.epochs} epochs")
+
+            # Trials that early-stopped have converged; they keep their score but get no more budget
+            ranked = sorted((results[c.name] for c in survivors), key=lambda r: -r.val_accuracy)
+            keep = max(len(ranked) // eta, 1)
+            survivors = [r.config for r in ranked[:keep] if not r.stopped_early]
+            if budget >= max_epochs:
+                break
+            done, budget, rung = budget, min(budget * eta, max_epochs), rung + 1
+
+        measured = pool.map(_measure_trial, results.values(), itertools.repeat(output_dir),
+                            itertools.repeat(quantization), itertools.repeat(latency_iterations),
+                            itertools.repeat(dataset_dir), itertools.repeat(validation_fraction))
+        return sorted(measured, key=lambda r: -r.val_accuracy)
+
+
+def select_trial(results: Sequence[TrialResult], accuracy_target: float) -> Optional[TrialResult]:
+    """Fastest trial meeting the accuracy target, or the most accurate one if none does"""
+    eligible = [r for r in results if r.val_accuracy >= accuracy_target]
+    if eligible:
+        return min(eligible, key=lambda r: r.latency_p50_ms)
+    return max(results, key=lambda r: r.val_accuracy, default=None)
+
+
+def write_sweep_report(results: Sequence[TrialResult], selected: Optional[TrialResult],
+                       accuracy_target: float, output_path: str):
+    with open(output_path, 'w') as f:
+        json.dump({
+            'accuracy_target': accuracy_target,
+            'selected': selected.config.name if selected else None,
+            'trials': [r.to_dict() for r in results],
+        }, f, indent=2)
+
+
+def print_sweep_report(results: Sequence[TrialResult], selected: Optional[TrialResult]):
+    print(f"{'trial':<44} {'epochs':>6} {'val_acc':>8} {'params':>8} {'tflite KB':>10} {'p50 ms':>8}")
+    for r in results:
+        marker = ' *' if selected is r else ''
+        print(f"{r.config.name:<44} {r.epochs:>6} {r.val_accuracy:>8.4f} {r.params:>8} "
+              f"{r.tflite_bytes / 1024:>10.1f} {r.latency_p50_ms:>8.3f}{marker}")
+
+
+def main():
+    """Sweep model sizes on the synthetic dataset and pick the fastest accurate one"""
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep with successive halving")
+    parser.add_argument('--dataset', default='synthetic_dataset')
+    parser.add_argument('--output-dir', default='sweep')
+    parser.add_argument('--accuracy-target', type=float, default=0.9)
+    parser.add_argument('--min-epochs', type=int, default=3)
+    parser.add_argument('--max-epochs', type=int, default=27)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--patience', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--threads-per-trial', type=int, default=1)
+    parser.add_argument('--quantization', choices=SWEEP_QUANTIZATION_MODES, default='dynamic')
+    args = parser.parse_args()
+
+    print("Hyperparameter Sweep")
+    print("=" * 40)
+
+    if not os.path.exists(args.dataset):
+        from sequence_dataset import build_synthetic_dataset
+        print("Generating synthetic training data...")
+        build_synthetic_dataset(args.dataset, num_samples=2000, shard_size=250)
+
+    results = successive_halving(default_search_space(), args.dataset, args.output_dir,
+                                 args.min_epochs, args.max_epochs, args.eta, args.patience,
+                                 workers=args.workers, threads_per_trial=args.threads_per_trial,
+                                 quantization=args.quantization)
+    selected = select_trial(results, args.accuracy_target)
+    print_sweep_report(results, selected)
+
+    report_path = os.path.join(args.output_dir, SWEEP_REPORT)
+    write_sweep_report(results, selected, args.accuracy_target, report_path)
+    print(f"\nSelected: {selected.config.name if selected else 'none'}")
+    print(f"Report written to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
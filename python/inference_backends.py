@@ -0,0 +1,136 @@
+import time
+import numpy as np
+from typing import Callable, Dict, Optional
+
+from convert_to_tflite import TensorFlowLiteConverter
+
+BACKENDS = ('keras', 'tflite')
+
+
+def load_label_map(path: str) -> Dict[int, str]:
+    """Read a ``label,index`` per line mapping file such as label_mapping2.txt"""
+    label_map = {}
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            label, idx = line.strip().rsplit(',', 1)
+            label_map[int(idx)] = label
+    return label_map
+
+
+class KerasBackend:
+    """Runs a window through a Keras model with ``model.predict``"""
+
+    name = 'keras'
+
+    def __init__(self, model):
+        if isinstance(model, str):
+            import tensorflow as tf
+            model = tf.keras.models.load_model(model)
+        self.model = model
+
+    def predict(self, window: np.ndarray) -> np.ndarray:
+        """Class probabilities for a single (1, frames, features) window"""
+        return self.model.predict(window, verbose=0)[0]
+
+
+class TFLiteBackend:
+    """Runs a window through one persistent, pre-allocated TFLite interpreter"""
+
+    name = 'tflite'
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        self.converter = TensorFlowLiteConverter()
+        if not self.converter.load_tflite_model(model_path, num_threads=num_threads):
+            raise ValueError(f"Could not load TFLite model from {model_path}")
+
+    def predict(self, window: np.ndarray) -> np.ndarray:
+        """Class probabilities for a single (1, frames, features) window"""
+        return self.converter.predict_probabilities(window)
+
+
+def create_backend(kind: str, model=None, tflite_path: Optional[str] = None,
+                   num_threads: Optional[int] = None):
+    """Build an inference backend by name ('keras' or 'tflite')"""
+    if kind == 'keras':
+        return KerasBackend(model)
+    if kind == 'tflite':
+        return TFLiteBackend(tflite_path, num_threads=num_threads)
+    raise ValueError(f"Unknown inference backend '{kind}', expected one of {BACKENDS}")
+
+
+def keras_batch_predictor(model) -> Callable[[np.ndarray], np.ndarray]:
+    """One forward pass per batch through a single trace with a dynamic batch dimension.
+
+    Calling the model through a fixed-signature tf.function avoids both
+    model.predict's per-call setup and retracing for every new batch size.
+    """
+    import tensorflow as tf
+
+    spec = tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32)
+    forward = tf.function(lambda batch: model(batch, training=False), input_signature=[spec])
+    return lambda batch: forward(batch).numpy()
+
+
+def benchmark_backend(backend, input_shape, iterations: int = 200, warmup: int = 10,
+                      seed: int = 0) -> Dict[str, float]:
+    """Single-window latency statistics for one backend"""
+    window = np.random.default_rng(seed).random(input_shape, dtype=np.float32)
+    for _ in range(warmup):
+        backend.predict(window)
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        backend.predict(window)
+        latencies.append(time.perf_counter() - start)
+
+    latencies = 1000 * np.array(latencies)
+    return {
+        'mean_ms': float(latencies.mean()),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+    }
+
+
+def compare_backends(keras_path: str, tflite_path: str, num_threads: Optional[int] = None,
+                     iterations: int = 200) -> Dict[str, Dict[str, float]]:
+    """Latency of Keras vs TFLite on the same model, plus output agreement"""
+    keras_backend = KerasBackend(keras_path)
+    tflite_backend = TFLiteBackend(tflite_path, num_threads=num_threads)
+    input_shape = (1,) + tuple(keras_backend.model.input_shape[1:])
+
+    window = np.random.default_rng(1).random(input_shape, dtype=np.float32)
+    max_diff = float(np.abs(keras_backend.predict(window) - tflite_backend.predict(window)).max())
+
+    report = {
+        'keras': benchmark_backend(keras_backend, input_shape, iterations),
+        'tflite': benchmark_backend(tflite_backend, input_shape, iterations),
+    }
+    report['speedup'] = report['keras']['mean_ms'] / report['tflite']['mean_ms']
+    report['max_abs_diff'] = max_diff
+    return report
+
+
+def main():
+    """Compare Keras and TFLite single-window latency"""
+    import sys
+
+    keras_path = sys.argv[1] if len(sys.argv) > 1 else 'best_model2.keras'
+    tflite_path = sys.argv[2] if len(sys.argv) > 2 else 'model.tflite'
+    num_threads = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    print("Inference Backend Comparison")
+    print("=" * 40)
+
+    report = compare_backends(keras_path, tflite_path, num_threads)
+    for name in BACKENDS:
+        stats = report[name]
+        print(f"  {name:<7} mean={stats['mean_ms']:.3f} ms  p50={stats['p50_ms']:.3f} ms  p95={stats['p95_ms']:.3f} ms")
+    print(f"Speedup: {report['speedup']:.1f}x")
+    print(f"Max output difference: {report['max_abs_diff']:.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from landmark_features import FEATURE_DIM, LEFT_HAND_SLICE, RIGHT_HAND_SLICE
+
+# Feature columns of both hands in the 171-dim layout
+HAND_FEATURES = np.r_[LEFT_HAND_SLICE, RIGHT_HAND_SLICE]
+
+
+class InferenceScheduler:
+    """Decides per frame whether the model has to run or the last result still holds.
+
+    Inference runs when there is no previous result, when ``stride`` frames
+    have passed since the last one, or when the hand features have moved by
+    more than ``motion_threshold`` (L2) since the frame that was last
+    inferred. ``stride=1`` runs on every frame, like the original loop.
+    ``feature_index`` selects the motion features; by default the hand
+    columns of 171-dim vectors and every column otherwise (e.g. 63-dim
+    hand-only features).
+    """
+
+    def __init__(self, stride: int = 5, motion_threshold: Optional[float] = 0.05,
+                 feature_index: Optional[np.ndarray] = None):
+        if stride < 1:
+            raise ValueError("stride must be at least 1")
+        self.stride = stride
+        self.motion_threshold = motion_threshold
+        self.feature_index = feature_index
+        self.frames = 0
+        self.inferences = 0
+        self.motion_triggers = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the last result, e.g. when the buffer is cleared"""
+        self.last_result = None
+        self._reference = None
+        self._since_inference = 0
+
+    def _motion_features(self, features: np.ndarray) -> np.ndarray:
+        features = np.asarray(features, dtype=np.float32).ravel()
+        if self.feature_index is not None:
+            return features[self.feature_index]
+        return features[HAND_FEATURES] if features.shape[0] == FEATURE_DIM else features
+
+    def should_infer(self, features: np.ndarray) -> bool:
+        if self.last_result is None or self._since_inference + 1 >= self.stride:
+            return True
+        if self.motion_threshold is None:
+            return False
+        motion = float(np.linalg.norm(self._motion_features(features) - self._reference))
+        if motion > self.motion_threshold:
+            self.motion_triggers += 1
+            return True
+        return False
+
+    def step(self, features: np.ndarray, infer: Callable[[], object]) -> Tuple[object, bool]:
+        """Return (result, ran): ``infer()``'s result when due, else the last one"""
+        self.frames += 1
+        if self.should_infer(features):
+            self.last_result = infer()
+            self._reference = self._motion_features(features).copy()
+            self._since_inference = 0
+            self.inferences += 1
+            return self.last_result, True
+        self._since_inference += 1
+        return self.last_result, False
+
+    @property
+    def compute_saved(self) -> float:
+        """Fraction of frames whose inference was skipped"""
+        return 1.0 - self.inferences / self.frames if self.frames else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'frames': self.frames,
+            'inferences': self.inferences,
+            'motion_triggers': self.motion_triggers,
+            'compute_saved': self.compute_saved,
+        }
+
+
+def synthetic_recording(num_frames: int = 600, seed: int = 0) -> np.ndarray:
+    """(frames, 171) features alternating still holds and movement, for when no video is at hand"""
+    rng = np.random.default_rng(seed)
+    features = np.empty((num_frames, FEATURE_DIM), dtype=np.float32)
+    position = rng.random(FEATURE_DIM).astype(np.float32)
+    t = 0
+    while t < num_frames:
+        length = min(int(rng.integers(20, 60)), num_frames - t)
+        moving = rng.random() < 0.5
+        for _ in range(length):
+            if moving:
+                position = position + rng.normal(0.0, 0.02, FEATURE_DIM).astype(np.float32)
+            # Landmark jitter is present even when the signer holds still
+            features[t] = position + rng.normal(0.0, 0.002, FEATURE_DIM)
+            t += 1
+    return features
+
+
+def evaluate_cadence(predict_batch: Callable[[np.ndarray], np.ndarray], recordings: Sequence[np.ndarray],
+                     configs: Sequence[Tuple[int, Optional[float]]], inference_ms: float,
+                     sequence_length: int = 30) -> List[Dict[str, float]]:
+    """Replay recorded (frames, features) sequences through each (stride, threshold) schedule.
+
+    Every window is predicted once up front, which is exactly what the
+    per-frame loop computes; a schedule's output at a frame is then the
+    prediction of the last window it chose to run. Agreement is measured
+    against the per-frame argmax, and latency is the per-frame average of
+    the inferences that still run.
+    """
+    from batch_inference import sliding_windows
+
+    replays = []
+    for features in recordings:
+        windows, _, ends = sliding_windows(np.asarray(features, dtype=np.float32), sequence_length)
+        if len(windows):
+            replays.append((features[ends], np.asarray(predict_batch(np.ascontiguousarray(windows)))))
+
+    report = []
+    for stride, threshold in configs:
+        scheduler = InferenceScheduler(stride, threshold)
+        agree = 0
+        for frame_features, probabilities in replays:
+            scheduler.reset()
+            for i, features in enumerate(frame_features):
+                result, _ = scheduler.step(features, lambda: probabilities[i])
+                agree += int(np.argmax(result) == np.argmax(probabilities[i]))
+        stats = scheduler.stats()
+        stats.update({
+            'stride': stride,
+            'motion_threshold': threshold,
+            'argmax_agreement': agree / stats['frames'] if stats['frames'] else 0.0,
+            'inference_ms_per_frame': inference_ms * (1.0 - stats['compute_saved']),
+        })
+        report.append(stats)
+    return report
+
+
+def main():
+    """Compare inference cadences on recorded videos (or synthetic recordings)"""
+    import os
+    import tensorflow as tf
+    from inference_backends import KerasBackend, benchmark_backend
+
+    parser = argparse.ArgumentParser(description="Evaluate adaptive inference cadence")
+    parser.add_argument('videos', nargs='*', help="recorded clips; synthetic recordings when omitted")
+    parser.add_argument('--model', default='best_model2.keras')
+    parser.add_argument('--cache-dir', default='feature_cache')
+    args = parser.parse_args()
+
+    if os.path.exists(args.model):
+        model = tf.keras.models.load_model(args.model)
+    else:
+        print("No trained model found, using an untrained model")
+        from train_model import SignLanguageModelTrainer
+        model = SignLanguageModelTrainer().create_model(num_classes=8, input_dim=FEATURE_DIM)
+
+    if args.videos:
+        from feature_cache import FeatureCache
+        cache = FeatureCache(args.cache_dir)
+        recordings = [np.asarray(cache.get_or_extract(path)) for path in args.videos]
+    else:
+        recordings = [synthetic_recording(seed=seed) for seed in range(3)]
+
+    inference_ms = benchmark_backend(KerasBackend(model), (1, 30, FEATURE_DIM), iterations=30)['mean_ms']
+    configs = [(1, None), (2, None), (5, None), (10, None), (5, 0.05), (10, 0.05), (10, 0.1), (30, 0.05)]
+    report = evaluate_cadence(lambda batch: model.predict(batch, verbose=0), recordings, configs, inference_ms)
+
+    print("Inference Cadence")
+    print("=" * 40)
+    print(f"Per-inference latency: {inference_ms:.2f} ms")
+    print(f"{'stride':>6} {'motion':>7} {'saved':>7} {'agree':>7} {'ms/frame':>9} {'motion runs':>12}")
+    for r in report:
+        threshold = '-' if r['motion_threshold'] is None else f"{r['motion_threshold']:g}"
+        print(f"{r['stride']:>6} {threshold:>7} {100 * r['compute_saved']:>6.1f}% "
+              f"{100 * r['argmax_agreement']:>6.1f}% {r['inference_ms_per_frame']:>9.2f} {r['motion_triggers']:>12}")
+
+
+if __name__ == "__main__":
+    main()
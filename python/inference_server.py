@@ -0,0 +1,403 @@
+import argparse
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from timing import latency_stats
+from inference_backends import keras_batch_predictor
+
+SEQUENCE_LENGTH = 30
+FEATURE_DIM = 171
+
+
+class BatcherClosed(RuntimeError):
+    """Raised for windows submitted to, or still queued in, a closed MicroBatcher"""
+
+
+class MicroBatcher:
+    """Collects single windows from many callers and runs them as one batch.
+
+    A worker thread blocks for the first pending window, then keeps taking
+    windows until ``max_batch_size`` are queued or ``max_wait_ms`` has passed
+    since the first one arrived. The batch goes through ``predict_batch``
+    once and each caller's Future receives its own row. ``close()`` lets
+    windows that were already queued finish; anything submitted afterwards,
+    or left behind the shutdown sentinel, fails with BatcherClosed instead
+    of waiting forever.
+    """
+
+    def __init__(self, predict_batch: Callable[[np.ndarray], np.ndarray], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, window_shape=(SEQUENCE_LENGTH, FEATURE_DIM)):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.window_shape = tuple(window_shape)
+        self._queue = queue.Queue()
+        self._batch = np.empty((max_batch_size,) + self.window_shape, dtype=np.float32)
+        self._running = True
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self.batches = 0
+        self.windows = 0
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def validate(self, window: np.ndarray) -> np.ndarray:
+        """The window as float32 of ``window_shape``; ValueError if it has the wrong size"""
+        window = np.asarray(window, dtype=np.float32)
+        if window.size != int(np.prod(self.window_shape)):
+            raise ValueError(f"Expected a window of shape {self.window_shape}, got {window.shape}")
+        return window.reshape(self.window_shape)
+
+    def submit(self, window: np.ndarray) -> Future:
+        """Queue one (frames, features) window; the Future resolves to its probabilities"""
+        window = self.validate(window)
+        future = Future()
+        with self._close_lock:
+            if self._closed:
+                future.set_exception(BatcherClosed("Batcher is shutting down"))
+            else:
+                self._queue.put((window, future))
+        return future
+
+    def predict(self, window: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        return self.submit(window).result(timeout)
+
+    def _collect(self) -> List:
+        first = self._queue.get()
+        if first is None:
+            return []
+        pending = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._running = False
+                break
+            pending.append(item)
+        return pending
+
+    def _run(self):
+        while self._running:
+            pending = self._collect()
+            if not pending:
+                break
+            size = len(pending)
+            for i, (window, _) in enumerate(pending):
+                self._batch[i] = window
+            try:
+                probabilities = np.asarray(self.predict_batch(self._batch[:size]))
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            for i, (_, future) in enumerate(pending):
+                future.set_result(probabilities[i])
+            self.batches += 1
+            self.windows += size
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.windows / self.batches if self.batches else 0.0
+
+    def close(self):
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+        # The worker stops at the sentinel; fail whatever it did not get to
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(BatcherClosed("Batcher closed before the window was run"))
+
+
+class InferenceServer:
+    """HTTP front end for a MicroBatcher shared by every connected stream.
+
+    ``POST /predict`` takes either JSON ``{"stream_id": ..., "window": [[...]]}``
+    or a raw little-endian float32 window (``application/octet-stream``) with
+    the stream in an ``X-Stream-Id`` header. The response is JSON with the
+    stream id, predicted class, label and confidence. ``GET /stats`` reports
+    batching and per-stream counters. Connections are kept alive, so each
+    camera can hold one open socket.
+
+    Malformed requests get 400, a prediction that fails in the model gets
+    500, and one that is not done within ``request_timeout`` seconds or
+    arrives while the batcher is shutting down gets 503.
+    """
+
+    def __init__(self, batcher: MicroBatcher, label_map: Optional[Dict[int, str]] = None,
+                 host: str = '127.0.0.1', port: int = 8500, request_timeout: float = 10.0):
+        self.batcher = batcher
+        self.request_timeout = request_timeout
+        self.label_map = label_map or {}
+        self.stream_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.address = self.httpd.server_address
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _reply(self, status: int, payload: Dict):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip('/') == '/stats':
+                    self._reply(200, server.stats())
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path.rstrip('/') != '/predict':
+                    self._reply(404, {'error': 'not found'})
+                    return
+                body = None
+                try:
+                    body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                    if self.headers.get('Content-Type') == 'application/octet-stream':
+                        stream_id = self.headers.get('X-Stream-Id', 'default')
+                        window = np.frombuffer(body, dtype='<f4')
+                    else:
+                        request = json.loads(body)
+                        stream_id = str(request.get('stream_id', 'default'))
+                        window = np.asarray(request['window'], dtype=np.float32)
+                    window = server.batcher.validate(window)
+                except (ValueError, KeyError, TypeError) as e:
+                    if body is None:
+                        self.close_connection = True  # the unread body would corrupt the next request
+                    self._reply(400, {'error': str(e)})
+                    return
+                try:
+                    probabilities = server.batcher.predict(window, server.request_timeout)
+                except (FutureTimeoutError, BatcherClosed) as e:
+                    self._reply(503, {'error': str(e) or "prediction timed out"})
+                    return
+                except Exception as e:
+                    # Keep the connection answered when the model itself fails
+                    self._reply(500, {'error': f"{type(e).__name__}: {e}"})
+                    return
+                self._reply(200, server.result(stream_id, probabilities))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def result(self, stream_id: str, probabilities: np.ndarray) -> Dict:
+        with self._lock:
+            self.stream_counts[stream_id] = self.stream_counts.get(stream_id, 0) + 1
+        class_index = int(np.argmax(probabilities))
+        return {
+            'stream_id': stream_id,
+            'class_index': class_index,
+            'label': self.label_map.get(class_index, "Unknown"),
+            'confidence': float(probabilities[class_index]),
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            streams = dict(self.stream_counts)
+        return {
+            'batches': self.batcher.batches,
+            'windows': self.batcher.windows,
+            'mean_batch_size': self.batcher.mean_batch_size,
+            'streams': streams,
+        }
+
+    def start(self) -> 'InferenceServer':
+        threading.Thread(target=self.httpd.serve_forever, name='inference-server', daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def run_load(host: str, port: int, num_streams: int, duration: float = 5.0, fps: float = 0.0,
+             seed: int = 0) -> Dict[str, float]:
+    """Drive the server from ``num_streams`` simulated cameras and measure latency.
+
+    Each stream holds one keep-alive connection and sends raw float32
+    windows, either back to back (``fps=0``) or paced like a camera at
+    ``fps`` frames per second.
+    """
+    window_bytes = np.random.default_rng(seed).random((SEQUENCE_LENGTH, FEATURE_DIM),
+                                                      dtype=np.float32).astype('<f4').tobytes()
+    latencies = [[] for _ in range(num_streams)]
+    errors = [0] * num_streams
+    start_barrier = threading.Barrier(num_streams + 1)
+    stop_at = [0.0]
+
+    def stream(index: int):
+        connection = http.client.HTTPConnection(host, port)
+        headers = {'Content-Type': 'application/octet-stream', 'X-Stream-Id': f'camera-{index}'}
+        interval = 1.0 / fps if fps > 0 else 0.0
+        start_barrier.wait()
+        next_send = time.perf_counter()
+        while time.perf_counter() < stop_at[0]:
+            if interval:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send += interval
+            sent = time.perf_counter()
+            connection.request('POST', '/predict', window_bytes, headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                latencies[index].append(time.perf_counter() - sent)
+            else:
+                errors[index] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=stream, args=(i,), daemon=True) for i in range(num_streams)]
+    for thread in threads:
+        thread.start()
+    stop_at[0] = time.perf_counter() + duration
+    start = time.perf_counter()
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [latency for stream_latencies in latencies for latency in stream_latencies]
+    stats = latency_stats(all_latencies) if all_latencies else {}
+    stats.update({
+        'streams': num_streams,
+        'requests': len(all_latencies),
+        'errors': sum(errors),
+        'throughput_rps': len(all_latencies) / elapsed if elapsed > 0 else 0.0,
+    })
+    return stats
+
+
+def latency_throughput_curve(model, stream_counts: Sequence[int] = (1, 2, 4, 8, 16, 32),
+                             batch_configs: Sequence = ((1, 0.0), (8, 2.0), (32, 5.0)),
+                             duration: float = 5.0, fps: float = 0.0,
+                             label_map: Optional[Dict[int, str]] = None) -> List[Dict]:
+    """Throughput and latency for each (max_batch_size, max_wait_ms) at each stream count.
+
+    ``(1, 0)`` is the unbatched baseline: one forward pass per request, the
+    same model work as one live_predict process per camera.
+    """
+    predict_batch = keras_batch_predictor(model)
+    # Trace once so the first measurement is not a compile
+    predict_batch(np.zeros((1, SEQUENCE_LENGTH, FEATURE_DIM), dtype=np.float32))
+
+    curve = []
+    for max_batch_size, max_wait_ms in batch_configs:
+        batcher = MicroBatcher(predict_batch, max_batch_size, max_wait_ms)
+        server = InferenceServer(batcher, label_map, port=0).start()
+        host, port = server.address
+        for num_streams in stream_counts:
+            batches_before, windows_before = batcher.batches, batcher.windows
+            stats = run_load(host, port, num_streams, duration, fps)
+            batches = batcher.batches - batches_before
+            stats.update({
+                'max_batch_size': max_batch_size,
+                'max_wait_ms': max_wait_ms,
+                'mean_batch_size': (batcher.windows - windows_before) / batches if batches else 0.0,
+            })
+            curve.append(stats)
+            print(f"  batch<={max_batch_size:<3} wait={max_wait_ms:<4g}ms streams={num_streams:<3} "
+                  f"{stats['throughput_rps']:8.1f} req/s  p50={stats.get('p50_ms', 0):7.2f} ms  "
+                  f"p95={stats.get('p95_ms', 0):7.2f} ms  mean batch={stats['mean_batch_size']:.1f}")
+        server.shutdown()
+        batcher.close()
+    return curve
+
+
+def _load_model(model_path: str):
+    import tensorflow as tf
+    if os.path.exists(model_path):
+        return tf.keras.models.load_model(model_path)
+    print("No trained model found, serving an untrained model with the same shape")
+    from train_model import SignLanguageModelTrainer
+    return SignLanguageModelTrainer().create_model(num_classes=8, input_dim=FEATURE_DIM)
+
+
+def main():
+    """Serve batched predictions, drive load against a server, or measure curves"""
+    from inference_backends import load_label_map
+
+    parser = argparse.ArgumentParser(description="Batched multi-stream sign inference server")
+    parser.add_argument('mode', choices=('serve', 'load', 'curve'))
+    parser.add_argument('--model', default='best_model2.keras')
+    parser.add_argument('--labels', default='label_mapping2.txt')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8500)
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--request-timeout', type=float, default=10.0, help="seconds before a request gets 503")
+    parser.add_argument('--streams', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per load level")
+    parser.add_argument('--fps', type=float, default=0.0, help="per-stream request rate (0 = closed loop)")
+    parser.add_argument('--output', default='server_curve.json')
+    args = parser.parse_args()
+
+    if args.mode == 'load':
+        for num_streams in args.streams:
+            stats = run_load(args.host, args.port, num_streams, args.duration, args.fps)
+            print(f"streams={num_streams:<3} {stats['throughput_rps']:8.1f} req/s  "
+                  f"p50={stats.get('p50_ms', 0):7.2f} ms  p95={stats.get('p95_ms', 0):7.2f} ms")
+        return
+
+    label_map = load_label_map(args.labels) if os.path.exists(args.labels) else {}
+    model = _load_model(args.model)
+
+    if args.mode == 'curve':
+        print("Throughput vs latency")
+        print("=" * 40)
+        curve = latency_throughput_curve(model, args.streams, duration=args.duration, fps=args.fps,
+                                         label_map=label_map)
+        with open(args.output, 'w') as f:
+            json.dump(curve, f, indent=2)
+        print(f"\nCurve written to {args.output}")
+        return
+
+    batcher = MicroBatcher(keras_batch_predictor(model), args.max_batch_size, args.max_wait_ms)
+    server = InferenceServer(batcher, label_map, args.host, args.port, args.request_timeout)
+    print(f"Serving on http://{args.host}:{args.port}/predict "
+          f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        batcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+import time
+from types import SimpleNamespace
+import numpy as np
+import cv2
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Landmark Indices ---
+FACE_INDICES = [1, 4, 33, 61, 199, 263, 291, 362, 454]
+POSE_INDICES = [11, 12, 13, 14, 15, 16]
+NUM_HAND_LANDMARKS = 21
+
+# face + pose + left hand + right hand, 3 coordinates each
+FEATURE_DIM = 3 * (len(FACE_INDICES) + len(POSE_INDICES) + 2 * NUM_HAND_LANDMARKS)
+
+FACE_SLICE = slice(0, 3 * len(FACE_INDICES))
+POSE_SLICE = slice(FACE_SLICE.stop, FACE_SLICE.stop + 3 * len(POSE_INDICES))
+LEFT_HAND_SLICE = slice(POSE_SLICE.stop, POSE_SLICE.stop + 3 * NUM_HAND_LANDMARKS)
+RIGHT_HAND_SLICE = slice(LEFT_HAND_SLICE.stop, FEATURE_DIM)
+
+# Frames with fewer non-zero values than this are treated as missing
+MIN_NONZERO_FEATURES = 30
+
+# Stand-ins for graphs that were skipped on a frame
+NO_POSE = SimpleNamespace(pose_landmarks=None)
+NO_FACE = SimpleNamespace(multi_face_landmarks=None)
+NO_HANDS = SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+
+def mp_solutions():
+    """``mediapipe.solutions``, imported on first use since the import alone takes seconds"""
+    import mediapipe as mp
+    return mp.solutions
+
+
+def create_solutions(min_detection_confidence=0.5):
+    """Create the Hands, Pose and FaceMesh graphs used for feature extraction"""
+    solutions = mp_solutions()
+    hands = solutions.hands.Hands(static_image_mode=False, max_num_hands=2,
+                           min_detection_confidence=min_detection_confidence)
+    pose = solutions.pose.Pose(static_image_mode=False, min_detection_confidence=min_detection_confidence)
+    face = solutions.face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1,
+                            min_detection_confidence=min_detection_confidence)
+    return hands, pose, face
+
+
+def landmarks_to_array(landmarks, indices=None, out=None):
+    """Copy selected landmarks' (x, y, z) into a flat float32 array.
+
+    Only the requested ``indices`` are touched, so a 468-point face mesh
+    costs 9 attribute reads instead of 468. ``out`` may be any writable
+    float32 slice of matching length.
+    """
+    if indices is None:
+        indices = range(len(landmarks))
+    if out is None:
+        out = np.empty(3 * len(indices), dtype=np.float32)
+
+    # One list -> array conversion is much cheaper than per-element writes
+    coords = []
+    for i in indices:
+        lm = landmarks[i]
+        coords += (lm.x, lm.y, lm.z)
+    out[:] = coords
+    return out
+
+
+def build_feature_vector(results_hand, results_pose, results_face, out=None):
+    """Write MediaPipe results into a 171-dim float32 feature vector.
+
+    Layout: face (27), pose (18), left hand (63), right hand (63). Missing
+    parts are zero. Hands are made relative to their wrist. Pass ``out`` to
+    fill a preallocated buffer instead of allocating a new one.
+    """
+    if out is None:
+        out = np.empty(FEATURE_DIM, dtype=np.float32)
+
+    face_out = out[FACE_SLICE]
+    if results_face.multi_face_landmarks:
+        landmarks_to_array(results_face.multi_face_landmarks[0].landmark, FACE_INDICES, face_out)
+    else:
+        face_out.fill(0.0)
+
+    pose_out = out[POSE_SLICE]
+    if results_pose.pose_landmarks:
+        landmarks_to_array(results_pose.pose_landmarks.landmark, POSE_INDICES, pose_out)
+    else:
+        pose_out.fill(0.0)
+
+    out[LEFT_HAND_SLICE.start:].fill(0.0)
+    if results_hand.multi_hand_landmarks and results_hand.multi_handedness:
+        for idx, handedness in enumerate(results_hand.multi_handedness):
+            label = handedness.classification[0].label
+            hand_slice = LEFT_HAND_SLICE if label == 'Left' else RIGHT_HAND_SLICE
+
+            hand_out = out[hand_slice]
+            landmarks_to_array(results_hand.multi_hand_landmarks[idx].landmark, out=hand_out)
+            hand = hand_out.reshape(NUM_HAND_LANDMARKS, 3)
+            hand -= hand[0].copy()
+
+    return out
+
+
+def draw_results(frame, results_hand, results_pose, results_face):
+    """Draw face mesh, pose and hand landmarks onto a BGR frame in place"""
+    solutions = mp_solutions()
+    if results_face.multi_face_landmarks:
+        solutions.drawing_utils.draw_landmarks(frame, results_face.multi_face_landmarks[0],
+                                               solutions.face_mesh.FACEMESH_TESSELATION)
+
+    if results_pose.pose_landmarks:
+        solutions.drawing_utils.draw_landmarks(frame, results_pose.pose_landmarks,
+                                               solutions.pose.POSE_CONNECTIONS)
+
+    if results_hand.multi_hand_landmarks:
+        for hand_landmarks in results_hand.multi_hand_landmarks:
+            solutions.drawing_utils.draw_landmarks(frame, hand_landmarks, solutions.hands.HAND_CONNECTIONS)
+
+
+def has_enough_landmarks(features):
+    """True when a frame carries enough landmark data to be buffered"""
+    return np.count_nonzero(features) >= MIN_NONZERO_FEATURES
+
+
+class LandmarkExtractor:
+    """Owns the MediaPipe graphs and turns BGR frames into feature vectors.
+
+    Hands, Pose and FaceMesh run one after another on the calling thread.
+    Setting ``profiler`` (a profiling.StageProfiler) times each graph as its
+    own stage.
+    """
+
+    GRAPH_STAGES = ('hands', 'pose', 'face_mesh')
+
+    def __init__(self, min_detection_confidence=0.5, profiler=None):
+        self.hands, self.pose, self.face = create_solutions(min_detection_confidence)
+        self.profiler = profiler
+
+    def _run_graph(self, index, frame_rgb):
+        solution = (self.hands, self.pose, self.face)[index]
+        if self.profiler is None:
+            return solution.process(frame_rgb)
+        with self.profiler.stage(self.GRAPH_STAGES[index]):
+            return solution.process(frame_rgb)
+
+    def process(self, frame_rgb):
+        """Return (results_hand, results_pose, results_face) for an RGB frame"""
+        return tuple(self._run_graph(index, frame_rgb) for index in range(3))
+
+    def detect(self, frame):
+        """Run all three graphs on a BGR frame"""
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame_rgb.flags.writeable = False
+        return self.process(frame_rgb)
+
+    def extract(self, frame, out=None):
+        """Return (features, results) for a BGR frame, optionally filling ``out``"""
+        results = self.detect(frame)
+        if self.profiler is None:
+            return build_feature_vector(*results, out=out), results
+        with self.profiler.stage('features'):
+            return build_feature_vector(*results, out=out), results
+
+    def close(self):
+        self.hands.close()
+        self.pose.close()
+        self.face.close()
+
+
+class ParallelLandmarkExtractor(LandmarkExtractor):
+    """Dispatches Hands, Pose and FaceMesh concurrently on a persistent pool.
+
+    The three graphs are independent and MediaPipe releases the GIL while a
+    graph runs, so per-frame latency drops towards the slowest graph instead
+    of the sum of all three. Each graph is only ever driven by one call at a
+    time, which keeps MediaPipe's per-graph timestamps ordered.
+    """
+
+    def __init__(self, min_detection_confidence=0.5, profiler=None):
+        super().__init__(min_detection_confidence, profiler)
+        self.executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='mediapipe')
+
+    def process(self, frame_rgb):
+        futures = [self.executor.submit(self._run_graph, index, frame_rgb) for index in range(3)]
+        return tuple(future.result() for future in futures)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        super().close()
+
+
+class GatedLandmarkExtractor(LandmarkExtractor):
+    """Runs Hands first and Pose/FaceMesh only while hands are, or recently were, visible.
+
+    Frames without hands are dropped by ``has_enough_landmarks`` once hands
+    are gone, so an idle scene only pays for the hand detector. Pose and
+    FaceMesh keep running for ``linger_frames`` after the last hand so short
+    detection dropouts mid-sign still get full features. ``hand_scale``
+    runs the idle-scene hand check on a downscaled frame; as soon as a hand
+    shows up, and for as long as hands are tracked, the hand graph runs at
+    full resolution, so the landmarks that become features match what the
+    model was trained on. All graphs stay alive in tracking mode,
+    so MediaPipe reuses its previous-frame ROIs instead of re-detecting, and
+    a resumed Pose/FaceMesh picks up where its tracker left off. With
+    ``parallel=True`` Pose and FaceMesh run concurrently when they do run.
+    ``idle_hand_stride`` > 1 also runs the hand detector only every Nth
+    frame while the scene is idle, trading up to N-1 frames of reaction
+    time for a further cut in idle CPU.
+    """
+
+    def __init__(self, min_detection_confidence=0.5, profiler=None, hand_scale=1.0,
+                 linger_frames=15, parallel=False, idle_hand_stride=1):
+        super().__init__(min_detection_confidence, profiler)
+        self.hand_scale = hand_scale
+        self.linger_frames = linger_frames
+        self.idle_hand_stride = max(int(idle_hand_stride), 1)
+        self._idle_frames = 0
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='mediapipe') if parallel else None
+        self._linger = 0
+        self.frames = 0
+        self.gated_frames = 0
+
+    def _hands_input(self, frame_rgb):
+        if self.hand_scale == 1.0:
+            return frame_rgb
+        height, width = frame_rgb.shape[:2]
+        size = (max(int(width * self.hand_scale), 1), max(int(height * self.hand_scale), 1))
+        small = cv2.resize(frame_rgb, size, interpolation=cv2.INTER_AREA)
+        small.flags.writeable = False
+        return small
+
+    def process(self, frame_rgb):
+        self.frames += 1
+        if self._linger == 0 and self._idle_frames % self.idle_hand_stride:
+            self._idle_frames += 1
+            self.gated_frames += 1
+            return NO_HANDS, NO_POSE, NO_FACE
+
+        if self._linger > 0:
+            results_hand = self._run_graph(0, frame_rgb)
+        else:
+            results_hand = self._run_graph(0, self._hands_input(frame_rgb))
+            if results_hand.multi_hand_landmarks and self.hand_scale != 1.0:
+                # The downscaled pass only decides presence; features come from full resolution
+                results_hand = self._run_graph(0, frame_rgb)
+
+        if results_hand.multi_hand_landmarks:
+            self._linger = self.linger_frames
+            self._idle_frames = 0
+        elif self._linger > 0:
+            self._linger -= 1
+        else:
+            self._idle_frames += 1
+            self.gated_frames += 1
+            return results_hand, NO_POSE, NO_FACE
+
+        if self.executor is None:
+            return results_hand, self._run_graph(1, frame_rgb), self._run_graph(2, frame_rgb)
+        futures = [self.executor.submit(self._run_graph, index, frame_rgb) for index in (1, 2)]
+        return (results_hand,) + tuple(future.result() for future in futures)
+
+    @property
+    def gated_fraction(self):
+        """Share of frames on which Pose and FaceMesh were skipped"""
+        return self.gated_frames / self.frames if self.frames else 0.0
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        super().close()
+
+
+def extract_video_features(video_path, extractor=None, max_frames=None):
+    """Extract the (frames, 171) float32 feature matrix of a video file.
+
+    Used to prepare training sequences from recorded footage with exactly
+    the same features the live predictors see.
+    """
+    own_extractor = extractor is None
+    if own_extractor:
+        extractor = LandmarkExtractor()
+
+    cap = cv2.VideoCapture(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 0
+    if max_frames is not None:
+        frame_count = min(frame_count, max_frames) if frame_count else max_frames
+
+    features = np.empty((max(frame_count, 1), FEATURE_DIM), dtype=np.float32)
+    num_frames = 0
+    try:
+        while max_frames is None or num_frames < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if num_frames == len(features):
+                # Container reported a wrong frame count
+                features = np.concatenate([features, np.empty_like(features)])
+            extractor.extract(frame, out=features[num_frames])
+            num_frames += 1
+    finally:
+        cap.release()
+        if own_extractor:
+            extractor.close()
+
+    return features[:num_frames]
+
+
+def make_sequences(features, sequence_length=30, stride=1, drop_low_data=True):
+    """Slice a (frames, F) matrix into (N, sequence_length, F) training windows"""
+    if drop_low_data:
+        features = features[np.count_nonzero(features, axis=1) >= MIN_NONZERO_FEATURES]
+    if len(features) < sequence_length:
+        return np.empty((0, sequence_length, features.shape[1]), dtype=features.dtype)
+    windows = np.lib.stride_tricks.sliding_window_view(features, sequence_length, axis=0)
+    # sliding_window_view puts the window axis last
+    return np.ascontiguousarray(windows[::stride].transpose(0, 2, 1))
+
+
+def _legacy_feature_vector(results_hand, results_pose, results_face):
+    """Original list-comprehension conversion, kept as the benchmark baseline"""
+    face_landmarks = np.zeros((len(FACE_INDICES), 3))
+    pose_landmarks = np.zeros((len(POSE_INDICES), 3))
+    left_hand = np.zeros((NUM_HAND_LANDMARKS, 3))
+    right_hand = np.zeros((NUM_HAND_LANDMARKS, 3))
+
+    if results_face.multi_face_landmarks:
+        all_face = np.array([[lm.x, lm.y, lm.z] for lm in results_face.multi_face_landmarks[0].landmark])
+        face_landmarks = all_face[FACE_INDICES]
+
+    if results_pose.pose_landmarks:
+        all_pose = np.array([[lm.x, lm.y, lm.z] for lm in results_pose.pose_landmarks.landmark])
+        pose_landmarks = all_pose[POSE_INDICES]
+
+    if results_hand.multi_hand_landmarks and results_hand.multi_handedness:
+        for idx, handedness in enumerate(results_hand.multi_handedness):
+            label = handedness.classification[0].label
+            landmarks = np.array([[lm.x, lm.y, lm.z] for lm in results_hand.multi_hand_landmarks[idx].landmark])
+
+            if label == 'Left':
+                left_hand = landmarks - landmarks[0]
+            else:
+                right_hand = landmarks - landmarks[0]
+
+    return np.concatenate([
+        face_landmarks.flatten(),
+        pose_landmarks.flatten(),
+        left_hand.flatten(),
+        right_hand.flatten()
+    ])
+
+
+def _synthetic_results(rng):
+    """MediaPipe-shaped results with real landmark protos, for benchmarking"""
+    from mediapipe.framework.formats import landmark_pb2, classification_pb2
+
+    def landmark_list(count):
+        landmarks = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in rng.random((count, 3)):
+            landmarks.landmark.add(x=x, y=y, z=z)
+        return landmarks
+
+    def handedness(label):
+        classification = classification_pb2.ClassificationList()
+        classification.classification.add(label=label, score=0.9)
+        return classification
+
+    results_hand = SimpleNamespace(
+        multi_hand_landmarks=[landmark_list(NUM_HAND_LANDMARKS), landmark_list(NUM_HAND_LANDMARKS)],
+        multi_handedness=[handedness('Left'), handedness('Right')],
+    )
+    results_pose = SimpleNamespace(pose_landmarks=landmark_list(33))
+    results_face = SimpleNamespace(multi_face_landmarks=[landmark_list(468)])
+    return results_hand, results_pose, results_face
+
+
+def benchmark_feature_conversion(iterations=2000, seed=0):
+    """Per-frame cost of turning MediaPipe results into features, before and after"""
+    results = _synthetic_results(np.random.default_rng(seed))
+    buffer = np.empty(FEATURE_DIM, dtype=np.float32)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        reference = _legacy_feature_vector(*results)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build_feature_vector(*results, out=buffer)
+    optimized_time = time.perf_counter() - start
+
+    return {
+        'legacy_us': 1e6 * legacy_time / iterations,
+        'optimized_us': 1e6 * optimized_time / iterations,
+        'speedup': legacy_time / optimized_time,
+        'max_abs_diff': float(np.abs(reference - buffer).max()),
+    }
+
+
+def benchmark_extractors(video_path, max_frames=300, hand_scale=0.5, idle_hand_stride=2):
+    """Compare serial, parallel and hand-gated per-frame extraction on a recorded clip"""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+
+    if not frames:
+        raise ValueError(f"No frames could be read from {video_path}")
+
+    extractors = (
+        ('serial', LandmarkExtractor),
+        ('parallel', ParallelLandmarkExtractor),
+        ('gated', lambda: GatedLandmarkExtractor(hand_scale=hand_scale)),
+        ('gated_idle_stride', lambda: GatedLandmarkExtractor(hand_scale=hand_scale,
+                                                             idle_hand_stride=idle_hand_stride)),
+    )
+    report = {}
+    features = {}
+    for name, make_extractor in extractors:
+        extractor = make_extractor()
+        latencies = []
+        outputs = []
+        cpu_start = time.process_time()
+        for frame in frames:
+            start = time.perf_counter()
+            vector, _ = extractor.extract(frame)
+            latencies.append(time.perf_counter() - start)
+            outputs.append(vector.copy())
+        cpu_time = time.process_time() - cpu_start
+        extractor.close()
+
+        latencies = 1000 * np.array(latencies)
+        features[name] = np.array(outputs)
+        report[name] = {
+            'mean_ms': float(latencies.mean()),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'cpu_ms': 1000 * cpu_time / len(frames),
+        }
+        if isinstance(extractor, GatedLandmarkExtractor):
+            report[name]['gated_fraction'] = extractor.gated_fraction
+
+    report['frames'] = len(frames)
+    report['latency_reduction'] = 1.0 - report['parallel']['mean_ms'] / report['serial']['mean_ms']
+    report['gated_cpu_reduction'] = 1.0 - report['gated']['cpu_ms'] / report['serial']['cpu_ms']
+    report['gated_idle_stride_cpu_reduction'] = 1.0 - report['gated_idle_stride']['cpu_ms'] / report['serial']['cpu_ms']
+    report['max_feature_diff'] = float(np.abs(features['serial'] - features['parallel']).max())
+    return report
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        conversion = benchmark_feature_conversion()
+        print("Feature Conversion Benchmark")
+        print("=" * 40)
+        print(f"  legacy:    {conversion['legacy_us']:.1f} us/frame")
+        print(f"  optimized: {conversion['optimized_us']:.1f} us/frame")
+        print(f"  speedup:   {conversion['speedup']:.1f}x (max diff {conversion['max_abs_diff']:.2e})")
+        print("\nPass a video file to also benchmark serial vs parallel extraction:")
+        print("  python landmark_features.py <video_file> [max_frames]")
+        return
+
+    max_frames = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    report = benchmark_extractors(sys.argv[1], max_frames)
+
+    print("Landmark Extraction Benchmark")
+    print("=" * 40)
+    print(f"Frames: {report['frames']}")
+    for name in ('serial', 'parallel', 'gated', 'gated_idle_stride'):
+        stats = report[name]
+        print(f"  {name:<17} mean={stats['mean_ms']:.2f} ms  p50={stats['p50_ms']:.2f} ms  "
+              f"p95={stats['p95_ms']:.2f} ms  cpu={stats['cpu_ms']:.2f} ms/frame")
+    print(f"Latency reduction (parallel): {100 * report['latency_reduction']:.1f}%")
+    print(f"CPU reduction (gated, Pose/FaceMesh skipped on {100 * report['gated']['gated_fraction']:.0f}% "
+          f"of frames): {100 * report['gated_cpu_reduction']:.1f}%")
+    print(f"CPU reduction (gated, hand detector every 2nd idle frame): "
+          f"{100 * report['gated_idle_stride_cpu_reduction']:.1f}%")
+    print(f"Max feature difference: {report['max_feature_diff']:.6f}")
+
+
+if __name__ == "__main__":
+    main()
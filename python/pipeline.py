@@ -0,0 +1,276 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Union
+
+import cv2
+
+# Marks the end of the stream as it travels through the stages
+_END_OF_STREAM = object()
+
+
+@dataclass
+class FramePacket:
+    """A captured frame and everything the later stages attach to it"""
+    frame_id: int
+    timestamp: float
+    frame: Any
+    features: Any = None
+    results: Any = None
+    prediction: Any = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+
+class DropOldestQueue:
+    """Bounded queue that discards the oldest item instead of blocking the producer.
+
+    With ``drop_oldest=False`` it behaves like a normal blocking queue, which
+    is what offline benchmarks want (every frame is processed). ``close()``
+    wakes any producer blocked on a full queue; ``put`` then discards the
+    item and returns False.
+    """
+
+    def __init__(self, maxsize: int = 2, drop_oldest: bool = True):
+        self.maxsize = maxsize
+        self.drop_oldest = drop_oldest
+        self.items = deque()
+        self.dropped = 0
+        self.max_depth = 0
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item) -> bool:
+        with self._cond:
+            if item is not _END_OF_STREAM:
+                while len(self.items) >= self.maxsize and not self.closed:
+                    if self.drop_oldest:
+                        self.items.popleft()
+                        self.dropped += 1
+                    else:
+                        self._cond.wait()
+            if self.closed:
+                return False
+            self.items.append(item)
+            self.max_depth = max(self.max_depth, len(self.items))
+            self._cond.notify_all()
+            return True
+
+    def close(self):
+        """Stop accepting items and release blocked producers"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.items, timeout):
+                raise TimeoutError
+            item = self.items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def __len__(self):
+        return len(self.items)
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.busy_time = 0.0
+        self.started = None
+        self.lock = threading.Lock()
+
+    def record(self, elapsed: float):
+        with self.lock:
+            if self.started is None:
+                self.started = time.perf_counter() - elapsed
+            self.processed += 1
+            self.busy_time += elapsed
+
+    def snapshot(self) -> Dict[str, float]:
+        with self.lock:
+            wall = time.perf_counter() - self.started if self.started else 0.0
+            return {
+                'processed': self.processed,
+                'fps': self.processed / wall if wall > 0 else 0.0,
+                'avg_ms': 1000 * self.busy_time / self.processed if self.processed else 0.0,
+                'utilization': self.busy_time / wall if wall > 0 else 0.0,
+            }
+
+
+class PipelineStage(threading.Thread):
+    """Worker thread that applies ``fn`` to packets from one queue into the next.
+
+    ``fn`` mutates the packet in place; returning False drops the packet.
+    If ``fn`` raises, the exception is kept in ``error``, the pipeline is
+    told to stop and the end of the stream is passed downstream, so the
+    consumer is never left waiting on a dead stage.
+    """
+
+    def __init__(self, name: str, fn: Callable[[FramePacket], Any],
+                 in_queue: DropOldestQueue, out_queue: DropOldestQueue,
+                 stop_event: threading.Event):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.stats = StageStats(name)
+        self.error: Optional[BaseException] = None
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                packet = self.in_queue.get(timeout=0.1)
+            except TimeoutError:
+                continue
+
+            if packet is _END_OF_STREAM:
+                self.out_queue.put(packet)
+                return
+
+            start = time.perf_counter()
+            try:
+                keep = self.fn(packet)
+            except Exception as e:
+                self.error = e
+                self.stop_event.set()
+                self.out_queue.put(_END_OF_STREAM)
+                return
+            self.stats.record(time.perf_counter() - start)
+
+            if keep is not False:
+                self.out_queue.put(packet)
+
+
+class SignPipeline:
+    """Capture -> landmarks -> inference -> render, each stage on its own thread.
+
+    Stages communicate through small drop-oldest queues, so when inference
+    falls behind stale frames are discarded and end-to-end latency stays
+    bounded by the queue sizes. Rendering runs on the calling thread because
+    ``cv2.imshow`` must stay on the main thread on most platforms.
+
+    Args:
+        source: camera index or path to a video file
+        extract_fn: landmark stage, fills ``packet.features`` / ``packet.results``
+        infer_fn: inference stage, fills ``packet.prediction``
+        render_fn: called on the main thread per packet; return False to stop.
+            ``None`` runs headless.
+        queue_size: capacity of each inter-stage queue
+        drop_oldest: drop stale frames (live) or block (offline benchmark)
+    """
+
+    def __init__(self, source: Union[int, str],
+                 extract_fn: Callable[[FramePacket], Any],
+                 infer_fn: Callable[[FramePacket], Any],
+                 render_fn: Optional[Callable[[FramePacket], Any]] = None,
+                 queue_size: int = 2, drop_oldest: bool = True):
+        self.source = source
+        self.render_fn = render_fn
+        self.stop_event = threading.Event()
+
+        self.capture_queue = DropOldestQueue(queue_size, drop_oldest)
+        self.landmark_queue = DropOldestQueue(queue_size, drop_oldest)
+        self.output_queue = DropOldestQueue(queue_size, drop_oldest)
+
+        self.capture_stats = StageStats('capture')
+        self.render_stats = StageStats('render')
+        self.stages = [
+            PipelineStage('landmarks', extract_fn, self.capture_queue, self.landmark_queue, self.stop_event),
+            PipelineStage('inference', infer_fn, self.landmark_queue, self.output_queue, self.stop_event),
+        ]
+        self.latencies = deque(maxlen=1000)
+
+    def _capture_loop(self):
+        cap = cv2.VideoCapture(self.source)
+        frame_id = 0
+        try:
+            while not self.stop_event.is_set():
+                start = time.perf_counter()
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                self.capture_stats.record(time.perf_counter() - start)
+                self.capture_queue.put(FramePacket(frame_id, time.perf_counter(), frame))
+                frame_id += 1
+        finally:
+            cap.release()
+            self.capture_queue.put(_END_OF_STREAM)
+
+    def run(self):
+        """Run until the source is exhausted or ``render_fn`` returns False.
+
+        An exception raised inside a stage is re-raised here once every
+        thread has been stopped.
+        """
+        capture_thread = threading.Thread(target=self._capture_loop, name='capture', daemon=True)
+        capture_thread.start()
+        for stage in self.stages:
+            stage.start()
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    packet = self.output_queue.get(timeout=0.1)
+                except TimeoutError:
+                    continue
+                if packet is _END_OF_STREAM:
+                    break
+
+                start = time.perf_counter()
+                keep_going = self.render_fn(packet) if self.render_fn else True
+                self.render_stats.record(time.perf_counter() - start)
+                self.latencies.append(time.perf_counter() - packet.timestamp)
+
+                if keep_going is False:
+                    break
+        finally:
+            self.stop()
+            capture_thread.join(timeout=1.0)
+            for stage in self.stages:
+                stage.join(timeout=1.0)
+
+        for stage in self.stages:
+            if stage.error is not None:
+                raise stage.error
+
+    def stop(self):
+        self.stop_event.set()
+        for queue in (self.capture_queue, self.landmark_queue, self.output_queue):
+            queue.close()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage throughput plus queue depth and drop counters"""
+        report = {'capture': self.capture_stats.snapshot()}
+        queues = [self.capture_queue, self.landmark_queue, self.output_queue]
+        for stage, queue in zip(self.stages, queues):
+            report[stage.name] = stage.stats.snapshot()
+            report[stage.name].update({
+                'queue_depth': len(queue),
+                'max_queue_depth': queue.max_depth,
+                'dropped': queue.dropped,
+            })
+        report['render'] = self.render_stats.snapshot()
+        report['render'].update({
+            'queue_depth': len(self.output_queue),
+            'max_queue_depth': self.output_queue.max_depth,
+            'dropped': self.output_queue.dropped,
+        })
+        if self.latencies:
+            report['render']['avg_latency_ms'] = 1000 * sum(self.latencies) / len(self.latencies)
+        return report
+
+
+def print_stats(stats: Dict[str, Dict[str, float]]):
+    """Pretty-print the output of ``SignPipeline.stats``"""
+    for stage, values in stats.items():
+        details = ", ".join(
+            f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in values.items()
+        )
+        print(f"  {stage:<10} {details}")
@@ -6,15 +6,25 @@ import cv2
 import numpy as np
 from tensorflow.keras.models import load_model
 import json
+from streaming_inference import StreamingSignPredictor
+from landmark_features import landmarks_to_array
+from sequence_buffer import SequenceRingBuffer
+from inference_backends import create_backend
+from profiling import StageProfiler, print_profile
+from inference_scheduler import InferenceScheduler
 
 class SignLanguagePredictor:
-    def __init__(self, model_path='best_model2.keras', label_path='label_encoder.json'):
+    def __init__(self, model_path='best_model2.keras', label_path='label_encoder.json', streaming=False,
+                 backend='keras', tflite_path='model.tflite', num_threads=None, profiler=None,
+                 inference_stride=1, motion_threshold=0.05):
         # Initialize MediaPipe
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
         
-        # Load model and label encoder
-        self.model = load_model(model_path)
+        # Load model and label encoder; the Keras model is only needed for
+        # the Keras backend and for exporting the streaming cell
+        self.model = load_model(model_path) if backend == 'keras' or streaming else None
+        self.backend = create_backend(backend, self.model, tflite_path, num_threads)
         with open(label_path, 'r') as f:
             self.label_classes = json.load(f)
         
@@ -27,24 +37,32 @@ class SignLanguagePredictor:
         )
         
         # Frame buffer for sequence
-        self.frame_buffer = []
         self.sequence_length = 30
+        self.frame_buffer = SequenceRingBuffer(self.sequence_length, 63)
+        
+        # Optional O(1)-per-frame stateful inference
+        self.streamer = StreamingSignPredictor(self.model, self.sequence_length) if streaming else None
+        
+        # Skip inference on still frames; stride 1 runs the model every frame
+        self.scheduler = InferenceScheduler(inference_stride, motion_threshold)
+        
+        # Per-stage timers; the default disabled profiler costs next to nothing
+        self.profiler = profiler or StageProfiler(enabled=False)
         
     def extract_landmarks(self, image):
         """Extract hand landmarks from image"""
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(image_rgb)
+        with self.profiler.stage('hands'):
+            results = self.hands.process(image_rgb)
         
         if results.multi_hand_landmarks:
             # Get first hand
             hand_landmarks = results.multi_hand_landmarks[0]
             
             # Extract coordinates
-            landmarks = []
-            for landmark in hand_landmarks.landmark:
-                landmarks.extend([landmark.x, landmark.y, landmark.z])
+            landmarks = landmarks_to_array(hand_landmarks.landmark)
             
-            return np.array(landmarks), hand_landmarks
+            return landmarks, hand_landmarks
         
         return None, None
     
@@ -63,9 +81,14 @@ class SignLanguagePredictor:
         processed_landmarks = self.preprocess_landmarks(landmarks)
         
         # Make prediction
-        predictions = self.model.predict(processed_landmarks, verbose=0)
-        predicted_class = np.argmax(predictions[0])
-        confidence = float(predictions[0][predicted_class])
+        with self.profiler.stage('inference'):
+            predictions = self.backend.predict(processed_landmarks)
+        return self.decode_prediction(predictions)
+    
+    def decode_prediction(self, probabilities):
+        """Map a class probability vector to (sign name, confidence)"""
+        predicted_class = np.argmax(probabilities)
+        confidence = float(probabilities[predicted_class])
         
         # Get sign name
         sign_name = self.label_classes[predicted_class]
@@ -80,16 +103,20 @@ class SignLanguagePredictor:
         if landmarks is not None:
             # Add to frame buffer
             self.frame_buffer.append(landmarks)
-            
-            # Keep only last N frames
-            if len(self.frame_buffer) > self.sequence_length:
-                self.frame_buffer.pop(0)
+            stream_prediction = None
+            if self.streamer is not None:
+                with self.profiler.stage('inference'):
+                    stream_prediction = self.streamer.update(landmarks)
             
             # Predict if we have enough frames
             if len(self.frame_buffer) == self.sequence_length:
-                # Stack frames
-                sequence = np.array(self.frame_buffer)
-                sign, confidence = self.predict_sign(sequence)
+                if self.streamer is not None:
+                    sign, confidence = self.decode_prediction(stream_prediction)
+                    return sign, confidence, hand_landmarks
+                
+                # Contiguous view of the last N frames, no copy
+                sequence = self.frame_buffer.window()
+                (sign, confidence), _ = self.scheduler.step(landmarks, lambda: self.predict_sign(sequence))
                 return sign, confidence, hand_landmarks
         
         return None, 0.0, None
@@ -101,48 +128,92 @@ class SignLanguagePredictor:
                 image, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
             )
     
-    def run_webcam(self):
-        """Run prediction on webcam"""
+    def run_webcam(self, hud=False, log_interval=0.0, trace_path=None):
+        """Run prediction on webcam.
+
+        With profiling enabled, ``hud`` overlays per-stage latency,
+        ``log_interval`` prints a summary line every N seconds and
+        ``trace_path`` receives a Chrome trace on exit.
+        """
         cap = cv2.VideoCapture(0)
+        profiler = self.profiler
         
         while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Flip frame horizontally for selfie view
-            frame = cv2.flip(frame, 1)
-            
-            # Process frame
-            sign, confidence, hand_landmarks = self.process_frame(frame)
-            
-            # Draw landmarks
-            self.draw_landmarks(frame, hand_landmarks)
-            
-            # Display prediction
-            if sign and confidence > 0.7:
-                cv2.putText(frame, f"{sign} ({confidence:.2f})", 
-                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
-                           1, (0, 255, 0), 2)
-            
-            # Show frame
-            cv2.imshow('Sign Language Detection', frame)
-            
-            # Break on 'q' key
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            with profiler.stage('frame'):
+                with profiler.stage('capture'):
+                    ret, frame = cap.read()
+                if not ret:
+                    break
+                
+                # Flip frame horizontally for selfie view
+                frame = cv2.flip(frame, 1)
+                
+                # Process frame
+                sign, confidence, hand_landmarks = self.process_frame(frame)
+                
+                # Draw landmarks
+                with profiler.stage('draw'):
+                    self.draw_landmarks(frame, hand_landmarks)
+                    
+                    # Display prediction
+                    if sign and confidence > 0.7:
+                        cv2.putText(frame, f"{sign} ({confidence:.2f})", 
+                                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
+                                   1, (0, 255, 0), 2)
+                    if hud:
+                        profiler.draw_hud(frame, origin=(10, 60))
+                
+                # Show frame
+                with profiler.stage('display'):
+                    cv2.imshow('Sign Language Detection', frame)
+                    
+                    # Break on 'q' key
+                    quit_pressed = cv2.waitKey(1) & 0xFF == ord('q')
+            profiler.maybe_log(log_interval)
+            if quit_pressed:
                 break
         
         cap.release()
         cv2.destroyAllWindows()
+        
+        if self.streamer is None and self.scheduler.frames:
+            print(f"Inference skipped on {100 * self.scheduler.compute_saved:.1f}% of frames")
+        if profiler.enabled:
+            print_profile(profiler)
+            if trace_path:
+                profiler.dump_trace(trace_path)
+                print(f"Chrome trace written to {trace_path}")
 
 def main():
     """Main function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Hand-only sign language detection")
+    parser.add_argument('--profile', action='store_true', help="time each stage and print a summary on exit")
+    parser.add_argument('--hud', action='store_true', help="draw per-stage latency on the frame")
+    parser.add_argument('--log-interval', type=float, default=0.0, help="seconds between profile log lines")
+    parser.add_argument('--metrics-port', type=int, default=None, help="serve Prometheus /metrics")
+    parser.add_argument('--metrics-host', default='127.0.0.1',
+                        help="interface for /metrics ('0.0.0.0' to expose it)")
+    parser.add_argument('--trace', default=None, help="write a Chrome trace JSON to this path")
+    parser.add_argument('--stride', type=int, default=1, help="run the model at least every Nth frame")
+    parser.add_argument('--motion-threshold', type=float, default=0.05,
+                        help="hand motion (L2) that triggers inference before the stride")
+    args = parser.parse_args()
+    
     print("Sign Language Detection")
     print("=" * 40)
     print("Press 'q' to quit")
     
-    predictor = SignLanguagePredictor()
-    predictor.run_webcam()
+    enabled = (args.profile or args.hud or bool(args.log_interval)
+               or args.metrics_port is not None or bool(args.trace))
+    profiler = StageProfiler(enabled=enabled, trace=bool(args.trace))
+    if args.metrics_port is not None:
+        profiler.serve_prometheus(args.metrics_port, args.metrics_host)
+    
+    predictor = SignLanguagePredictor(profiler=profiler, inference_stride=args.stride,
+                                      motion_threshold=args.motion_threshold)
+    predictor.run_webcam(hud=args.hud, log_interval=args.log_interval, trace_path=args.trace)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,241 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Prometheus histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_NULL_STAGE = nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'StageProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record_ns(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+
+class _StageMetrics:
+    """Rolling window of recent durations plus cumulative histogram counters"""
+
+    def __init__(self, window: int, buckets: Sequence[float]):
+        self.recent = deque(maxlen=window)
+        self.bucket_bounds = tuple(buckets)
+        self.bucket_counts = [0] * (len(buckets) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float):
+        self.recent.append(seconds)
+        self.bucket_counts[bisect.bisect_left(self.bucket_bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+class StageProfiler:
+    """Low-overhead per-stage timers for the live prediction loops.
+
+    Wrap each stage in ``with profiler.stage('name'):``. Every stage keeps a
+    rolling window of its last ``window`` durations (for percentiles and the
+    HUD) and cumulative histogram counters (for Prometheus). With
+    ``trace=True`` every timed span is also kept as a Chrome trace event,
+    bounded to ``max_trace_events``, for ``dump_trace``. A disabled profiler
+    hands out a shared no-op context, so the hooks can stay in place.
+    """
+
+    def __init__(self, enabled: bool = True, window: int = 300, trace: bool = False,
+                 max_trace_events: int = 200000, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.window = window
+        self.buckets = tuple(buckets)
+        self.trace = trace
+        self.trace_events = deque(maxlen=max_trace_events)
+        self._stages: Dict[str, _StageMetrics] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._last_log = time.perf_counter()
+
+    def stage(self, name: str):
+        """Context manager timing one execution of ``name``"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _StageTimer(self, name)
+
+    def record_ns(self, name: str, start_ns: int, duration_ns: int):
+        with self._lock:
+            metrics = self._stages.get(name)
+            if metrics is None:
+                metrics = self._stages[name] = _StageMetrics(self.window, self.buckets)
+            metrics.add(duration_ns * 1e-9)
+            if self.trace:
+                tid = threading.get_ident()
+                if tid not in self._thread_names:
+                    self._thread_names[tid] = threading.current_thread().name
+                self.trace_events.append({
+                    'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': tid,
+                    'ts': (start_ns - self._origin_ns) / 1000.0, 'dur': duration_ns / 1000.0,
+                })
+
+    def record(self, name: str, seconds: float):
+        """Record a duration measured elsewhere (e.g. by a pipeline stage)"""
+        self.record_ns(name, time.perf_counter_ns() - int(seconds * 1e9), int(seconds * 1e9))
+
+    def stage_names(self) -> List[str]:
+        with self._lock:
+            return list(self._stages)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Percentiles over each stage's rolling window, in milliseconds"""
+        with self._lock:
+            windows = {name: (np.array(m.recent), m.count) for name, m in self._stages.items()}
+
+        summary = {}
+        for name, (recent, count) in windows.items():
+            if not len(recent):
+                continue
+            recent = 1000 * recent
+            p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+            summary[name] = {
+                'count': count,
+                'mean_ms': float(recent.mean()),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(recent.max()),
+            }
+        return summary
+
+    def prometheus_text(self, metric: str = 'sign_stage_duration_seconds') -> str:
+        """Cumulative per-stage histograms in the Prometheus text exposition format"""
+        lines = [f'# HELP {metric} Duration of each prediction loop stage.', f'# TYPE {metric} histogram']
+        with self._lock:
+            for name, m in self._stages.items():
+                cumulative = np.cumsum(m.bucket_counts).tolist()
+                for bound, count in zip(self.buckets, cumulative):
+                    lines.append(f'{metric}_bucket{{stage="{name}",le="{bound:g}"}} {count}')
+                lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {cumulative[-1]}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {m.total:.6f}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {m.count}')
+        return '\n'.join(lines) + '\n'
+
+    def serve_prometheus(self, port: int = 9464, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve ``/metrics`` from a daemon thread; call ``shutdown()`` on the result to stop.
+
+        Only local scrapers can reach the default ``host``; pass ``'0.0.0.0'``
+        to expose the endpoint on every interface.
+        """
+        profiler = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') != '/metrics':
+                    self.send_error(404)
+                    return
+                body = profiler.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep scrapes out of the console
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        return server
+
+    def format_summary(self) -> str:
+        return '  '.join(f"{name}={stats['p50_ms']:.1f}/{stats['p95_ms']:.1f}ms"
+                         for name, stats in self.summary().items())
+
+    def maybe_log(self, interval: float):
+        """Print a one-line p50/p95 summary at most every ``interval`` seconds"""
+        if not self.enabled or interval <= 0:
+            return
+        now = time.perf_counter()
+        if now - self._last_log >= interval:
+            self._last_log = now
+            print(f"[profile] {self.format_summary()}")
+
+    def draw_hud(self, frame, origin=(20, 90), line_height: int = 22):
+        """Overlay each stage's p50/p95 (ms) on a BGR frame"""
+        import cv2
+
+        x, y = origin
+        for name, stats in self.summary().items():
+            text = f"{name:<12} {stats['p50_ms']:6.1f} {stats['p95_ms']:6.1f} ms"
+            cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 0), 3, cv2.LINE_AA)
+            cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 1, cv2.LINE_AA)
+            y += line_height
+        return frame
+
+    def dump_trace(self, path: str):
+        """Write the recorded spans as Chrome trace JSON (chrome://tracing, Perfetto)"""
+        with self._lock:
+            events = list(self.trace_events)
+            thread_names = dict(self._thread_names)
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+             'args': {'name': thread_names.get(tid, str(tid))}}
+            for tid in {event['tid'] for event in events}
+        ]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+
+
+class StartupTimeline:
+    """Wall-clock milestones of a cold start, in seconds since ``origin``.
+
+    Take ``origin`` with ``time.perf_counter()`` before the heavy imports.
+    Only the first ``mark`` of each name counts, so marks can sit inside
+    loops and on several threads.
+    """
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> float:
+        elapsed = time.perf_counter() - self.origin
+        with self._lock:
+            return self.marks.setdefault(name, elapsed)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.marks
+
+    def report(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(sorted(self.marks.items(), key=lambda item: item[1]))
+
+    def format_report(self) -> str:
+        return '\n'.join(f"  {name:<18} {1000 * seconds:>9.1f} ms" for name, seconds in self.report().items())
+
+
+def print_profile(profiler: StageProfiler):
+    summary = profiler.summary()
+    if not summary:
+        return
+    print(f"{'stage':<16} {'count':>7} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, stats in summary.items():
+        print(f"{name:<16} {stats['count']:>7} {stats['mean_ms']:>9.2f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f}")
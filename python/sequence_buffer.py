@@ -0,0 +1,48 @@
+import numpy as np
+
+
+class SequenceRingBuffer:
+    """Fixed-capacity ring buffer of per-frame feature vectors.
+
+    Every frame is written twice, at ``i`` and ``i + capacity`` of a
+    ``(2 * capacity, feature_dim)`` array. The most recent ``capacity``
+    frames are then always one contiguous, chronologically ordered slice,
+    so the model can be fed a view without copying or allocating per frame.
+    """
+
+    def __init__(self, capacity: int = 30, feature_dim: int = 171, dtype=np.float32):
+        self.capacity = capacity
+        self.feature_dim = feature_dim
+        self.storage = np.zeros((2 * capacity, feature_dim), dtype=dtype)
+        self.head = 0  # next write position in [0, capacity)
+        self.size = 0
+
+    def append(self, features: np.ndarray):
+        """Copy one frame into the buffer, overwriting the oldest when full"""
+        self.storage[self.head] = features
+        self.storage[self.head + self.capacity] = features
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def window(self) -> np.ndarray:
+        """View of the buffered frames, oldest first, shape (len, feature_dim)"""
+        end = self.head + self.capacity
+        return self.storage[end - self.size:end]
+
+    def batch(self) -> np.ndarray:
+        """View of the buffered frames with a leading batch axis, ready for the model"""
+        return self.window()[np.newaxis]
+
+    def latest(self) -> np.ndarray:
+        """View of the most recently appended frame"""
+        return self.storage[self.head + self.capacity - 1]
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+
+    def is_full(self) -> bool:
+        return self.size == self.capacity
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,220 @@
+import json
+import os
+import tempfile
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INDEX_FILE = 'index.json'
+FORMAT_VERSION = 1
+SEQUENCES_SUFFIX = '.x.npy'
+LABELS_SUFFIX = '.y.npy'
+
+
+def shard_label_path(shard_path: str) -> str:
+    """Labels file that belongs to a ``<name>.x.npy`` sequences shard"""
+    return shard_path[:-len(SEQUENCES_SUFFIX)] + LABELS_SUFFIX
+
+
+def _read_index(root: str) -> Optional[Dict]:
+    path = os.path.join(root, INDEX_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _write_index(root: str, index: Dict):
+    # Readers only ever see a complete index
+    fd, tmp_path = tempfile.mkstemp(dir=root, suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, os.path.join(root, INDEX_FILE))
+
+
+class ShardedDatasetWriter:
+    """Append-only writer for (N, frames, features) sequences and integer labels.
+
+    Sequences are buffered and written as fixed-size shards
+    (``shard-XXXXX.x.npy`` / ``shard-XXXXX.y.npy``) described by
+    ``index.json``, which also records per-shard class counts. Reopening an
+    existing dataset continues appending; a trailing partial shard is read
+    back and rewritten so every shard but the last stays full.
+    """
+
+    def __init__(self, root: str, sequence_length: int = 30, feature_dim: int = 171,
+                 shard_size: int = 1024, dtype: str = 'float16',
+                 classes: Optional[Sequence[str]] = None):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+        index = _read_index(root)
+        if index is None:
+            index = {
+                'version': FORMAT_VERSION,
+                'sequence_length': sequence_length,
+                'feature_dim': feature_dim,
+                'shard_size': shard_size,
+                'dtype': dtype,
+                'classes': list(classes) if classes is not None else None,
+                'shards': [],
+            }
+        elif (index['sequence_length'], index['feature_dim']) != (sequence_length, feature_dim):
+            raise ValueError(
+                f"Dataset at {root} stores ({index['sequence_length']}, {index['feature_dim']}) "
+                f"sequences, got ({sequence_length}, {feature_dim})"
+            )
+        self.index = index
+        self.dtype = np.dtype(index['dtype'])
+        self.shard_size = index['shard_size']
+
+        self._sequences = []
+        self._labels = []
+        self._buffered = 0
+
+        shards = self.index['shards']
+        if shards and shards[-1]['count'] < self.shard_size:
+            last = shards.pop()
+            path = os.path.join(root, last['name'] + SEQUENCES_SUFFIX)
+            self._buffer(np.load(path), np.load(shard_label_path(path)))
+
+    def _buffer(self, sequences: np.ndarray, labels: np.ndarray):
+        self._sequences.append(np.asarray(sequences, dtype=self.dtype))
+        self._labels.append(np.asarray(labels, dtype=np.int64))
+        self._buffered += len(sequences)
+
+    def append(self, sequences: np.ndarray, labels: np.ndarray):
+        """Add a batch of sequences; full shards are written as they fill up"""
+        sequences = np.asarray(sequences).reshape(
+            len(sequences), self.index['sequence_length'], self.index['feature_dim'])
+        if len(sequences) != len(labels):
+            raise ValueError(f"{len(sequences)} sequences but {len(labels)} labels")
+
+        self._buffer(sequences, labels)
+        while self._buffered >= self.shard_size:
+            self._flush(self.shard_size)
+
+    def _flush(self, count: int):
+        sequences = np.concatenate(self._sequences)
+        labels = np.concatenate(self._labels)
+
+        name = f"shard-{len(self.index['shards']):05d}"
+        path = os.path.join(self.root, name + SEQUENCES_SUFFIX)
+        np.save(path, sequences[:count])
+        np.save(shard_label_path(path), labels[:count])
+
+        classes, counts = np.unique(labels[:count], return_counts=True)
+        self.index['shards'].append({
+            'name': name,
+            'count': int(count),
+            'class_counts': {str(c): int(n) for c, n in zip(classes, counts)},
+        })
+        _write_index(self.root, self.index)
+
+        self._sequences = [sequences[count:]] if count < len(sequences) else []
+        self._labels = [labels[count:]] if count < len(labels) else []
+        self._buffered -= count
+
+    def close(self):
+        """Write any buffered sequences as a final (possibly partial) shard"""
+        if self._buffered:
+            self._flush(self._buffered)
+        else:
+            _write_index(self.root, self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ShardedDataset:
+    """Memory-mapped random access to a dataset written by ShardedDatasetWriter"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index = _read_index(root)
+        if self.index is None:
+            raise FileNotFoundError(f"No {INDEX_FILE} in {root}")
+
+        counts = [shard['count'] for shard in self.index['shards']]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._shards = [None] * len(counts)
+
+    @property
+    def sequence_length(self) -> int:
+        return self.index['sequence_length']
+
+    @property
+    def feature_dim(self) -> int:
+        return self.index['feature_dim']
+
+    @property
+    def classes(self) -> Optional[List[str]]:
+        return self.index.get('classes')
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def shard_paths(self) -> List[str]:
+        return [os.path.join(self.root, shard['name'] + SEQUENCES_SUFFIX) for shard in self.index['shards']]
+
+    def _shard(self, shard_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self._shards[shard_id] is None:
+            path = self.shard_paths()[shard_id]
+            self._shards[shard_id] = (np.load(path, mmap_mode='r'),
+                                      np.load(shard_label_path(path), mmap_mode='r'))
+        return self._shards[shard_id]
+
+    def __getitem__(self, i: int) -> Tuple[np.ndarray, int]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        shard_id = int(np.searchsorted(self.offsets, i, side='right')) - 1
+        sequences, labels = self._shard(shard_id)
+        local = i - self.offsets[shard_id]
+        return sequences[local], int(labels[local])
+
+    def get_batch(self, indices: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Gather arbitrary sequences as float32, reading each shard once"""
+        indices = np.asarray(indices, dtype=np.int64)
+        X = np.empty((len(indices), self.sequence_length, self.feature_dim), dtype=np.float32)
+        y = np.empty(len(indices), dtype=np.int64)
+
+        shard_ids = np.searchsorted(self.offsets, indices, side='right') - 1
+        for shard_id in np.unique(shard_ids):
+            mask = shard_ids == shard_id
+            sequences, labels = self._shard(int(shard_id))
+            local = indices[mask] - self.offsets[shard_id]
+            X[mask] = sequences[local]
+            y[mask] = labels[local]
+        return X, y
+
+    def iter_shards(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (sequences, labels) memory-mapped shard by shard"""
+        for shard_id in range(len(self._shards)):
+            yield self._shard(shard_id)
+
+    def class_counts(self) -> Dict[int, int]:
+        """Number of sequences per label, from the index alone"""
+        totals = {}
+        for shard in self.index['shards']:
+            for label, count in shard['class_counts'].items():
+                totals[int(label)] = totals.get(int(label), 0) + count
+        return dict(sorted(totals.items()))
+
+
+def build_synthetic_dataset(root: str, num_samples: int, shard_size: int = 1024,
+                            chunk_size: int = 10000, seed: int = 0) -> ShardedDataset:
+    """Write the trainer's synthetic data to disk once so runs can reuse it"""
+    from train_model import SignLanguageModelTrainer
+
+    trainer = SignLanguageModelTrainer()
+    feature_dim = trainer.num_landmarks * trainer.num_features
+    with ShardedDatasetWriter(root, trainer.sequence_length, feature_dim, shard_size,
+                              classes=trainer.SYNTHETIC_SIGNS) as writer:
+        for X, y in trainer.generate_synthetic_data_chunks(num_samples, chunk_size, seed):
+            writer.append(X, y)
+    return ShardedDataset(root)
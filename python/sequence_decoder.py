@@ -0,0 +1,404 @@
+import argparse
+import json
+import math
+import time
+from collections import Counter, defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sign_events import SignEvent
+
+NEG_INF = float('-inf')
+
+
+def _logaddexp(a: float, b: float) -> float:
+    """log(exp(a) + exp(b)) for Python floats, much cheaper than np.logaddexp on scalars"""
+    if a < b:
+        a, b = b, a
+    if b == NEG_INF:
+        return a
+    return a + math.log1p(math.exp(b - a))
+
+
+class NGramPrior:
+    """Add-k smoothed n-gram model over sign labels (class indices).
+
+    ``log_prob(context, label)`` uses the last ``order - 1`` labels of
+    ``context``; sentence starts are padded with a start symbol, so the
+    prior also learns which signs tend to open a sentence.
+    """
+
+    START = -1
+
+    def __init__(self, num_classes: int, order: int = 2, k: float = 0.5):
+        if order < 1:
+            raise ValueError("order must be at least 1")
+        self.num_classes = num_classes
+        self.order = order
+        self.k = k
+        self.counts: Dict[Tuple[int, ...], Counter] = defaultdict(Counter)
+        self._rows: Dict[Tuple[int, ...], List[float]] = {}
+
+    def fit(self, sentences: Iterable[Sequence[int]]) -> 'NGramPrior':
+        for sentence in sentences:
+            padded = [self.START] * (self.order - 1) + [int(label) for label in sentence]
+            for i in range(self.order - 1, len(padded)):
+                self.counts[tuple(padded[i - self.order + 1:i])][padded[i]] += 1
+        self._rows.clear()
+        return self
+
+    def _context(self, context: Sequence[int]) -> Tuple[int, ...]:
+        if self.order == 1:
+            return ()
+        padded = [self.START] * (self.order - 1) + list(context[-(self.order - 1):])
+        return tuple(padded[-(self.order - 1):])
+
+    def log_prob(self, context: Sequence[int], label: int) -> float:
+        return self.log_probs(context)[label]
+
+    def log_probs(self, context: Sequence[int]) -> List[float]:
+        """Log prior of every label after ``context``, cached per n-gram context"""
+        key = self._context(context)
+        row = self._rows.get(key)
+        if row is None:
+            counts = self.counts.get(key) or Counter()
+            denominator = sum(counts.values()) + self.k * self.num_classes
+            row = self._rows[key] = [math.log((counts[label] + self.k) / denominator)
+                                     for label in range(self.num_classes)]
+        return row
+
+    @classmethod
+    def from_text(cls, path: str, label_map: Dict[int, str], order: int = 2, k: float = 0.5) -> 'NGramPrior':
+        """Fit on a text file with one sentence of space-separated sign labels per line"""
+        indices = {label: index for index, label in label_map.items()}
+        with open(path) as f:
+            sentences = [[indices[word] for word in line.split() if word in indices] for line in f]
+        return cls(len(label_map), order, k).fit(sentences)
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({
+                'num_classes': self.num_classes, 'order': self.order, 'k': self.k,
+                'counts': [[list(context), dict(counter)] for context, counter in self.counts.items()],
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'NGramPrior':
+        with open(path) as f:
+            data = json.load(f)
+        prior = cls(data['num_classes'], data['order'], data['k'])
+        for context, counter in data['counts']:
+            prior.counts[tuple(context)] = Counter({int(label): count for label, count in counter.items()})
+        return prior
+
+
+class _Beam:
+    """A labelling prefix with CTC blank / non-blank path scores (log space)"""
+    __slots__ = ('blank', 'non_blank', 'spans', 'last')
+
+    def __init__(self, blank: float = NEG_INF, non_blank: float = NEG_INF, spans: Tuple = (),
+                 last: Optional[int] = None):
+        self.blank = blank
+        self.non_blank = non_blank
+        # (start, end, steps, peak probability) per label, from the best path
+        self.spans = spans
+        # Last emitted label, kept when a commit empties the prefix so that a
+        # continuing sign still collapses into the committed one
+        self.last = last
+
+    @property
+    def total(self) -> float:
+        return _logaddexp(self.blank, self.non_blank)
+
+
+class StreamingSignDecoder:
+    """Incremental CTC-style prefix beam search over per-window class probabilities.
+
+    Consecutive sliding windows overlap, so one sign shows up as a run of
+    windows with the same argmax; like CTC, repeats collapse into one
+    sign and a "blank" (no sign) separates two signs of the same class.
+    The blank probability of a window is the model's background class
+    when ``blank_index`` is given, otherwise ``1 - max(p)``, i.e. how
+    unsure the model is. Starting a new sign costs ``insertion_penalty``
+    (log space); without it every brief dip in confidence between windows
+    of one sign would split it in two. The penalty scales with how many
+    windows a sign spans, i.e. the window stride. An optional NGramPrior
+    adds ``lm_weight`` times the label's log prior on top.
+
+    Memory and per-window latency are bounded: each step touches at most
+    ``beam_width`` beams times the classes above ``candidate_threshold``,
+    and labels every beam agrees on are committed and dropped from the
+    beams. If the beams keep disagreeing for more than ``max_pending``
+    labels, the best beam's oldest label is committed anyway, and no beam
+    may hold more than twice that many. Only the last ``history``
+    committed signs are kept (for display); ``update`` returns each
+    committed sign once, so callers that need them all collect them there.
+    """
+
+    def __init__(self, num_classes: int, label_map: Optional[Dict[int, str]] = None,
+                 beam_width: int = 8, blank_index: Optional[int] = None,
+                 prior: Optional[NGramPrior] = None, lm_weight: float = 1.0,
+                 insertion_penalty: float = 8.0, candidate_threshold: float = 1e-3,
+                 max_pending: int = 8, history: int = 32):
+        self.num_classes = num_classes
+        self.label_map = label_map or {}
+        self.beam_width = beam_width
+        self.blank_index = blank_index
+        self.prior = prior
+        self.lm_weight = lm_weight
+        self.insertion_penalty = insertion_penalty
+        self.log_candidate_threshold = math.log(candidate_threshold)
+        self.max_pending = max_pending
+        self.committed = deque(maxlen=history)
+        self.reset()
+
+    def reset(self):
+        """Start a new stream"""
+        self.beams: Dict[Tuple[int, ...], _Beam] = {(): _Beam(blank=0.0)}
+        self.context: List[int] = []  # committed labels the prior still needs
+        self.steps = 0
+
+    def label(self, class_index: int) -> str:
+        return self.label_map.get(class_index, "Unknown")
+
+    def _emissions(self, probabilities: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Log blank probability and log per-class emission probabilities"""
+        p = np.array(probabilities, dtype=np.float64)
+        if self.blank_index is not None:
+            blank = p[self.blank_index]
+            p[self.blank_index] = 0.0
+        else:
+            blank = 1.0 - p.max()
+            p = p * (1.0 - blank) / max(p.sum(), 1e-12)
+        with np.errstate(divide='ignore'):
+            return math.log(max(blank, 1e-12)), np.log(p)
+
+    def _prior_row(self, prefix: Tuple[int, ...]) -> Optional[List[float]]:
+        if self.prior is None:
+            return None
+        return self.prior.log_probs(self.context + list(prefix))
+
+    def update(self, probabilities: np.ndarray, timestamp: Optional[float] = None) -> List[SignEvent]:
+        """Consume one window's probabilities; return the signs committed by this step"""
+        timestamp = self.steps if timestamp is None else timestamp
+        log_blank, log_p = self._emissions(probabilities)
+        candidates = np.flatnonzero(log_p > self.log_candidate_threshold).tolist()
+        # Python floats: the loops below are scalar math, where numpy scalars are slow
+        log_p = log_p.tolist()
+        probabilities = np.asarray(probabilities, dtype=np.float64).tolist()
+        max_labels = 2 * self.max_pending
+        next_beams: Dict[Tuple[int, ...], _Beam] = {}
+
+        def extend(prefix, spans, last, blank=NEG_INF, non_blank=NEG_INF):
+            beam = next_beams.get(prefix)
+            if beam is None:
+                next_beams[prefix] = _Beam(blank, non_blank, spans, last)
+                return
+            # Keep the timing (and committed context) of whichever path is more likely
+            if _logaddexp(blank, non_blank) > beam.total:
+                beam.spans = spans
+                beam.last = last
+            beam.blank = _logaddexp(beam.blank, blank)
+            beam.non_blank = _logaddexp(beam.non_blank, non_blank)
+
+        for prefix, beam in self.beams.items():
+            total = beam.total
+            last = beam.last
+            extend(prefix, beam.spans, last, blank=total + log_blank)
+            if last is not None and beam.non_blank > NEG_INF:
+                spans = beam.spans
+                if prefix:
+                    start, _, steps, peak = spans[-1]
+                    spans = spans[:-1] + ((start, timestamp, steps + 1, max(peak, probabilities[last])),)
+                # else the sign was already committed; its timing is final
+                extend(prefix, spans, last, non_blank=beam.non_blank + log_p[last])
+            if len(prefix) >= max_labels:
+                continue
+            prior = self._prior_row(prefix)
+            for label in candidates:
+                # A repeated label only starts a new sign after a blank
+                source = beam.blank if label == last else total
+                if source == NEG_INF:
+                    continue
+                score = source + log_p[label] - self.insertion_penalty
+                if prior is not None:
+                    score += self.lm_weight * prior[label]
+                spans = beam.spans + ((timestamp, timestamp, 1, probabilities[label]),)
+                extend(prefix + (label,), spans, label, non_blank=score)
+
+        ranked = sorted(next_beams.items(), key=lambda item: item[1].total, reverse=True)
+        self.beams = dict(ranked[:self.beam_width])
+        self.steps += 1
+        return self._commit()
+
+    def _commit(self) -> List[SignEvent]:
+        """Move labels all beams agree on (and overflow past max_pending) out of the beams"""
+        prefixes = list(self.beams)
+        best = prefixes[0]
+        shared = 0
+        while all(len(p) > shared and p[shared] == best[shared] for p in prefixes):
+            shared += 1
+        # A label that ends some beam may still grow, so it stays pending
+        if any(len(p) == shared for p in prefixes):
+            shared -= 1
+        count = max(shared, len(best) - self.max_pending, 0)
+        if count == 0:
+            return []
+
+        committed = [self._event(label, span) for label, span in zip(best[:count], self.beams[best].spans)]
+        kept = {}
+        for prefix, beam in self.beams.items():
+            if prefix[:count] == best[:count]:
+                beam.spans = beam.spans[count:]
+                kept[prefix[count:]] = beam
+        self.beams = kept
+        self.committed.extend(committed)
+        order = self.prior.order if self.prior is not None else 1
+        self.context = (self.context + list(best[:count]))[-max(order - 1, 0):] if order > 1 else []
+        return committed
+
+    def _event(self, label: int, span) -> SignEvent:
+        start, end, steps, peak = span
+        return SignEvent(label, self.label(label), start, end, steps, peak)
+
+    def flush(self) -> List[SignEvent]:
+        """Commit the best beam at the end of the stream"""
+        best, beam = max(self.beams.items(), key=lambda item: item[1].total)
+        events = [self._event(label, span) for label, span in zip(best, beam.spans)]
+        self.committed.extend(events)
+        self.reset()
+        return events
+
+    @property
+    def pending(self) -> List[str]:
+        """Labels of the best beam not committed yet"""
+        best = max(self.beams.items(), key=lambda item: item[1].total)[0]
+        return [self.label(label) for label in best]
+
+    def decode(self, probabilities: np.ndarray, timestamps: Optional[Sequence[float]] = None) -> List[SignEvent]:
+        """Signs of a whole (windows, classes) sequence"""
+        self.reset()
+        if timestamps is None:
+            timestamps = range(len(probabilities))
+        events = []
+        for row, timestamp in zip(probabilities, timestamps):
+            events.extend(self.update(row, timestamp))
+        events.extend(self.flush())
+        return events
+
+
+def edit_distance(reference: Sequence[int], hypothesis: Sequence[int]) -> int:
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i]
+        for j, hyp in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref != hyp)))
+        previous = current
+    return previous[-1]
+
+
+def synthetic_stream(num_signs: int = 200, num_classes: int = 8, seed: int = 0,
+                     transitions: Optional[np.ndarray] = None):
+    """Noisy per-window probabilities of a continuous signing stream, plus the true label sequence.
+
+    Signs follow a sparse Markov chain (so an n-gram prior has something to
+    learn), last 15-40 windows, are separated by short uncertain gaps, and
+    are sometimes confused with another class for part of their duration.
+    """
+    rng = np.random.default_rng(seed)
+    if transitions is None:
+        transitions = synthetic_grammar(num_classes)
+    labels = [int(rng.integers(num_classes))]
+    for _ in range(num_signs - 1):
+        labels.append(int(rng.choice(num_classes, p=transitions[labels[-1]])))
+
+    rows = []
+    for label in labels:
+        length = int(rng.integers(15, 40))
+        logits = rng.normal(0.0, 1.0, (length, num_classes))
+        logits[:, label] += 4.0
+        if rng.random() < 0.3:
+            confuser = int(rng.integers(num_classes))
+            begin = int(rng.integers(0, length // 2))
+            logits[begin:begin + length // 3, confuser] += 5.0
+        rows.append(logits)
+        gap = int(rng.integers(0, 8))
+        if gap:
+            rows.append(rng.normal(0.0, 0.7, (gap, num_classes)))
+    logits = np.concatenate(rows)
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return (exp / exp.sum(axis=1, keepdims=True)).astype(np.float32), labels
+
+
+def synthetic_grammar(num_classes: int, successors: int = 2, seed: int = 1) -> np.ndarray:
+    """Transition matrix where every sign is usually followed by one of a few others"""
+    rng = np.random.default_rng(seed)
+    transitions = np.full((num_classes, num_classes), 0.05 / num_classes)
+    for label in range(num_classes):
+        transitions[label, rng.choice(num_classes, successors, replace=False)] += 0.95 / successors
+    return transitions / transitions.sum(axis=1, keepdims=True)
+
+
+def evaluate_decoders(num_signs: int = 300, num_classes: int = 8, seed: int = 0) -> Tuple[List[Dict], int, int]:
+    """Label error rate and per-window latency of event detection vs beam search (with/without prior).
+
+    Returns the report plus the number of windows and reference signs it was measured on.
+    """
+    from sign_events import SignDecisionEngine
+
+    grammar = synthetic_grammar(num_classes)
+    probabilities, reference = synthetic_stream(num_signs, num_classes, seed, grammar)
+    training = [synthetic_stream(50, num_classes, seed + 1 + i, grammar)[1] for i in range(20)]
+    prior = NGramPrior(num_classes, order=2).fit(training)
+
+    decoders = {
+        'event detection (EMA)': SignDecisionEngine(num_classes),
+        'beam search': StreamingSignDecoder(num_classes),
+        'beam search + bigram prior': StreamingSignDecoder(num_classes, prior=prior),
+    }
+    report = []
+    for name, decoder in decoders.items():
+        start = time.perf_counter()
+        if isinstance(decoder, StreamingSignDecoder):
+            max_beam_labels = 0
+            hypothesis = []
+            for t, row in enumerate(probabilities):
+                hypothesis += [event.class_index for event in decoder.update(row, t)]
+                max_beam_labels = max(max_beam_labels, max(len(p) for p in decoder.beams))
+            hypothesis += [event.class_index for event in decoder.flush()]
+        else:
+            hypothesis = [event.class_index for event in decoder.run(probabilities)]
+            max_beam_labels = None
+        elapsed = time.perf_counter() - start
+        report.append({
+            'name': name,
+            'signs': len(hypothesis),
+            'label_error_rate': edit_distance(reference, hypothesis) / len(reference),
+            'us_per_window': 1e6 * elapsed / len(probabilities),
+            'max_pending_labels': max_beam_labels,
+        })
+    return report, len(probabilities), len(reference)
+
+
+def main():
+    """Compare sign sequence decoders on a synthetic continuous signing stream"""
+    parser = argparse.ArgumentParser(description="Continuous sign segmentation and decoding")
+    parser.add_argument('--signs', type=int, default=300)
+    parser.add_argument('--classes', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report, windows, signs = evaluate_decoders(args.signs, args.classes, args.seed)
+    print("Sign Sequence Decoding")
+    print("=" * 40)
+    print(f"Windows: {windows}, reference signs: {signs}")
+    print(f"{'decoder':<28} {'signs':>6} {'LER':>7} {'us/window':>10} {'max pending':>12}")
+    for r in report:
+        pending = '-' if r['max_pending_labels'] is None else r['max_pending_labels']
+        print(f"{r['name']:<28} {r['signs']:>6} {100 * r['label_error_rate']:>6.1f}% "
+              f"{r['us_per_window']:>10.1f} {pending:>12}")
+
+
+if __name__ == "__main__":
+    main()
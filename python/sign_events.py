@@ -0,0 +1,241 @@
+import argparse
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+SMOOTHING_METHODS = ('ema', 'vote')
+
+
+@dataclass
+class SignEvent:
+    """One recognized sign, from the first to the last frame it was held"""
+    class_index: int
+    label: str
+    start: float
+    end: float
+    frames: int
+    confidence: float  # peak smoothed score while the sign was held
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class SignDecisionEngine:
+    """Turns per-frame class probabilities into stable labels and discrete sign events.
+
+    The last ``window`` probability vectors are kept in a fixed-size ring
+    array and smoothed into one score per class, either as an exponential
+    moving average (``method='ema'``, weight ``alpha`` for the newest frame)
+    or as the fraction of frames in the window whose argmax is the class
+    (``method='vote'``). A sign starts when its score reaches
+    ``on_threshold`` and is held until it drops below ``off_threshold`` or
+    another class reaches ``on_threshold``; the gap between the two
+    thresholds is what stops the label from flickering. Signs held for
+    fewer than ``min_frames`` frames are discarded. Timestamps are whatever
+    the caller passes: seconds for a live camera, frame indices for video.
+    """
+
+    def __init__(self, num_classes: int, label_map: Optional[Dict[int, str]] = None,
+                 method: str = 'ema', alpha: float = 0.3, window: int = 10,
+                 on_threshold: float = 0.82, off_threshold: float = 0.6, min_frames: int = 3):
+        if method not in SMOOTHING_METHODS:
+            raise ValueError(f"Unknown smoothing method '{method}', expected one of {SMOOTHING_METHODS}")
+        if off_threshold > on_threshold:
+            raise ValueError("off_threshold must not exceed on_threshold")
+        self.num_classes = num_classes
+        self.label_map = label_map or {}
+        self.method = method
+        self.alpha = alpha
+        self.window = window
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.min_frames = min_frames
+
+        self.history = np.zeros((window, num_classes), dtype=np.float32)
+        self.scores = np.zeros(num_classes, dtype=np.float32)
+        self._winners = np.zeros(window, dtype=np.int64)
+        self._votes = np.zeros(num_classes, dtype=np.int64)
+        self.events: List[SignEvent] = []
+        self.reset()
+
+    def reset(self):
+        """Forget the history and drop any sign in progress, e.g. when the buffer is cleared"""
+        self.history.fill(0.0)
+        self.scores.fill(0.0)
+        self._votes.fill(0)
+        self._position = 0
+        self._filled = 0
+        self.active = None
+        self._start = self._end = None
+        self._frames = 0
+        self._peak = 0.0
+
+    def label(self, class_index: int) -> str:
+        return self.label_map.get(class_index, "Unknown")
+
+    def _smooth(self, probabilities: np.ndarray) -> np.ndarray:
+        slot = self._position
+        self.history[slot] = probabilities
+        if self.method == 'ema':
+            if self._filled == 0:
+                self.scores[:] = self.history[slot]
+            else:
+                self.scores *= 1.0 - self.alpha
+                self.scores += self.alpha * self.history[slot]
+        else:
+            if self._filled == self.window:
+                self._votes[self._winners[slot]] -= 1
+            winner = int(self.history[slot].argmax())
+            self._winners[slot] = winner
+            self._votes[winner] += 1
+            np.divide(self._votes, min(self._filled + 1, self.window), out=self.scores)
+
+        self._position = (slot + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+        return self.scores
+
+    def _open(self, class_index: int, timestamp: float, score: float):
+        self.active = class_index
+        self._start = self._end = timestamp
+        self._frames = 1
+        self._peak = score
+
+    def _close(self) -> Optional[SignEvent]:
+        event = None
+        if self.active is not None and self._frames >= self.min_frames:
+            event = SignEvent(self.active, self.label(self.active), self._start, self._end,
+                              self._frames, self._peak)
+            self.events.append(event)
+        self.active = None
+        return event
+
+    def update(self, probabilities: np.ndarray, timestamp: float) -> Optional[SignEvent]:
+        """Smooth one frame's probabilities; return the sign that just ended, if any"""
+        scores = self._smooth(probabilities)
+        best = int(scores.argmax())
+        best_score = float(scores[best])
+
+        finished = None
+        if self.active is not None:
+            score = float(scores[self.active])
+            displaced = best != self.active and best_score >= self.on_threshold
+            if score >= self.off_threshold and not displaced:
+                self._end = timestamp
+                self._frames += 1
+                self._peak = max(self._peak, score)
+                return None
+            finished = self._close()
+
+        if best_score >= self.on_threshold:
+            self._open(best, timestamp, best_score)
+        return finished
+
+    def flush(self) -> Optional[SignEvent]:
+        """End the sign in progress, e.g. at the end of a video"""
+        return self._close()
+
+    @property
+    def current(self) -> Optional[str]:
+        """Label of the sign being held, or None"""
+        return None if self.active is None else self.label(self.active)
+
+    @property
+    def current_score(self) -> float:
+        return 0.0 if self.active is None else float(self.scores[self.active])
+
+    def run(self, probabilities: np.ndarray, timestamps: Optional[Sequence[float]] = None) -> List[SignEvent]:
+        """Events of a whole (frames, classes) sequence, e.g. from batch video inference"""
+        self.reset()
+        first = len(self.events)
+        if timestamps is None:
+            timestamps = np.arange(len(probabilities))
+        for row, timestamp in zip(np.asarray(probabilities, dtype=np.float32), timestamps):
+            self.update(row, float(timestamp))
+        self.flush()
+        return self.events[first:]
+
+
+def synthetic_probabilities(num_frames: int = 3000, num_classes: int = 8, seed: int = 0):
+    """Noisy (frames, classes) softmax outputs over alternating signs and pauses, plus the true segments"""
+    rng = np.random.default_rng(seed)
+    logits = rng.normal(0.0, 1.0, (num_frames, num_classes))
+    segments = []
+    t = 0
+    while t < num_frames:
+        length = min(int(rng.integers(20, 60)), num_frames - t)
+        if rng.random() < 0.6:
+            class_index = int(rng.integers(num_classes))
+            logits[t:t + length, class_index] += 4.0
+            segments.append((class_index, t, t + length - 1))
+        t += length
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return (exp / exp.sum(axis=1, keepdims=True)).astype(np.float32), segments
+
+
+def label_changes(labels: Sequence[Optional[int]]) -> int:
+    """How often the displayed label changes, including to and from 'nothing'"""
+    return sum(1 for previous, current in zip(labels, labels[1:]) if previous != current)
+
+
+def evaluate_smoothing(probabilities: np.ndarray, segments, threshold: float = 0.82,
+                       configs: Optional[Sequence[Dict]] = None) -> List[Dict]:
+    """Label flicker, event count and per-frame cost of each engine config vs the raw argmax"""
+    raw = [int(row.argmax()) if row.max() > threshold else None for row in probabilities]
+    report = [{'name': 'raw argmax', 'label_changes': label_changes(raw), 'events': None, 'us_per_frame': 0.0}]
+
+    configs = configs or [
+        {'method': 'ema', 'alpha': 0.3},
+        {'method': 'ema', 'alpha': 0.15},
+        {'method': 'vote', 'window': 10, 'on_threshold': 0.7, 'off_threshold': 0.5},
+    ]
+    num_classes = probabilities.shape[1]
+    for config in configs:
+        engine = SignDecisionEngine(num_classes, **config)
+        displayed = []
+        start = time.perf_counter()
+        for t, row in enumerate(probabilities):
+            engine.update(row, t)
+            displayed.append(engine.active)
+        elapsed = time.perf_counter() - start
+        engine.flush()
+        correct = sum(1 for event in engine.events
+                      if any(event.class_index == c and event.start <= end and event.end >= begin
+                             for c, begin, end in segments))
+        report.append({
+            'name': ' '.join(f"{key}={value}" for key, value in config.items()),
+            'label_changes': label_changes(displayed),
+            'events': len(engine.events),
+            'matching_events': correct,
+            'us_per_frame': 1e6 * elapsed / len(probabilities),
+        })
+    return report
+
+
+def main():
+    """Compare smoothing configs on synthetic softmax outputs"""
+    parser = argparse.ArgumentParser(description="Temporal smoothing and sign event detection")
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--classes', type=int, default=8)
+    args = parser.parse_args()
+
+    probabilities, segments = synthetic_probabilities(args.frames, args.classes)
+    report = evaluate_smoothing(probabilities, segments)
+
+    print("Sign Event Detection")
+    print("=" * 40)
+    print(f"Frames: {args.frames}, true signs: {len(segments)}")
+    print(f"{'config':<56} {'changes':>8} {'events':>7} {'matching':>9} {'us/frame':>9}")
+    for r in report:
+        events = '-' if r['events'] is None else r['events']
+        matching = r.get('matching_events', '-')
+        print(f"{r['name']:<56} {r['label_changes']:>8} {events:>7} {matching:>9} {r['us_per_frame']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
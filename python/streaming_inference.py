@@ -0,0 +1,262 @@
+import time
+import numpy as np
+from typing import List, Tuple, Dict, Optional
+
+ACTIVATIONS = {
+    'tanh': np.tanh,
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    'hard_sigmoid': lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+    'relu': lambda x: np.maximum(x, 0.0),
+    'linear': lambda x: x,
+}
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS['softmax'] = _softmax
+
+
+class LSTMStepCell:
+    """Single-step NumPy export of a Sequential LSTM/Dense stack.
+
+    The recurrent state of every LSTM layer is carried explicitly, so a new
+    frame costs one matrix product per layer instead of a full window replay.
+    States are stacked along axis 0, which lets several independent tracks be
+    advanced with the same frame in one call.
+    """
+
+    def __init__(self, layers: List[Dict]):
+        self.layers = layers
+        self.lstm_units = [layer['units'] for layer in layers if layer['type'] == 'lstm']
+        self.input_dim = layers[0]['kernel'].shape[0]
+
+    @classmethod
+    def from_keras(cls, model) -> 'LSTMStepCell':
+        """Export weights from a trained Keras model"""
+        layers = []
+        for layer in model.layers:
+            kind = layer.__class__.__name__
+            config = layer.get_config()
+
+            if kind in ('InputLayer', 'Dropout'):
+                # Dropout is the identity at inference time
+                continue
+
+            if kind == 'LSTM':
+                weights = layer.get_weights()
+                kernel, recurrent = weights[0], weights[1]
+                bias = weights[2] if config.get('use_bias', True) else np.zeros(kernel.shape[1])
+                layers.append({
+                    'type': 'lstm',
+                    'units': config['units'],
+                    'kernel': kernel.astype(np.float32),
+                    'recurrent': recurrent.astype(np.float32),
+                    'bias': bias.astype(np.float32),
+                    'activation': ACTIVATIONS[config.get('activation', 'tanh')],
+                    'recurrent_activation': ACTIVATIONS[config.get('recurrent_activation', 'sigmoid')],
+                })
+            elif kind == 'Dense':
+                weights = layer.get_weights()
+                bias = weights[1] if config.get('use_bias', True) else np.zeros(weights[0].shape[1])
+                layers.append({
+                    'type': 'dense',
+                    'kernel': weights[0].astype(np.float32),
+                    'bias': bias.astype(np.float32),
+                    'activation': ACTIVATIONS[config.get('activation', 'linear')],
+                })
+            else:
+                raise ValueError(f"Unsupported layer for streaming export: {kind}")
+
+        if not layers or layers[0]['type'] != 'lstm':
+            raise ValueError("Streaming export expects the model to start with an LSTM layer")
+
+        return cls(layers)
+
+    def initial_state(self, num_tracks: int = 1) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Zero (h, c) state for each LSTM layer"""
+        return [
+            (np.zeros((num_tracks, units), dtype=np.float32),
+             np.zeros((num_tracks, units), dtype=np.float32))
+            for units in self.lstm_units
+        ]
+
+    def step(self, frame: np.ndarray,
+             state: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, List[Tuple[np.ndarray, np.ndarray]]]:
+        """Advance every track by one frame and return (outputs, new_state)"""
+        x = np.asarray(frame, dtype=np.float32)
+        new_state = []
+        lstm_idx = 0
+
+        for layer in self.layers:
+            if layer['type'] == 'lstm':
+                h, c = state[lstm_idx]
+                units = layer['units']
+                act = layer['activation']
+                rec_act = layer['recurrent_activation']
+
+                # Gate order matches Keras: input, forget, cell, output
+                z = x @ layer['kernel'] + h @ layer['recurrent'] + layer['bias']
+                i = rec_act(z[:, :units])
+                f = rec_act(z[:, units:2 * units])
+                c = f * c + i * act(z[:, 2 * units:3 * units])
+                o = rec_act(z[:, 3 * units:])
+                h = o * act(c)
+
+                new_state.append((h, c))
+                lstm_idx += 1
+                x = h
+            else:
+                x = layer['activation'](x @ layer['kernel'] + layer['bias'])
+
+        return x, new_state
+
+
+class StreamingSignPredictor:
+    """O(1)-per-frame replacement for re-running the LSTM over a sliding window.
+
+    A stateful track started from zero state and fed exactly
+    ``sequence_length`` frames reproduces the sliding-window output. Past that
+    point the track has seen more history than the window and slowly drifts.
+    To stay in sync, a fresh track is started every ``resync_interval``
+    frames; output comes from the youngest track that has seen a full window,
+    and older tracks are dropped. When a new track matures its output is
+    compared against the one it replaces: if the drift exceeds ``tolerance``
+    the interval is halved, and if it stays well inside it is doubled again
+    (up to ``sequence_length``).
+    """
+
+    def __init__(self, model, sequence_length: int = 30, resync_interval: int = 10,
+                 tolerance: float = 0.05, adaptive: bool = True):
+        self.cell = model if isinstance(model, LSTMStepCell) else LSTMStepCell.from_keras(model)
+        self.sequence_length = sequence_length
+        self.resync_interval = max(1, min(resync_interval, sequence_length))
+        self.tolerance = tolerance
+        self.adaptive = adaptive
+        self.reset()
+
+    def reset(self):
+        """Drop all tracks, e.g. when the frame buffer is cleared"""
+        self.state = self.cell.initial_state(0)
+        self.ages = np.zeros(0, dtype=np.int64)
+        self.frames_seen = 0
+        self.frames_since_spawn = 0
+        self.last_drift = 0.0
+        self.resync_count = 0
+
+    @property
+    def num_tracks(self) -> int:
+        return len(self.ages)
+
+    def _spawn_track(self):
+        fresh = self.cell.initial_state(1)
+        self.state = [
+            (np.concatenate([h, fh]), np.concatenate([c, fc]))
+            for (h, c), (fh, fc) in zip(self.state, fresh)
+        ]
+        self.ages = np.append(self.ages, 0)
+        self.frames_since_spawn = 0
+
+    def _keep_tracks(self, keep: np.ndarray):
+        self.state = [(h[keep], c[keep]) for h, c in self.state]
+        self.ages = self.ages[keep]
+
+    def update(self, features: np.ndarray) -> Optional[np.ndarray]:
+        """Consume one frame; return class probabilities once a window is full"""
+        if self.num_tracks == 0 or self.frames_since_spawn >= self.resync_interval:
+            self._spawn_track()
+
+        outputs, self.state = self.cell.step(features, self.state)
+        self.ages += 1
+        self.frames_seen += 1
+        self.frames_since_spawn += 1
+
+        if self.frames_seen < self.sequence_length:
+            return None
+
+        mature = np.flatnonzero(self.ages >= self.sequence_length)
+        # Tracks are appended in spawn order, so the last mature one is the youngest
+        current = mature[-1]
+
+        if self.ages[current] == self.sequence_length and len(mature) > 1:
+            # A track just became exact: measure how far the previous one drifted
+            self.last_drift = float(np.max(np.abs(outputs[current] - outputs[mature[-2]])))
+            self.resync_count += 1
+            if self.adaptive:
+                if self.last_drift > self.tolerance:
+                    self.resync_interval = max(1, self.resync_interval // 2)
+                elif self.last_drift < self.tolerance / 4:
+                    self.resync_interval = min(self.sequence_length, self.resync_interval * 2)
+
+        probabilities = outputs[current]
+        self._keep_tracks(np.arange(current, self.num_tracks))
+        return probabilities
+
+
+def benchmark_streaming(model, num_frames: int = 300, sequence_length: int = 30,
+                        resync_interval: int = 10, tolerance: float = 0.05,
+                        seed: int = 0) -> Dict[str, float]:
+    """Compare per-frame cost and output agreement against the sliding-window path"""
+    rng = np.random.default_rng(seed)
+    input_dim = model.input_shape[-1]
+
+    # Smooth random walk so consecutive frames look like real landmark motion
+    frames = np.cumsum(rng.normal(0.0, 0.02, (num_frames, input_dim)), axis=0).astype(np.float32)
+
+    window_outputs = []
+    start = time.perf_counter()
+    for t in range(sequence_length - 1, num_frames):
+        window = frames[t - sequence_length + 1:t + 1][None]
+        window_outputs.append(model.predict(window, verbose=0)[0])
+    window_time = time.perf_counter() - start
+    window_outputs = np.array(window_outputs)
+
+    streamer = StreamingSignPredictor(model, sequence_length, resync_interval, tolerance)
+    stream_outputs = []
+    start = time.perf_counter()
+    for t in range(num_frames):
+        probabilities = streamer.update(frames[t])
+        if probabilities is not None:
+            stream_outputs.append(probabilities)
+    stream_time = time.perf_counter() - start
+    stream_outputs = np.array(stream_outputs)
+
+    num_windows = len(window_outputs)
+    diff = np.abs(window_outputs - stream_outputs)
+    return {
+        'window_ms_per_frame': 1000 * window_time / num_windows,
+        'streaming_ms_per_frame': 1000 * stream_time / num_frames,
+        'speedup': (window_time / num_windows) / (stream_time / num_frames),
+        'max_abs_diff': float(diff.max()),
+        'mean_abs_diff': float(diff.mean()),
+        'argmax_agreement': float(np.mean(window_outputs.argmax(1) == stream_outputs.argmax(1))),
+        'final_resync_interval': streamer.resync_interval,
+    }
+
+
+def main():
+    """Benchmark streaming inference against the sliding-window path"""
+    import os
+    import tensorflow as tf
+
+    print("Streaming LSTM Inference Benchmark")
+    print("=" * 40)
+
+    if os.path.exists('best_model2.keras'):
+        model = tf.keras.models.load_model('best_model2.keras')
+    else:
+        print("No trained model found, using an untrained model")
+        from train_model import SignLanguageModelTrainer
+        model = SignLanguageModelTrainer().create_model(num_classes=8)
+
+    for interval in (30, 10, 5):
+        results = benchmark_streaming(model, resync_interval=interval)
+        print(f"\nresync_interval={interval}")
+        for key, value in results.items():
+            print(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
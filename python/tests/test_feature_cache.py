@@ -0,0 +1,49 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_cache import TEMP_SUFFIX, FeatureCache
+
+
+def _video(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_hit_does_not_build_an_extractor(tmp_path):
+    cache = FeatureCache(str(tmp_path / 'cache'))
+    video = _video(tmp_path, 'a.mp4', b'a' * 64)
+    cache.put(video, np.ones((4, 171)))
+
+    def make_extractor():
+        raise AssertionError("extractor built on a cache hit")
+
+    features = cache.get_or_extract(video, make_extractor=make_extractor)
+    assert features.shape == (4, 171)
+    assert cache.hits == 1
+
+
+def test_eviction_removes_memos_but_not_in_flight_writes(tmp_path):
+    cache = FeatureCache(str(tmp_path / 'cache'))
+    in_flight = os.path.join(cache.entry_dir, 'partial' + TEMP_SUFFIX)
+    with open(in_flight, 'wb') as f:
+        f.write(b'x' * 4096)
+    for i in range(3):
+        cache.put(_video(tmp_path, f'{i}.mp4', bytes([i]) * 64), np.zeros((4, 171)))
+    assert len(os.listdir(cache.hash_dir)) == 3
+
+    cache.max_bytes = 0
+    cache.evict()
+    assert cache.size_bytes() == 0
+    assert os.listdir(cache.hash_dir) == []
+    assert os.path.exists(in_flight)
+
+
+def test_memo_is_shared_between_instances(tmp_path):
+    root = str(tmp_path / 'cache')
+    video = _video(tmp_path, 'a.mp4', b'a' * 64)
+    first = FeatureCache(root).video_hash(video)
+    assert FeatureCache(root).video_hash(video) == first
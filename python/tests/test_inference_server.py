@@ -0,0 +1,133 @@
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference_server import FEATURE_DIM, SEQUENCE_LENGTH, BatcherClosed, InferenceServer, MicroBatcher
+
+
+def _serve(predict_batch):
+    batcher = MicroBatcher(predict_batch, max_batch_size=4, max_wait_ms=1.0)
+    server = InferenceServer(batcher, {0: 'hello', 1: 'thanks'}, port=0).start()
+    return batcher, server
+
+
+@pytest.fixture
+def window():
+    return np.zeros((SEQUENCE_LENGTH, FEATURE_DIM), dtype=np.float32).tolist()
+
+
+def _post(server, payload):
+    connection = http.client.HTTPConnection(*server.address, timeout=10)
+    connection.request('POST', '/predict', json.dumps(payload), {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+def test_predict_returns_label(window):
+    batcher, server = _serve(lambda batch: np.tile([0.2, 0.8], (len(batch), 1)))
+    try:
+        status, body = _post(server, {'stream_id': 'cam0', 'window': window})
+    finally:
+        server.shutdown()
+        batcher.close()
+    assert status == 200
+    assert body['label'] == 'thanks'
+    assert body['stream_id'] == 'cam0'
+
+
+def test_predictor_failure_returns_500(window):
+    def failing(batch):
+        raise RuntimeError("model crashed")
+
+    batcher, server = _serve(failing)
+    try:
+        status, body = _post(server, {'window': window})
+    finally:
+        server.shutdown()
+        batcher.close()
+    assert status == 500
+    assert 'model crashed' in body['error']
+
+
+def test_malformed_window_returns_400():
+    batcher, server = _serve(lambda batch: np.zeros((len(batch), 2)))
+    try:
+        status, body = _post(server, {'window': [1.0, 2.0]})
+    finally:
+        server.shutdown()
+        batcher.close()
+    assert status == 400
+
+
+def test_malformed_content_length_returns_400():
+    batcher, server = _serve(lambda batch: np.zeros((len(batch), 2)))
+    try:
+        connection = http.client.HTTPConnection(*server.address, timeout=10)
+        connection.putrequest('POST', '/predict')
+        connection.putheader('Content-Type', 'application/json')
+        connection.putheader('Content-Length', 'not-a-number')
+        connection.endheaders()
+        response = connection.getresponse()
+        status = response.status
+        response.read()
+        connection.close()
+    finally:
+        server.shutdown()
+        batcher.close()
+    assert status == 400
+
+
+def test_model_value_error_is_a_server_error(window):
+    def failing(batch):
+        raise ValueError("bad weights")
+
+    batcher, server = _serve(failing)
+    try:
+        status, body = _post(server, {'window': window})
+    finally:
+        server.shutdown()
+        batcher.close()
+    assert status == 500
+    assert 'bad weights' in body['error']
+
+
+def test_slow_prediction_times_out_with_503(window):
+    release = threading.Event()
+    batcher = MicroBatcher(lambda batch: release.wait(5) and np.zeros((len(batch), 2)), max_wait_ms=1.0)
+    server = InferenceServer(batcher, port=0, request_timeout=0.2).start()
+    try:
+        status, _ = _post(server, {'window': window})
+    finally:
+        release.set()
+        server.shutdown()
+        batcher.close()
+    assert status == 503
+
+
+def test_close_finishes_queued_windows_and_rejects_new_ones():
+    release = threading.Event()
+    batcher = MicroBatcher(lambda batch: release.wait(5) and np.zeros((len(batch), 2)),
+                           max_batch_size=1, max_wait_ms=0.0)
+    window = np.zeros((SEQUENCE_LENGTH, FEATURE_DIM), dtype=np.float32)
+    running = batcher.submit(window)
+    time.sleep(0.1)  # the worker is now blocked on the first window
+    queued = batcher.submit(window)
+    closer = threading.Thread(target=batcher.close)
+    closer.start()
+    time.sleep(0.1)
+    release.set()
+    closer.join(5)
+    assert not closer.is_alive()
+    assert running.result(1).shape == (2,)
+    assert queued.result(1).shape == (2,)
+    with pytest.raises(BatcherClosed):
+        batcher.predict(window, timeout=1)
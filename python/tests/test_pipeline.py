@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import DropOldestQueue, SignPipeline
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / 'clip.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _run_with_timeout(pipeline, timeout=10.0):
+    """Run the pipeline on a thread; return the exception it raised, failing if it blocks"""
+    outcome = {}
+
+    def target():
+        try:
+            pipeline.run()
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "SignPipeline.run() blocked"
+    return outcome.get('error')
+
+
+def test_drop_oldest_keeps_newest_items():
+    queue = DropOldestQueue(maxsize=2)
+    for i in range(5):
+        queue.put(i)
+    assert queue.dropped == 3
+    assert [queue.get(timeout=0.1) for _ in range(2)] == [3, 4]
+    with pytest.raises(TimeoutError):
+        queue.get(timeout=0.01)
+
+
+def test_close_releases_blocked_producer():
+    queue = DropOldestQueue(maxsize=1, drop_oldest=False)
+    queue.put('first')
+    returned = []
+    producer = threading.Thread(target=lambda: returned.append(queue.put('second')), daemon=True)
+    producer.start()
+    time.sleep(0.1)
+    assert producer.is_alive()
+    queue.close()
+    producer.join(1.0)
+    assert not producer.is_alive()
+    assert returned == [False]
+
+
+def test_pipeline_processes_every_frame_without_dropping(video):
+    rendered = []
+
+    def infer(packet):
+        packet.prediction = int(packet.frame.mean())
+
+    pipeline = SignPipeline(video, lambda packet: None, infer, lambda packet: rendered.append(packet.frame_id),
+                            drop_oldest=False)
+    assert _run_with_timeout(pipeline) is None
+    assert rendered == list(range(20))
+
+
+def test_stage_error_stops_pipeline_and_is_raised(video):
+    def failing(packet):
+        raise RuntimeError("model failed to load")
+
+    pipeline = SignPipeline(video, lambda packet: None, failing, drop_oldest=False)
+    error = _run_with_timeout(pipeline)
+    assert isinstance(error, RuntimeError)
+    assert "model failed to load" in str(error)
@@ -0,0 +1,53 @@
+import os
+import sys
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sequence_buffer import SequenceRingBuffer
+
+
+def _frame(i, feature_dim=4):
+    return np.full(feature_dim, i, dtype=np.float32)
+
+
+def test_partial_window_is_in_arrival_order():
+    buffer = SequenceRingBuffer(capacity=5, feature_dim=4)
+    for i in range(3):
+        buffer.append(_frame(i))
+    assert len(buffer) == 3
+    assert not buffer.is_full()
+    np.testing.assert_array_equal(buffer.window()[:, 0], [0, 1, 2])
+
+
+def test_wraparound_matches_deque_for_many_laps():
+    capacity = 5
+    buffer = SequenceRingBuffer(capacity=capacity, feature_dim=4)
+    reference = deque(maxlen=capacity)
+    for i in range(4 * capacity + 3):
+        buffer.append(_frame(i))
+        reference.append(_frame(i))
+        np.testing.assert_array_equal(buffer.window(), np.array(reference))
+        np.testing.assert_array_equal(buffer.latest(), _frame(i))
+    assert buffer.is_full()
+    assert buffer.batch().shape == (1, capacity, 4)
+
+
+def test_window_is_a_contiguous_view():
+    buffer = SequenceRingBuffer(capacity=3, feature_dim=4)
+    for i in range(7):
+        buffer.append(_frame(i))
+    window = buffer.window()
+    assert window.flags['C_CONTIGUOUS']
+    assert np.shares_memory(window, buffer.storage)
+
+
+def test_clear_starts_a_new_sequence():
+    buffer = SequenceRingBuffer(capacity=3, feature_dim=4)
+    for i in range(5):
+        buffer.append(_frame(i))
+    buffer.clear()
+    assert len(buffer) == 0
+    buffer.append(_frame(9))
+    np.testing.assert_array_equal(buffer.window()[:, 0], [9])
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sequence_decoder import StreamingSignDecoder
+
+
+def _row(label, p=0.97, num_classes=4):
+    row = np.full(num_classes, (1.0 - p) / (num_classes - 1))
+    row[label] = p
+    return row
+
+
+def _blank(num_classes=4):
+    return np.full(num_classes, 1.0 / num_classes)
+
+
+def _labels(events):
+    return [event.class_index for event in events]
+
+
+def test_repeated_windows_collapse_into_one_sign():
+    decoder = StreamingSignDecoder(4)
+    events = decoder.decode(np.array([_row(1)] * 10))
+    assert _labels(events) == [1]
+    assert events[0].start == 0 and events[0].end == 9
+    assert events[0].frames == 10
+
+
+def test_blank_separates_two_signs_of_the_same_class():
+    decoder = StreamingSignDecoder(4, insertion_penalty=2.0)
+    rows = [_row(1)] * 5 + [_blank()] * 3 + [_row(1)] * 5
+    assert _labels(decoder.decode(np.array(rows))) == [1, 1]
+
+
+def test_consecutive_signs_are_committed_while_streaming():
+    decoder = StreamingSignDecoder(4, max_pending=1, insertion_penalty=2.0)
+    rows = [_row(1)] * 5 + [_row(2)] * 5 + [_row(3)] * 5
+    streamed = []
+    for t, row in enumerate(rows):
+        streamed += _labels(decoder.update(row, t))
+    assert streamed == [1, 2]
+    assert all(len(prefix) <= 2 for prefix in decoder.beams)
+    assert _labels(decoder.flush()) == [3]
+
+
+def test_sign_continuing_after_a_forced_commit_is_not_split():
+    # One confident window of class 2 makes (1, 2) the best beam, forcing
+    # class 1 out; when class 1 carries on, the beam that just committed it
+    # must keep extending it rather than start a second sign.
+    rows = [_row(1)] * 4 + [[0.01, 0.07, 0.9, 0.02]] + [_row(1)] * 4
+    decoder = StreamingSignDecoder(4, max_pending=1, insertion_penalty=1.5)
+    streamed = []
+    for t, row in enumerate(rows):
+        committed = decoder.update(row, t)
+        if committed:
+            assert () in decoder.beams and decoder.beams[()].last == 1
+        streamed += _labels(committed)
+    assert streamed == [1]
+    streamed += _labels(decoder.flush())
+
+    unbounded = StreamingSignDecoder(4, beam_width=64, max_pending=50, insertion_penalty=1.5)
+    assert streamed == _labels(unbounded.decode(np.array(rows))) == [1]
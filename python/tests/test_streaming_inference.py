@@ -0,0 +1,72 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from streaming_inference import LSTMStepCell, StreamingSignPredictor
+
+tf = pytest.importorskip('tensorflow')
+
+SEQUENCE_LENGTH = 12
+FEATURE_DIM = 6
+
+
+@pytest.fixture(scope='module')
+def model():
+    tf.keras.utils.set_random_seed(0)
+    return tf.keras.Sequential([
+        tf.keras.layers.Input((SEQUENCE_LENGTH, FEATURE_DIM)),
+        tf.keras.layers.LSTM(16, return_sequences=True),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.LSTM(8),
+        tf.keras.layers.Dense(8, activation='relu'),
+        tf.keras.layers.Dense(4, activation='softmax'),
+    ])
+
+
+@pytest.fixture(scope='module')
+def frames():
+    rng = np.random.default_rng(0)
+    return np.cumsum(rng.normal(0.0, 0.1, (40, FEATURE_DIM)), axis=0).astype(np.float32)
+
+
+def _window_outputs(model, frames):
+    windows = np.lib.stride_tricks.sliding_window_view(frames, SEQUENCE_LENGTH, axis=0).transpose(0, 2, 1)
+    return model(np.ascontiguousarray(windows), training=False).numpy()
+
+
+def test_step_cell_matches_full_window(model, frames):
+    cell = LSTMStepCell.from_keras(model)
+    state = cell.initial_state(1)
+    for frame in frames[:SEQUENCE_LENGTH]:
+        outputs, state = cell.step(frame[None], state)
+    np.testing.assert_allclose(outputs[0], _window_outputs(model, frames[:SEQUENCE_LENGTH])[0], atol=1e-5)
+
+
+def test_streaming_matches_sliding_window_when_resyncing_every_frame(model, frames):
+    streamer = StreamingSignPredictor(model, SEQUENCE_LENGTH, resync_interval=1, adaptive=False)
+    outputs = [streamer.update(frame) for frame in frames]
+    assert all(output is None for output in outputs[:SEQUENCE_LENGTH - 1])
+    np.testing.assert_allclose(np.array(outputs[SEQUENCE_LENGTH - 1:]), _window_outputs(model, frames),
+                               atol=1e-5)
+
+
+def test_streaming_stays_close_with_periodic_resync(model, frames):
+    streamer = StreamingSignPredictor(model, SEQUENCE_LENGTH, resync_interval=4, tolerance=0.05)
+    outputs = np.array([streamer.update(frame) for frame in frames][SEQUENCE_LENGTH - 1:])
+    reference = _window_outputs(model, frames)
+    assert np.abs(outputs - reference).max() < 0.05
+    # Only windows since the last resync are ever kept
+    assert streamer.num_tracks <= SEQUENCE_LENGTH
+
+
+def test_reset_waits_for_a_new_full_window(model, frames):
+    streamer = StreamingSignPredictor(model, SEQUENCE_LENGTH, resync_interval=1, adaptive=False)
+    for frame in frames[:SEQUENCE_LENGTH]:
+        streamer.update(frame)
+    streamer.reset()
+    outputs = [streamer.update(frame) for frame in frames[:SEQUENCE_LENGTH]]
+    assert all(output is None for output in outputs[:-1])
+    np.testing.assert_allclose(outputs[-1], _window_outputs(model, frames[:SEQUENCE_LENGTH])[0], atol=1e-5)
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+pytest.importorskip('tensorflow')
+from sequence_dataset import ShardedDatasetWriter
+from train_model import SignLanguageModelTrainer
+
+CLASSES = ['thanks', 'hello', 'yes', 'no']  # deliberately not sorted
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    root = str(tmp_path / 'shards')
+    labels = np.arange(12) % len(CLASSES)
+    with ShardedDatasetWriter(root, shard_size=4, classes=CLASSES) as writer:
+        writer.append(np.zeros((len(labels), 30, 171), dtype=np.float32), labels)
+    return root, labels
+
+
+def test_dataset_labels_round_trip_through_the_encoder(dataset):
+    root, labels = dataset
+    trainer = SignLanguageModelTrainer()
+    encode = trainer.fit_dataset_labels(root, [])
+
+    assert list(trainer.label_encoder.classes_) == sorted(CLASSES)
+    encoded = encode(labels)
+    np.testing.assert_array_equal(trainer.label_encoder.inverse_transform(encoded),
+                                  np.array(CLASSES)[labels])
+    np.testing.assert_array_equal(trainer.label_encoder.transform(np.array(CLASSES)[labels]), encoded)
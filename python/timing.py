@@ -0,0 +1,30 @@
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 in milliseconds and calls per second from per-call seconds"""
+    latencies = 1000 * np.asarray(latencies, dtype=np.float64)
+    mean = float(latencies.mean())
+    return {
+        'iterations': len(latencies),
+        'mean_ms': mean,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'fps': 1000.0 / mean if mean > 0 else 0.0,
+    }
+
+
+def time_calls(fn: Callable[[int], object], iterations: int, warmup: int = 5) -> Dict[str, float]:
+    """Latency statistics of ``fn(i)`` over ``iterations`` calls after ``warmup`` untimed ones"""
+    for i in range(warmup):
+        fn(i)
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    return latency_stats(latencies)
@@ -7,34 +7,104 @@ import mediapipe as mp
 import cv2
 import os
 import json
-from typing import List, Tuple, Dict
+import time
+from itertools import islice
+from typing import Callable, List, Tuple, Dict, Iterable, Iterator, Optional, Sequence, Union
 
-class SignLanguageModelTrainer:
+PRECISIONS = ('float32', 'mixed_bfloat16')
+
+
+def bfloat16_supported() -> bool:
+    """Whether the CPU has native bfloat16 instructions (AVX512-BF16 or AMX)"""
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+
+class _EpochTimer(tf.keras.callbacks.Callback):
+    """Records the wall time of every training epoch"""
+    
     def __init__(self):
+        super().__init__()
+        self.epoch_times = []
+        self._start = 0.0
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+    
+    def on_epoch_end(self, epoch, logs=None):
+        self.epoch_times.append(time.perf_counter() - self._start)
+
+
+def top_k_predictions(probabilities: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """(N, k) class indices and probabilities of each row's k most likely classes, best first"""
+    k = min(k, probabilities.shape[1])
+    if k < probabilities.shape[1]:
+        # Partial selection is O(C) per row; only the k winners get sorted
+        indices = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+    else:
+        indices = np.broadcast_to(np.arange(k), probabilities.shape)
+    order = np.argsort(-np.take_along_axis(probabilities, indices, axis=1), axis=1, kind='stable')
+    indices = np.take_along_axis(indices, order, axis=1)
+    return indices, np.take_along_axis(probabilities, indices, axis=1)
+
+
+class SignLanguageModelTrainer:
+    SYNTHETIC_SIGNS = ['Hello', 'Thank You', 'Please', 'Goodbye', 'Yes', 'No', 'Love', 'Help']
+    
+    def __init__(self, precision: str = 'float32', jit_compile: bool = False,
+                 lstm_units: Sequence[int] = (64, 128, 64), dense_units: int = 64,
+                 dropout: float = 0.3, learning_rate: float = 0.001):
+        """``precision='mixed_bfloat16'`` computes in bfloat16 where the CPU
+        supports it (falling back to float32 otherwise); ``jit_compile``
+        compiles the train step with XLA. The remaining arguments shape the
+        network built by ``create_model``."""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+        if precision == 'mixed_bfloat16' and not bfloat16_supported():
+            print("CPU has no bfloat16 support, training in float32")
+            precision = 'float32'
+        if not lstm_units:
+            raise ValueError("At least one LSTM layer is required")
+        self.precision = precision
+        self.jit_compile = jit_compile
+        self.lstm_units = tuple(lstm_units)
+        self.dense_units = dense_units
+        self.dropout = dropout
+        self.learning_rate = learning_rate
         self.model = None
         self.label_encoder = LabelEncoder()
+        self._label_lookup = None
+        self._batch_predictor = None
+        self._predictor_model = None
         self.sequence_length = 30
         self.num_landmarks = 21
         self.num_features = 3  # x, y, z coordinates
         
-    def create_model(self, num_classes: int) -> tf.keras.Model:
+    def create_model(self, num_classes: int, input_dim: Optional[int] = None) -> tf.keras.Model:
         """Create LSTM model for sign language detection"""
-        model = tf.keras.Sequential([
-            tf.keras.layers.LSTM(64, return_sequences=True, input_shape=(self.sequence_length, self.num_landmarks * self.num_features)),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.LSTM(128, return_sequences=True),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.LSTM(64, return_sequences=False),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(64, activation='relu'),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(num_classes, activation='softmax')
-        ])
+        input_dim = input_dim or self.num_landmarks * self.num_features
+        # Per-layer policy rather than the global one, so other models are unaffected
+        dtype = tf.keras.mixed_precision.Policy(self.precision)
+        model = tf.keras.Sequential()
+        for i, units in enumerate(self.lstm_units):
+            kwargs = {'input_shape': (self.sequence_length, input_dim)} if i == 0 else {}
+            model.add(tf.keras.layers.LSTM(units, return_sequences=i < len(self.lstm_units) - 1,
+                                           dtype=dtype, **kwargs))
+            model.add(tf.keras.layers.Dropout(self.dropout, dtype=dtype))
+        model.add(tf.keras.layers.Dense(self.dense_units, activation='relu', dtype=dtype))
+        model.add(tf.keras.layers.Dropout(self.dropout, dtype=dtype))
+        # Softmax stays in float32 for numerically stable probabilities and loss
+        model.add(tf.keras.layers.Dense(num_classes, activation='softmax', dtype='float32'))
         
         model.compile(
-            optimizer='adam',
+            optimizer=tf.keras.optimizers.Adam(self.learning_rate),
             loss='categorical_crossentropy',
-            metrics=['accuracy']
+            metrics=['accuracy'],
+            jit_compile=self.jit_compile
         )
         
         return model
@@ -50,49 +120,93 @@ class SignLanguageModelTrainer:
         
         return data
     
-    def generate_synthetic_data(self, num_samples: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+    def _synthetic_motion_offsets(self) -> np.ndarray:
+        """Per-sign (x, y) offsets for every frame, shape (num_signs, frames, 2)"""
+        t = np.arange(self.sequence_length, dtype=np.float32)
+        offsets = np.zeros((len(self.SYNTHETIC_SIGNS), self.sequence_length, 2), dtype=np.float32)
+        
+        # Hello: vertical wave
+        offsets[self.SYNTHETIC_SIGNS.index('Hello'), :, 1] = 0.2 * np.sin(t * 0.2)
+        # Thank You: horizontal sweep
+        offsets[self.SYNTHETIC_SIGNS.index('Thank You'), :, 0] = 0.1 * np.cos(t * 0.15)
+        # Love: heart shape pattern
+        love = self.SYNTHETIC_SIGNS.index('Love')
+        offsets[love, :, 0] = 0.1 * np.sin(t * 0.2) ** 2
+        offsets[love, :, 1] = 0.1 * np.cos(t * 0.2) ** 2
+        
+        return offsets
+    
+    def _synthetic_batch(self, rng: np.random.Generator, num_samples: int,
+                         offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Generate one batch of synthetic sequences with a handful of array ops"""
+        y = rng.integers(0, len(self.SYNTHETIC_SIGNS), size=num_samples)
+        
+        # (samples, frames, landmarks, xyz) noise around the base position
+        X = rng.standard_normal(
+            (num_samples, self.sequence_length, self.num_landmarks, self.num_features),
+            dtype=np.float32
+        )
+        X *= np.array([0.1, 0.1, 0.05], dtype=np.float32)
+        X += np.array([0.5, 0.5, 0.0], dtype=np.float32)
+        
+        # Sign-specific motion is shared by all landmarks of a frame
+        X[..., :2] += offsets[y][:, :, None, :]
+        
+        return X.reshape(num_samples, self.sequence_length, -1), y
+    
+    def generate_synthetic_data(self, num_samples: int = 1000,
+                                seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
         """Generate synthetic training data for demo purposes"""
-        signs = ['Hello', 'Thank You', 'Please', 'Goodbye', 'Yes', 'No', 'Love', 'Help']
+        rng = np.random.default_rng(seed)
+        return self._synthetic_batch(rng, num_samples, self._synthetic_motion_offsets())
+    
+    def generate_synthetic_data_chunks(self, num_samples: int, chunk_size: int = 10000,
+                                       seed: Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Stream synthetic data in chunks so memory stays bounded for large datasets"""
+        rng = np.random.default_rng(seed)
+        offsets = self._synthetic_motion_offsets()
         
-        X = []
-        y = []
+        for start in range(0, num_samples, chunk_size):
+            yield self._synthetic_batch(rng, min(chunk_size, num_samples - start), offsets)
+    
+    def prepare_video_data(self, video_dir: str, cache_dir: str = 'feature_cache',
+                           stride: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Build (N, 30, 171) training windows from ``video_dir/<label>/<video>`` files.
+
+        Landmark features come from the on-disk FeatureCache, so MediaPipe
+        only runs for videos that have not been seen with the current
+        extractor config.
+        """
+        from feature_cache import FeatureCache
+        from batch_inference import find_videos
+        from landmark_features import LandmarkExtractor, make_sequences
         
-        for i in range(num_samples):
-            sign_class = np.random.choice(len(signs))
-            
-            # Generate synthetic landmark sequences
-            sequence = []
-            for frame in range(self.sequence_length):
-                # Create realistic hand landmark patterns
-                landmarks = []
-                for landmark in range(self.num_landmarks):
-                    # Base position with some noise
-                    base_x = np.random.normal(0.5, 0.1)
-                    base_y = np.random.normal(0.5, 0.1)
-                    base_z = np.random.normal(0.0, 0.05)
-                    
-                    # Add sign-specific patterns
-                    if signs[sign_class] == 'Hello':
-                        base_y += 0.2 * np.sin(frame * 0.2)
-                    elif signs[sign_class] == 'Thank You':
-                        base_x += 0.1 * np.cos(frame * 0.15)
-                    elif signs[sign_class] == 'Love':
-                        # Heart shape pattern
-                        t = frame * 0.2
-                        base_x += 0.1 * np.sin(t) * np.sin(t)
-                        base_y += 0.1 * np.cos(t) * np.cos(t)
-                    
-                    landmarks.extend([base_x, base_y, base_z])
-                
-                sequence.append(landmarks)
-            
-            X.append(sequence)
-            y.append(sign_class)
+        cache = FeatureCache(cache_dir)
+        extractors = []
+        X, y = [], []
         
-        X = np.array(X)
-        y = np.array(y)
+        def make_extractor():
+            # One MediaPipe instance shared by every cache miss
+            if not extractors:
+                extractors.append(LandmarkExtractor())
+            return extractors[0]
         
-        return X, y
+        try:
+            for video_path in find_videos(video_dir):
+                label = os.path.basename(os.path.dirname(video_path))
+                features = cache.get_or_extract(video_path, make_extractor=make_extractor)
+                
+                windows = make_sequences(np.asarray(features), self.sequence_length, stride)
+                X.append(windows)
+                y.extend([label] * len(windows))
+        finally:
+            for extractor in extractors:
+                extractor.close()
+        
+        print(f"Prepared {len(y)} windows (cache hits: {cache.hits}, misses: {cache.misses})")
+        if not X:
+            return np.empty((0, self.sequence_length, 0), dtype=np.float32), np.array(y)
+        return np.concatenate(X), np.array(y)
     
     def train_model(self, X: np.ndarray, y: np.ndarray, epochs: int = 50, batch_size: int = 32):
         """Train the sign language model"""
@@ -110,7 +224,7 @@ class SignLanguageModelTrainer:
         
         # Create model
         num_classes = len(np.unique(y))
-        self.model = self.create_model(num_classes)
+        self.model = self.create_model(num_classes, X.shape[-1])
         
         # Train model
         print("Training model...")
@@ -128,6 +242,84 @@ class SignLanguageModelTrainer:
         
         return history
     
+    @staticmethod
+    def dataset_classes(shard_dir: str) -> Optional[List[str]]:
+        """Class names recorded in a ShardedDataset index, if any"""
+        from sequence_dataset import INDEX_FILE, ShardedDataset
+        if not os.path.exists(os.path.join(shard_dir, INDEX_FILE)):
+            return None
+        return ShardedDataset(shard_dir).classes
+    
+    def dataset_label_mapping(self, shard_dir: str) -> Callable[[np.ndarray], np.ndarray]:
+        """Map a shard dataset's stored labels to this trainer's label encoder indices.
+
+        Datasets written with a class list store labels as indices into that
+        list, which need not be sorted; LabelEncoder indexes the sorted
+        classes_, so the stored indices are remapped rather than reused.
+        """
+        classes = self.dataset_classes(shard_dir)
+        if classes is None:
+            return self.label_encoder.transform
+        remap = self.label_encoder.transform(classes)
+        return lambda labels: remap[labels]
+    
+    def fit_dataset_labels(self, shard_dir: str, shards: Sequence[str]) -> Callable[[np.ndarray], np.ndarray]:
+        """Fit the label encoder to a shard dataset and return its label mapping"""
+        from sequence_dataset import shard_label_path
+        
+        classes = self.dataset_classes(shard_dir)
+        if classes is None:
+            # Labels are tiny compared to sequences, so the encoder sees all of them
+            classes = np.concatenate([np.load(shard_label_path(path)) for path in shards])
+        self.label_encoder.fit(classes)
+        return self.dataset_label_mapping(shard_dir)
+    
+    def evaluate_dataset(self, shard_dir: str, batch_size: int = 256) -> Tuple[float, float]:
+        """Loss and accuracy of the loaded model on every sequence in a shard directory"""
+        from data_pipeline import list_shards, make_dataset
+        
+        if self.model is None:
+            raise ValueError("No model loaded")
+        
+        dataset = make_dataset(list_shards(shard_dir), self.dataset_label_mapping(shard_dir), len(self.label_encoder.classes_),
+                               self.sequence_length, batch_size, training=False)
+        loss, accuracy = self.model.evaluate(dataset, verbose=0)
+        return loss, accuracy
+    
+    def train_model_from_shards(self, shard_dir: str, epochs: int = 50, batch_size: int = 32,
+                                validation_fraction: float = 0.2, shuffle_buffer: int = 2048,
+                                cache: bool = False):
+        """Train from sequence shards streamed with tf.data instead of in-memory arrays"""
+        from data_pipeline import list_shards, split_shards, make_dataset
+        
+        shards = list_shards(shard_dir)
+        if not shards:
+            raise ValueError(f"No sequence shards found in {shard_dir}")
+        
+        encode_labels = self.fit_dataset_labels(shard_dir, shards)
+        num_classes = len(self.label_encoder.classes_)
+        
+        train_shards, val_shards = split_shards(shards, validation_fraction)
+        datasets = [
+            make_dataset(paths, encode_labels, num_classes, self.sequence_length,
+                         batch_size, training=training, shuffle_buffer=shuffle_buffer, cache=cache)
+            for paths, training in ((train_shards, True), (val_shards, False)) if paths
+        ]
+        train_data = datasets[0]
+        val_data = datasets[1] if len(datasets) > 1 else None
+        
+        feature_dim = int(np.prod(np.load(shards[0], mmap_mode='r').shape[2:]))
+        self.model = self.create_model(num_classes, feature_dim)
+        
+        print(f"Training model on {len(train_shards)} shards ({len(val_shards)} for validation)...")
+        history = self.model.fit(train_data, validation_data=val_data, epochs=epochs, verbose=1)
+        
+        if val_data is not None:
+            test_loss, test_accuracy = self.model.evaluate(val_data, verbose=0)
+            print(f"Test accuracy: {test_accuracy:.4f}")
+        
+        return history
+    
     def save_model(self, model_path: str = 'best_model2.keras'):
         """Save the trained model"""
         if self.model:
@@ -156,6 +348,58 @@ class SignLanguageModelTrainer:
             print(f"Error loading model: {e}")
             return False
     
+    @property
+    def label_lookup(self) -> np.ndarray:
+        """Index -> label array, rebuilt only when the encoder's classes change"""
+        classes = getattr(self.label_encoder, 'classes_', None)
+        if classes is None:
+            raise ValueError("Label encoder has no classes; train or load a model first")
+        if self._label_lookup is None or self._label_lookup[0] is not classes:
+            self._label_lookup = (classes, np.asarray(classes))
+        return self._label_lookup[1]
+
+    def _predict_chunk(self, chunk: np.ndarray) -> np.ndarray:
+        # One trace with a dynamic batch dimension serves every chunk size
+        if self._predictor_model is not self.model:
+            from inference_backends import keras_batch_predictor
+            self._batch_predictor = keras_batch_predictor(self.model)
+            self._predictor_model = self.model
+        return self._batch_predictor(np.ascontiguousarray(self.preprocess_data(chunk)))
+
+    def _chunks(self, windows: Union[np.ndarray, Iterable[np.ndarray]], chunk_size: int) -> Iterator[np.ndarray]:
+        if isinstance(windows, np.ndarray):
+            for start in range(0, len(windows), chunk_size):
+                yield windows[start:start + chunk_size]
+            return
+        iterator = iter(windows)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield np.stack(chunk)
+
+    def predict_batch(self, windows: Union[np.ndarray, Iterable[np.ndarray]], top_k: int = 1,
+                      chunk_size: int = 512) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k labels and probabilities, both (N, top_k), for many windows at once.
+
+        ``windows`` is a (N, frames, features) or (N, frames, landmarks, 3)
+        array (memory-mapped is fine), or any iterable of single windows;
+        either way at most ``chunk_size`` windows are in flight per forward
+        pass.
+        """
+        if self.model is None:
+            raise ValueError("No model loaded")
+        lookup = self.label_lookup
+        labels, probabilities = [], []
+        for chunk in self._chunks(windows, chunk_size):
+            indices, scores = top_k_predictions(self._predict_chunk(chunk), top_k)
+            labels.append(lookup[indices])
+            probabilities.append(scores)
+        if not labels:
+            k = min(top_k, len(lookup))
+            return np.empty((0, k), dtype=lookup.dtype), np.empty((0, k), dtype=np.float32)
+        return np.concatenate(labels), np.concatenate(probabilities)
+
     def predict(self, landmarks: np.ndarray) -> Tuple[str, float]:
         """Make prediction on landmark data"""
         if self.model is None:
@@ -170,24 +414,129 @@ class SignLanguageModelTrainer:
         confidence = predictions[0][predicted_class]
         
         # Get sign name
-        sign_name = self.label_encoder.inverse_transform([predicted_class])[0]
+        sign_name = self.label_lookup[predicted_class]
         
         return sign_name, float(confidence)
 
+TRAINING_MODES = {
+    'baseline': dict(precision='float32', jit_compile=False),
+    'mixed_bfloat16': dict(precision='mixed_bfloat16', jit_compile=False),
+    'xla': dict(precision='float32', jit_compile=True),
+    'mixed_bfloat16_xla': dict(precision='mixed_bfloat16', jit_compile=True),
+}
+
+
+def benchmark_training_modes(num_samples: int = 2000, epochs: int = 3, batch_size: int = 32,
+                             modes: Optional[List[str]] = None,
+                             seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Epoch time and accuracy of each training mode on the same synthetic data.
+
+    The first epoch includes tracing (and XLA compilation), so it is
+    reported separately from the mean of the remaining epochs. Speedups
+    are relative to 'baseline', which always runs.
+    """
+    names = ['baseline'] + [name for name in (modes or TRAINING_MODES) if name != 'baseline']
+    modes = {name: TRAINING_MODES[name] for name in names}
+    
+    X, y = SignLanguageModelTrainer().generate_synthetic_data(num_samples, seed=seed)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, tf.keras.utils.to_categorical(y), test_size=0.2, random_state=42
+    )
+    
+    report = {}
+    for name, options in modes.items():
+        tf.keras.utils.set_random_seed(seed)
+        trainer = SignLanguageModelTrainer(**options)
+        model = trainer.create_model(y_train.shape[1], X.shape[-1])
+        timer = _EpochTimer()
+        model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, verbose=0, callbacks=[timer])
+        _, accuracy = model.evaluate(X_test, y_test, verbose=0)
+        
+        steady = timer.epoch_times[1:] or timer.epoch_times
+        report[name] = {
+            'precision': trainer.precision,
+            'first_epoch_seconds': timer.epoch_times[0],
+            'epoch_seconds': float(np.mean(steady)),
+            'accuracy': float(accuracy),
+        }
+    
+    baseline = report['baseline']['epoch_seconds']
+    for stats in report.values():
+        stats['speedup'] = baseline / stats['epoch_seconds'] if stats['epoch_seconds'] else 0.0
+    return report
+
+
+def benchmark_batch_prediction(num_windows: int = 2000, loop_windows: int = 100, top_k: int = 3,
+                               chunk_sizes: Sequence[int] = (64, 256, 1024), seed: int = 0) -> Dict[str, float]:
+    """Windows per second of predict_batch vs calling predict once per window.
+
+    The per-window loop is timed on ``loop_windows`` windows only, since
+    it is orders of magnitude slower; throughput is per window either way.
+    """
+    trainer = SignLanguageModelTrainer()
+    X, y = trainer.generate_synthetic_data(num_windows, seed=seed)
+    trainer.label_encoder.fit(y)
+    trainer.model = trainer.create_model(len(trainer.label_encoder.classes_), X.shape[-1])
+    
+    trainer.predict(X[:1])
+    start = time.perf_counter()
+    loop_labels = [trainer.predict(X[i:i + 1])[0] for i in range(loop_windows)]
+    report = {'loop_windows_per_second': loop_windows / (time.perf_counter() - start)}
+    
+    for chunk_size in chunk_sizes:
+        trainer.predict_batch(X[:chunk_size], top_k, chunk_size)
+        start = time.perf_counter()
+        labels, _ = trainer.predict_batch(X, top_k, chunk_size)
+        report[f'batch_{chunk_size}_windows_per_second'] = num_windows / (time.perf_counter() - start)
+    report['top1_agreement'] = float(np.mean(labels[:loop_windows, 0] == np.array(loop_labels)))
+    
+    start = time.perf_counter()
+    trainer.predict_batch(iter(X), top_k, chunk_sizes[-1])
+    report['iterator_windows_per_second'] = num_windows / (time.perf_counter() - start)
+    return report
+
+
 def main():
     """Main training function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Train the sign language LSTM")
+    parser.add_argument('--precision', choices=PRECISIONS, default='float32')
+    parser.add_argument('--xla', action='store_true', help="compile the train step with XLA")
+    parser.add_argument('--compare-modes', nargs='*', choices=list(TRAINING_MODES), default=None,
+                        help="benchmark training modes against float32 (default: all) and exit")
+    parser.add_argument('--benchmark-predict', action='store_true',
+                        help="compare predict_batch against per-window predict and exit")
+    args = parser.parse_args()
+    
     print("Sign Language Model Training")
     print("=" * 40)
     
+    if args.benchmark_predict:
+        report = benchmark_batch_prediction()
+        for name, value in report.items():
+            print(f"  {name:<36} {value:.2f}")
+        return
+    
+    if args.compare_modes is not None:
+        for name, stats in benchmark_training_modes(modes=args.compare_modes).items():
+            print(f"  {name:<20} {stats['precision']:<15} epoch={stats['epoch_seconds']:.2f}s "
+                  f"(first {stats['first_epoch_seconds']:.2f}s)  speedup={stats['speedup']:.2f}x  "
+                  f"accuracy={stats['accuracy']:.4f}")
+        return
+    
     # Initialize trainer
-    trainer = SignLanguageModelTrainer()
+    trainer = SignLanguageModelTrainer(precision=args.precision, jit_compile=args.xla)
     
-    # Generate synthetic data for demo
-    print("Generating synthetic training data...")
-    X, y = trainer.generate_synthetic_data(num_samples=2000)
+    # Generate synthetic data for demo once and reuse it on later runs
+    dataset_dir = 'synthetic_dataset'
+    if not os.path.exists(dataset_dir):
+        from sequence_dataset import build_synthetic_dataset
+        print("Generating synthetic training data...")
+        build_synthetic_dataset(dataset_dir, num_samples=2000, shard_size=250)
     
     # Train model
-    history = trainer.train_model(X, y, epochs=30, batch_size=32)
+    history = trainer.train_model_from_shards(dataset_dir, epochs=30, batch_size=32)
     
     # Save model
     trainer.save_model('best_model2.keras')
@@ -201,6 +550,8 @@ def main():
     test_data, _ = trainer.generate_synthetic_data(num_samples=1)
     sign, confidence = trainer.predict(test_data)
     print(f"Predicted: {sign} (confidence: {confidence:.2f})")
+    labels, probabilities = trainer.predict_batch(test_data, top_k=3)
+    print("Top 3: " + ", ".join(f"{label} ({p:.2f})" for label, p in zip(labels[0], probabilities[0])))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file